@@ -0,0 +1,198 @@
+#! /usr/bin/env python3
+"""
+Headless benchmark of the Window state update and jog pipelines.
+Each state rate runs against its own simulated controller with the
+offscreen Qt platform, results are written as JSON so releases can be compared.
+
+python3 -m urxui.benchmark --rates 2 125 500 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from PyQt5.QtWidgets import QApplication
+
+
+def _spin(app, duration):
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def _count(window, duration, app):
+    stream, renderer = window.stream, window.renderer
+    start = (stream.packets, stream.emitted, renderer.frames, renderer.render_time)
+    _spin(app, duration)
+    return [end - begin for begin, end in zip(start, (stream.packets, stream.emitted, renderer.frames, renderer.render_time))]
+
+
+def _alloc_per_tick(window, ticks=200):
+    """
+    bytes allocated in one state read + render, measured as tracemalloc peak over
+    what is still allocated before the tick
+    """
+    robot = window.robot
+    window.stream.set_robot(None)  # we drive the pipeline ourself
+    tracemalloc.start()
+    total = 0
+    blocks = sys.getallocatedblocks()
+    for _ in range(ticks):
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        window._update_robot_state(robot)
+        window.renderer._render()
+        total += tracemalloc.get_traced_memory()[1] - base
+    blocks = sys.getallocatedblocks() - blocks
+    tracemalloc.stop()
+    window.stream.set_robot(robot)
+    return total / ticks, blocks / ticks
+
+
+def _jog_rate(window, app, duration, streamed):
+    """
+    return commands or setpoints per second and an error message, None if
+    the measurement is valid
+    """
+    window.streamedJogCheckBox.setChecked(streamed)
+    start = time.monotonic()
+    count = 0
+    error = None
+    if streamed:
+        sent = []
+        servo = window._get_jog_servo()
+        servo.on_sent = lambda: sent.append(1)
+        window._inc(0, 1, None)
+        # program upload waits for state packets, only measure the stream itself
+        end = start + 5
+        while not sent and time.monotonic() < end:
+            app.processEvents()
+            time.sleep(0.001)
+        start = time.monotonic()
+        first = len(sent)
+        _spin(app, duration)
+        count = len(sent) - first
+        # a program aborted on the controller ends the stream early
+        expected = (time.monotonic() - start) / servo.period
+        if servo.error is not None:
+            error = "jog stream failed: {!r}".format(servo.error)
+        elif not first:
+            error = "jog program did not start"
+        elif servo._thread is None or not servo._thread.is_alive():
+            error = "jog stream ended early"
+        elif count < expected / 2:
+            error = "{} setpoints sent, {:.0f} expected".format(count, expected)
+        window._jog_released()
+    else:
+        # commands queued faster than they are sent replace each other,
+        # count what reaches the controller
+        dispatched = window.commands.dispatched
+        presses = 0
+        while time.monotonic() - start < duration:
+            window._jinc(5, 1 if presses % 2 else -1, False)
+            app.processEvents()
+            presses += 1
+        count = window.commands.dispatched - dispatched
+    elapsed = time.monotonic() - start
+    window.stop()
+    return count / elapsed, error
+
+
+def _start_robot(host, rate):
+    """
+    simulated controller in its own process, so it does not compete with
+    the pipelines we measure for the GIL
+    """
+    proc = subprocess.Popen([sys.executable, "-m", "urxui.fakerobot", "--host", host, "--rate", str(rate)],
+                            stderr=subprocess.DEVNULL)
+    end = time.monotonic() + 10
+    while True:
+        if proc.poll() is not None:
+            raise RuntimeError("Simulated robot at {} exited with code {}".format(host, proc.returncode))
+        try:
+            socket.create_connection((host, 30002), timeout=1).close()
+            return proc
+        except OSError:
+            if time.monotonic() > end:
+                proc.kill()
+                raise RuntimeError("Simulated robot at {} did not start".format(host))
+            time.sleep(0.1)
+
+
+def run(rate, duration, app, index):
+    from urxui.mainwindow import Window
+
+    host = "127.0.0.{}".format(10 + index)
+    fake = _start_robot(host, rate)
+    window = Window()
+    try:
+        # display every packet whatever the robot does, the renderer caps to fps
+        window.rate.full = window.rate.idle = window.rate.hidden = rate
+        window.show()
+        window.build_tabs()
+        window.ui.addrComboBox.setEditText(host)
+        window.connect()
+        end = time.monotonic() + 10
+        while window.robot is None and time.monotonic() < end:
+            app.processEvents()
+        if window.robot is None:
+            raise RuntimeError("Could not connect to simulated robot at {}".format(host))
+        _spin(app, 0.5)
+        packets, emitted, frames, render_time = _count(window, duration, app)
+        alloc_bytes, alloc_blocks = _alloc_per_tick(window)
+        result = {
+            "state_rate": rate,
+            "duration": duration,
+            "packets_per_s": packets / duration,
+            "snapshots_per_s": emitted / duration,
+            "frames_per_s": frames / duration,
+            "gui_ms_per_frame": render_time / frames * 1000 if frames else None,
+            "dropped_snapshots": window.mailbox.dropped,
+            "alloc_bytes_per_tick": alloc_bytes,
+            "alloc_blocks_kept_per_tick": alloc_blocks,
+        }
+        result["jog_commands_per_s"], _ = _jog_rate(window, app, duration, False)
+        result["streamed_setpoints_per_s"], result["streamed_jog_error"] = _jog_rate(window, app, duration, True)
+    finally:
+        window.close()
+        fake.terminate()
+        fake.wait()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark urxui update and jog pipelines")
+    parser.add_argument("--rates", type=float, nargs="+", default=[2, 125, 500], help="state rates in Hz")
+    parser.add_argument("--duration", type=float, default=3, help="seconds per measurement")
+    parser.add_argument("--output", help="json file, default is stdout")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication(sys.argv[:1])
+    results = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [run(rate, args.duration, app, idx) for idx, rate in enumerate(args.rates)],
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    errors = [res["streamed_jog_error"] for res in results["results"] if res["streamed_jog_error"]]
+    for error in errors:
+        print("Invalid streamed jog measurement:", error, file=sys.stderr)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+"""
+Share one controller connection between several urxui clients.
+The broker follows the secondary interface of a robot and forwards every
+state packet, unchanged, to all clients connected to its Unix socket, so
+the controller serves one stream and every client sees the same samples.
+Clients send URScript programs back, each terminated by a NUL byte.
+Only one client at a time holds control: it gets it with its first program
+while nobody holds it, or with a "#urxui acquire" program, and keeps it
+until it sends "#urxui release", disconnects or sends nothing for
+control_timeout seconds. A client jogging over its own connection to the
+robot sends "#urxui acquire" every second to keep control. Programs of other clients are rejected, except
+stop programs which are always forwarded.
+The broker tells clients about control with packets of type MESSAGE, see
+urxui.brokerclient for the client side.
+The socket is only open to the user running the broker and lives in a
+directory nobody else can write, so no other user can serve a fake state
+or read the programs sent.
+"""
+
+import errno
+import os
+import re
+import selectors
+import signal
+import socket
+import stat
+import struct
+import tempfile
+import time
+
+from urxui.connector import backoff_delay
+
+
+HEADER = struct.Struct("!iB")  # size including header, type, as the controller packets
+STATE = 16  # type of controller state packets
+MESSAGE = 100  # type of broker messages, payload is ascii text
+MAX_PACKET = 2000
+
+ACQUIRE = b"#urxui acquire"
+RELEASE = b"#urxui release"
+
+# messages, "control" is followed by the state of control seen by the client
+CONTROL_HELD = "control held"
+CONTROL_FREE = "control free"
+CONTROL_TAKEN = "control taken"
+REJECTED = "rejected"
+
+_STOP = re.compile(rb"^\s*(stopj|stopl)\([^)]*\)\s*$")
+
+
+def runtime_dir():
+    """
+    directory of the default broker sockets, private to the current user
+    """
+    path = os.environ.get("XDG_RUNTIME_DIR")
+    if path:
+        return path
+    return os.path.join(tempfile.gettempdir(), "urxui-{}".format(os.getuid()))
+
+
+def socket_path(address):
+    """
+    default broker socket of robot at address
+    """
+    return os.path.join(runtime_dir(), "urxui-{}.sock".format(address))
+
+
+def _safe_dir(path):
+    # ours and only writable by us, or sticky as /tmp so nobody can replace our files
+    st = os.stat(path)
+    return st.st_uid == os.getuid() and not st.st_mode & 0o022 or bool(st.st_mode & stat.S_ISVTX)
+
+
+def is_trusted(path):
+    """
+    True if path is a socket of the current user that nobody else can
+    have created or replaced
+    """
+    try:
+        st = os.lstat(path)
+        return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid() and _safe_dir(os.path.dirname(path) or ".")
+    except OSError:
+        return False
+
+
+def message(text):
+    data = text.encode()
+    return HEADER.pack(HEADER.size + len(data), MESSAGE) + data
+
+
+def is_stop(prog):
+    lines = [line for line in prog.splitlines() if line.strip()]
+    return bool(lines) and all(_STOP.match(line) for line in lines)
+
+
+def _listening(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+class _Client(object):
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.out = bytearray()
+        self.inbuf = b""
+
+
+class Broker(object):
+
+    """
+    Serve the state of robot at address to clients of Unix socket path.
+    Clients are disconnected when the controller link is lost, or sends
+    nothing for data_timeout seconds, the broker then reconnects with
+    backoff. A client which falls max_buffer bytes
+    behind is disconnected so it cannot slow down the others
+    """
+
+    port = 30002
+    retry_delay = 0.5
+    max_retry_delay = 30
+    max_buffer = 1 << 20
+
+    def __init__(self, address, path=None, control_timeout=10, data_timeout=3):
+        self.address = address
+        self.path = path or socket_path(address)
+        self.control_timeout = control_timeout
+        self.data_timeout = data_timeout
+        self.packets = 0
+        self._selector = selectors.DefaultSelector()
+        self._clients = {}  # socket -> _Client
+        self._owner = None
+        self._owner_time = 0
+        self._robot = None
+        self._robot_out = bytearray()
+        self._robot_in = b""
+        self._connecting = False
+        self._last_packet = None
+        self._last_data = 0  # time of the last packet, or of the connection start
+        self._failures = 0
+        self._retry_at = 0
+        self._stop = False
+        folder = os.path.dirname(self.path) or "."
+        if path is None:
+            os.makedirs(folder, 0o700, exist_ok=True)
+        if not _safe_dir(folder):
+            raise RuntimeError("{} is writable by other users, the broker socket could be replaced".format(folder))
+        if os.path.exists(self.path):
+            if _listening(self.path):
+                raise RuntimeError("A broker is already serving {}".format(self.path))
+            os.unlink(self.path)  # left over by a broker which did not exit cleanly
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # clients get the robot state and send programs, only to our user,
+        # from the start rather than with a chmod after bind
+        umask = os.umask(0o177)
+        try:
+            self._server.bind(self.path)
+        finally:
+            os.umask(umask)
+        self._server.listen(16)
+        self._server.setblocking(False)
+        self._selector.register(self._server, selectors.EVENT_READ, None)
+
+    def stop(self):
+        self._stop = True
+
+    def run(self):
+        try:
+            while not self._stop:
+                now = time.monotonic()
+                if self._robot is None and now >= self._retry_at:
+                    self._open(now)
+                if self._robot is not None and now - self._last_data > self.data_timeout:
+                    # half open link or hung controller, clients must not see old state as live
+                    print("No data from {} for {} s".format(self.address, self.data_timeout))
+                    self._robot_lost()
+                if self._owner is not None and now - self._owner_time > self.control_timeout:
+                    self._set_owner(None)
+                timeout = 1.0
+                if self._robot is None:
+                    timeout = min(timeout, max(self._retry_at - now, 0))
+                else:
+                    timeout = min(timeout, max(self._last_data + self.data_timeout - now, 0))
+                for key, mask in self._selector.select(timeout):
+                    if key.data is None:
+                        self._accept()
+                    elif key.data is self:
+                        self._robot_event(mask)
+                    else:
+                        self._client_event(key.data, mask)
+        finally:
+            self.close()
+
+    def close(self):
+        for client in list(self._clients.values()):
+            self._drop(client)
+        self._close_robot()
+        self._selector.close()
+        self._server.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    # controller side
+
+    def _open(self, now):
+        self._retry_at = now + backoff_delay(self._failures, self.retry_delay, self.max_retry_delay)
+        self._failures += 1
+        try:
+            addr = socket.getaddrinfo(self.address, self.port, socket.AF_INET, socket.SOCK_STREAM)[0][4]
+        except OSError as ex:
+            print("Could not resolve {}: {}".format(self.address, ex))
+            return
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        err = sock.connect_ex(addr)
+        if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+            sock.close()
+            return
+        self._robot = sock
+        self._connecting = True
+        self._last_data = now
+        self._robot_in = b""
+        self._robot_out = bytearray()
+        self._selector.register(sock, selectors.EVENT_WRITE, self)
+
+    def _robot_event(self, mask):
+        if self._robot is None:
+            return  # lost while handling an earlier event of the same select
+        if self._connecting:
+            if self._robot.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR):
+                self._robot_lost()
+                return
+            self._connecting = False
+            print("Connected to", self.address)
+            self._robot_events()
+            return
+        if mask & selectors.EVENT_WRITE:
+            self._flush_robot()
+        if mask & selectors.EVENT_READ:
+            self._read_robot()
+
+    def _read_robot(self):
+        try:
+            data = self._robot.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._robot_lost()
+            return
+        buf = self._robot_in + data
+        while len(buf) >= HEADER.size:
+            size, ptype = HEADER.unpack_from(buf)
+            if size < HEADER.size or size > MAX_PACKET or ptype != STATE:
+                buf = buf[1:]  # resynchronize, as urx does
+                continue
+            if len(buf) < size:
+                break
+            packet, buf = buf[:size], buf[size:]
+            self._publish(packet)
+        self._robot_in = buf
+
+    def _publish(self, packet):
+        self.packets += 1
+        self._failures = 0
+        self._last_packet = packet
+        self._last_data = time.monotonic()
+        for client in list(self._clients.values()):
+            self._send(client, packet)
+
+    def _forward(self, prog):
+        if self._robot is None or self._connecting:
+            return False
+        self._robot_out += prog
+        self._flush_robot()
+        return True
+
+    def _flush_robot(self):
+        try:
+            sent = self._robot.send(self._robot_out)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._robot_lost()
+            return
+        del self._robot_out[:sent]
+        self._robot_events()
+
+    def _robot_events(self):
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if self._robot_out else 0)
+        self._selector.modify(self._robot, events, self)
+
+    def _robot_lost(self):
+        if not self._connecting:
+            print("Lost connection to", self.address)
+        self._close_robot()
+        # clients see the link loss at once, as with a direct connection
+        for client in list(self._clients.values()):
+            self._drop(client)
+
+    def _close_robot(self):
+        if self._robot is None:
+            return
+        try:
+            self._selector.unregister(self._robot)
+        except (KeyError, ValueError):
+            pass
+        self._robot.close()
+        self._robot = None
+        self._connecting = False
+        self._last_packet = None
+
+    # client side
+
+    def _accept(self):
+        try:
+            sock, _ = self._server.accept()
+        except BlockingIOError:
+            return
+        if (self._robot is None or self._connecting or self._last_packet is None
+                or time.monotonic() - self._last_data > self.data_timeout):
+            sock.close()  # client fails to connect as it would without a robot
+            return
+        sock.setblocking(False)
+        client = _Client(sock)
+        self._clients[sock] = client
+        self._selector.register(sock, selectors.EVENT_READ, client)
+        self._send(client, message(self._control_state(client)))
+        # no need to wait for the next packet before the client has a state
+        self._send(client, self._last_packet)
+
+    def _client_event(self, client, mask):
+        if client.sock not in self._clients:
+            return  # dropped while handling an earlier event of the same select
+        if mask & selectors.EVENT_WRITE:
+            self._flush(client)
+        if mask & selectors.EVENT_READ and client.sock in self._clients:
+            self._read_client(client)
+
+    def _read_client(self, client):
+        try:
+            data = client.sock.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(client)
+            return
+        progs = (client.inbuf + data).split(b"\0")
+        client.inbuf = progs.pop()
+        for prog in progs:
+            self._program(client, prog)
+
+    def _program(self, client, prog):
+        cmd = prog.strip()
+        if cmd == RELEASE:
+            if self._owner is client:
+                self._set_owner(None)
+            return
+        if is_stop(prog):
+            # anyone may stop the robot
+            self._forward(prog)
+            return
+        if self._owner is None:
+            self._set_owner(client)
+        if self._owner is not client:
+            self._send(client, message("{} control held by another client".format(REJECTED)))
+            return
+        self._owner_time = time.monotonic()
+        if cmd != ACQUIRE:
+            self._forward(prog)
+
+    def _set_owner(self, client):
+        self._owner = client
+        self._owner_time = time.monotonic()
+        for other in list(self._clients.values()):
+            self._send(other, message(self._control_state(other)))
+
+    def _control_state(self, client):
+        if self._owner is None:
+            return CONTROL_FREE
+        return CONTROL_HELD if self._owner is client else CONTROL_TAKEN
+
+    def _send(self, client, data):
+        client.out += data
+        self._flush(client)
+
+    def _flush(self, client):
+        try:
+            sent = client.sock.send(client.out)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._drop(client)
+            return
+        del client.out[:sent]
+        if len(client.out) > self.max_buffer:
+            print("Dropping slow client")
+            self._drop(client)
+            return
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.out else 0)
+        self._selector.modify(client.sock, events, client)
+
+    def _drop(self, client):
+        if self._clients.pop(client.sock, None) is None:
+            return
+        try:
+            self._selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+        if self._owner is client:
+            self._set_owner(None)
+
+
+def run(address, path=None):
+    """
+    run a broker for robot at address until interrupted
+    """
+    broker = Broker(address, path)
+    signal.signal(signal.SIGTERM, lambda signum, frame: broker.stop())
+    print("Serving {} on {}".format(address, broker.path))
+    try:
+        broker.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
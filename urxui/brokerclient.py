@@ -0,0 +1,117 @@
+import logging
+import socket
+import threading
+
+import urx
+from urx.ursecmon import SecondaryMonitor, ParserUtils
+
+from urxui.broker import HEADER, MESSAGE, ACQUIRE, RELEASE, CONTROL_FREE
+
+
+class _FramedSocket(object):
+
+    """
+    Socket of a broker connection, as SecondaryMonitor uses it.
+    urx sends each program in one send(), we terminate it with a NUL byte
+    """
+
+    def __init__(self, sock):
+        self._sock = sock
+
+    def send(self, data):
+        self._sock.sendall(data + b"\0")
+        return len(data)
+
+    def recv(self, size):
+        return self._sock.recv(size)
+
+    def close(self):
+        self._sock.close()
+
+
+class BrokerMonitor(SecondaryMonitor):
+
+    """
+    SecondaryMonitor reading the state packets of a robot from a broker
+    Unix socket instead of the controller.
+    control is the last control state the broker reported, on_message,
+    if set, is called from the monitor thread with each broker message
+    """
+
+    def __init__(self, host, path):
+        # same state as SecondaryMonitor.__init__, which connects to the robot itself
+        threading.Thread.__init__(self)
+        self.logger = logging.getLogger("ursecmon")
+        self._parser = ParserUtils()
+        self._dict = {}
+        self._dictLock = threading.Lock()
+        self.host = host
+        self.path = path
+        self.control = CONTROL_FREE
+        self.on_message = None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(0.5)
+        try:
+            sock.connect(path)
+        except OSError:
+            sock.close()
+            raise
+        self._s_secondary = _FramedSocket(sock)
+        self._prog_queue = []
+        self._prog_queue_lock = threading.Lock()
+        self._dataqueue = bytes()
+        self._trystop = False
+        self.running = False
+        self._dataEvent = threading.Condition()
+        self.lastpacket_timestamp = 0
+
+        self.start()
+        self.wait()
+
+    def _get_data(self):
+        # the broker only sends whole packets, no need to look for them
+        while True:
+            if len(self._dataqueue) >= HEADER.size:
+                size, ptype = HEADER.unpack_from(self._dataqueue)
+                if len(self._dataqueue) >= size:
+                    packet, self._dataqueue = self._dataqueue[:size], self._dataqueue[size:]
+                    if ptype != MESSAGE:
+                        return packet
+                    self._message(packet[HEADER.size:].decode())
+                    continue
+            data = self._s_secondary.recv(65536)
+            if not data:
+                raise ConnectionResetError("Broker {} closed the connection".format(self.path))
+            self._dataqueue += data
+
+    def _message(self, text):
+        if text.startswith("control "):
+            self.control = text
+        if self.on_message:
+            self.on_message(text)
+
+
+class BrokerRobot(urx.Robot):
+
+    """
+    urx Robot whose state comes from the broker at path, programs are sent
+    through it too. host is the address of the robot, it is still used to
+    open direct connections from the robot, as the streamed jog does
+    """
+
+    def __init__(self, host, path):
+        # as URRobot.__init__ and Robot.__init__, with a broker monitor
+        import math3d as m3d
+        self.logger = logging.getLogger("urx")
+        self.host = host
+        self.secmon = BrokerMonitor(host, path)
+        self.rtmon = None
+        self.joinEpsilon = 0.01
+        self.max_float_length = 6
+        self.csys = m3d.Transform()
+
+    def acquire_control(self):
+        self.send_program(ACQUIRE.decode())
+
+    def release_control(self):
+        self.send_program(RELEASE.decode())
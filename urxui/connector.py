@@ -0,0 +1,139 @@
+import random
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import pyqtSignal, QObject, QTimer, Qt
+from PyQt5.QtWidgets import QStyledItemDelegate
+
+
+class Connector(QObject):
+
+    """
+    Create robot connections and probe addresses in background threads.
+    factory is called with the address and returns a connected robot,
+    for example urx.Robot.
+    Only one connection attempt is active at a time, an attempt which is
+    cancelled or times out is abandoned and its robot closed if it ever connects
+    """
+
+    connected = pyqtSignal(str, object)
+    failed = pyqtSignal(str, str)
+    probed = pyqtSignal(str, object)  # round trip time in seconds or None
+
+    _result = pyqtSignal(int, str, object, str)
+
+    def __init__(self, factory, parent=None, max_workers=16):
+        QObject.__init__(self, parent)
+        self.factory = factory
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._attempt = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._timed_out)
+        self._uri = None
+        self._result.connect(self._handle_result)
+
+    def is_connecting(self):
+        return self._timer.isActive()
+
+    def start(self, uri, timeout=5):
+        self._attempt += 1
+        self._uri = uri
+        self._timer.start(int(timeout * 1000))
+        self._executor.submit(self._connect, self._attempt, uri)
+
+    def cancel(self):
+        self._attempt += 1
+        self._timer.stop()
+
+    def probe(self, addresses, port=30002, timeout=1):
+        """
+        try to open a tcp connection to port of all addresses in parallel
+        and emit probed with the time it took
+        """
+        for addr in addresses:
+            self._executor.submit(self._probe, addr, port, timeout)
+
+    def close_robot(self, robot):
+        """
+        close robot in background, closing a robot whose link is dead may take a while
+        """
+        self._executor.submit(_close_robot, robot)
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _connect(self, attempt, uri):
+        try:
+            robot = self.factory(uri)
+        except Exception as ex:
+            self._result.emit(attempt, uri, None, str(ex) or ex.__class__.__name__)
+        else:
+            self._result.emit(attempt, uri, robot, "")
+
+    def _handle_result(self, attempt, uri, robot, error):
+        if attempt != self._attempt or not self._timer.isActive():
+            if robot is not None:
+                print("Closing abandoned connection to ", uri)
+                self.close_robot(robot)
+            return
+        self._timer.stop()
+        if robot is None:
+            self.failed.emit(uri, error)
+        else:
+            self.connected.emit(uri, robot)
+
+    def _timed_out(self):
+        self._attempt += 1
+        self.failed.emit(self._uri, "Connection to {} timed out".format(self._uri))
+
+    def _probe(self, addr, port, timeout):
+        start = time.monotonic()
+        try:
+            sock = socket.create_connection((addr, port), timeout=timeout)
+        except (OSError, ValueError):
+            rtt = None
+        else:
+            rtt = time.monotonic() - start
+            sock.close()
+        self.probed.emit(addr, rtt)
+
+
+def _close_robot(robot):
+    # urx joins its monitor thread in close(), but that thread never checks
+    # for stop while it spins on a connection closed by the robot.
+    # Closing its socket makes it exit
+    secmon = robot.secmon
+    secmon._trystop = True
+    secmon.join(1)
+    if secmon.is_alive():
+        secmon._s_secondary.close()
+    try:
+        robot.close()
+    except Exception as ex:
+        print("Error while closing connection to robot: ", ex)
+
+
+def backoff_delay(attempt, base=0.5, maximum=30, jitter=0.5):
+    """
+    delay before retry number attempt (starting at 0), doubling from base up to
+    maximum and randomly shortened by up to jitter times itself,
+    so many clients do not retry in lockstep
+    """
+    delay = min(base * 2 ** attempt, maximum)
+    return delay * (1 - random.uniform(0, jitter))
+
+
+class ProbeDelegate(QStyledItemDelegate):
+
+    """
+    Show probe result stored in Qt.UserRole next to the address in a combo box popup
+    """
+
+    def initStyleOption(self, option, index):
+        QStyledItemDelegate.initStyleOption(self, option, index)
+        status = index.data(Qt.UserRole)
+        if status:
+            option.text = "{}    ({})".format(option.text, status)
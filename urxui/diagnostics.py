@@ -0,0 +1,77 @@
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QWidget, QGridLayout, QLabel, QPushButton, QFileDialog
+
+
+class DiagnosticsPanel(QWidget):
+
+    """
+    Show jog, IO write, command and link latency percentiles, command
+    queue, link and render statistics of a Window
+    """
+
+    def __init__(self, window, parent=None):
+        QWidget.__init__(self, parent)
+        self.window = window
+        layout = QGridLayout(self)
+        for col, text in enumerate(("Jog latency (ms)", "count", "p50", "p95", "p99")):
+            layout.addWidget(QLabel(text), 0, col)
+        self._rows = {}
+        for row, name in enumerate(("press to sent", "press to motion", "IO write to ack", "command queued",
+                                   "packet interval", "link delay"), 1):
+            layout.addWidget(QLabel(name), row, 0)
+            self._rows[name] = [QLabel("-") for _ in range(4)]
+            for col, label in enumerate(self._rows[name], 1):
+                layout.addWidget(label, row, col)
+        self.commandLabel = QLabel()
+        layout.addWidget(self.commandLabel, 7, 0, 1, 5)
+        self.linkLabel = QLabel()
+        layout.addWidget(self.linkLabel, 8, 0, 1, 5)
+        self.renderLabel = QLabel()
+        layout.addWidget(self.renderLabel, 9, 0, 1, 5)
+        self.exportButton = QPushButton("Export latency samples")
+        self.exportButton.clicked.connect(self.export)
+        layout.addWidget(self.exportButton, 10, 0, 1, 2)
+        layout.setRowStretch(11, 1)
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(1000)
+
+    def refresh(self):
+        if not self.isVisible():
+            return
+        latency = self.window.latency
+        self._show("press to sent", latency.sent)
+        self._show("press to motion", latency.motion)
+        self._show("IO write to ack", self.window.io_latency)
+        commands = self.window.commands
+        self._show("command queued", commands.latency)
+        self.commandLabel.setText("Commands: {} queued, {} sent, {} replaced, {} dropped late, {} flushed by stop, {} hung".format(
+            commands.depth(), commands.dispatched, commands.replaced, commands.dropped, commands.flushed, commands.hung))
+        link = self.window.link
+        self._show("packet interval", link.interarrival)
+        self._show("link delay", link.delay)
+        self.linkLabel.setText("Link: {} packets, period {}, {} cycles lost, {} coalesced by us, clock offset {}".format(
+            link.packets, "-" if link.period is None else "{:.1f} ms".format(link.period * 1000),
+            link.lost, link.coalesced, "-" if link.offset is None else "{:.3f} s".format(link.offset)))
+        renderer = self.window.renderer
+        mailbox = self.window.mailbox
+        self.renderLabel.setText("Snapshots: {} published, {} dropped.  Render: {} frames, {} widget writes, {} skipped".format(
+            mailbox.published, mailbox.dropped, renderer.frames, renderer.writes, renderer.skipped))
+
+    def _show(self, name, hist):
+        labels = self._rows[name]
+        labels[0].setText(str(len(hist)))
+        for label, val in zip(labels[1:], hist.percentiles(50, 95, 99)):
+            label.setText("-" if val is None else "{:.1f}".format(val * 1000))
+
+    def export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export latency samples", "jog_latency.csv", "CSV (*.csv)")
+        if not path:
+            return
+        try:
+            count = self.window.latency.export(path)
+        except Exception as ex:
+            self.window.show_error(ex)
+            return
+        print("Exported {} latency samples to {}".format(count, path))
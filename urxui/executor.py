@@ -0,0 +1,225 @@
+import heapq
+import itertools
+import threading
+import time
+
+from PyQt5.QtCore import pyqtSignal, QObject, QTimer
+
+from urxui.latency import RollingHistogram
+
+
+# lanes, lower runs first
+STOP = 0
+CONFIG = 1
+MOTION = 2
+
+
+class _Command(object):
+
+    __slots__ = ("func", "args", "kwargs", "key", "deadline", "on_done", "queued", "cancelled")
+
+    def __init__(self, func, args, kwargs, key, deadline, on_done, queued):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.key = key
+        self.deadline = deadline
+        self.on_done = on_done
+        self.queued = queued
+        self.cancelled = False
+
+
+class CommandExecutor(QObject):
+
+    """
+    Run robot commands in one background thread, so a slow call never
+    blocks the GUI.
+    Commands are queued in lanes, CONFIG before MOTION, and in submission
+    order within a lane. STOP commands are not queued, each runs at once in
+    its own thread, so a call blocked on a dead link never holds back a
+    stop; commands submitted after a stop wait until it returned.
+    A command submitted with a key replaces the queued command with the same
+    key, a command submitted with max_age is dropped if it waited longer than
+    that, so jog commands are never replayed late.
+    stop() flushes everything queued and runs its command.
+    restart() also leaves a running command behind, for a robot change.
+    Time from submission to dispatch is kept in latency, errors and commands
+    running longer than hang_timeout seconds are emitted with failed
+    """
+
+    failed = pyqtSignal(str)
+
+    hang_timeout = 2.0  # s
+
+    def __init__(self, parent=None, latency_size=1000):
+        QObject.__init__(self, parent)
+        self.latency = RollingHistogram(latency_size)
+        self.dispatched = 0
+        self.replaced = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.hung = 0
+        self._cond = threading.Condition()
+        self._queue = []  # heap of (lane, seq, command)
+        self._keys = {}  # key -> queued command
+        self._depth = 0
+        self._seq = itertools.count()
+        self._stop = False
+        self._stops = set()  # stop commands running, the queue waits for them
+        self._running = {}  # command -> [dispatch time, reported as hung]
+        self._thread = None
+        self._start_thread()
+        self._hang_timer = QTimer(self)
+        self._hang_timer.timeout.connect(self._check_hung)
+        self._hang_timer.start(int(self.hang_timeout * 500))
+
+    def _start_thread(self):
+        self._thread = thread = threading.Thread(target=self._run, name="urxui-commands", daemon=True)
+        thread.start()
+
+    def submit(self, lane, func, *args, key=None, max_age=None, on_done=None, **kwargs):
+        """
+        queue func(*args, **kwargs) in lane, on_done is called without
+        argument from the executor thread once func returned
+        """
+        now = time.monotonic()
+        deadline = None if max_age is None else now + max_age
+        cmd = _Command(func, args, kwargs, key, deadline, on_done, now)
+        if lane == STOP:
+            with self._cond:
+                stops = self._stops
+                stops.add(cmd)
+            threading.Thread(target=self._run_stop, args=(cmd, stops), name="urxui-stop", daemon=True).start()
+            return
+        with self._cond:
+            if key is not None:
+                old = self._keys.get(key)
+                if old is not None:
+                    old.cancelled = True
+                    self._depth -= 1
+                    self.replaced += 1
+                self._keys[key] = cmd
+            heapq.heappush(self._queue, (lane, next(self._seq), cmd))
+            self._depth += 1
+            self._cond.notify()
+
+    def stop(self, func, *args, **kwargs):
+        """
+        drop all queued commands and run func(*args, **kwargs) at once
+        """
+        with self._cond:
+            self._flush()
+        self.submit(STOP, func, *args, **kwargs)
+
+    def flush(self):
+        """
+        drop all queued commands, return how many were dropped
+        """
+        with self._cond:
+            return self._flush()
+
+    def restart(self):
+        """
+        drop all queued commands and forget running ones, a command blocked
+        on the previous robot finishes in its thread but the next ones are
+        dispatched from a new thread
+        """
+        with self._cond:
+            self._flush()
+            self._stops = set()
+            self._running.clear()
+            if self._thread is not None:
+                self._thread = None
+                self._cond.notify_all()
+        self._start_thread()
+
+    def depth(self):
+        """
+        number of commands waiting for dispatch
+        """
+        return self._depth
+
+    def close(self, timeout=None):
+        self._hang_timer.stop()
+        with self._cond:
+            self._flush()
+            self._stop = True
+            thread = self._thread
+            self._cond.notify_all()
+        thread.join(timeout)
+
+    def _flush(self):
+        count = self._depth
+        for _, _, cmd in self._queue:
+            cmd.cancelled = True
+        self._queue = []
+        self._keys.clear()
+        self._depth = 0
+        self.flushed += count
+        return count
+
+    def _next(self, thread):
+        with self._cond:
+            while True:
+                while (not self._queue or self._stops) and not self._stop and thread is self._thread:
+                    self._cond.wait()
+                if self._stop or thread is not self._thread:
+                    return None
+                _, _, cmd = heapq.heappop(self._queue)
+                if cmd.cancelled:
+                    continue
+                self._depth -= 1
+                if cmd.key is not None:
+                    del self._keys[cmd.key]
+                if cmd.deadline is not None and time.monotonic() > cmd.deadline:
+                    self.dropped += 1
+                    continue
+                return cmd
+
+    def _run(self):
+        thread = threading.current_thread()
+        while True:
+            cmd = self._next(thread)
+            if cmd is None:
+                return
+            self._dispatch(cmd)
+
+    def _run_stop(self, cmd, stops):
+        self._dispatch(cmd)
+        with self._cond:
+            stops.discard(cmd)
+            self._cond.notify_all()
+
+    def _dispatch(self, cmd):
+        now = time.monotonic()
+        self.latency.add(now - cmd.queued)
+        with self._cond:
+            self.dispatched += 1
+            self._running[cmd] = [now, False]
+        try:
+            cmd.func(*cmd.args, **cmd.kwargs)
+        except Exception as ex:
+            self.failed.emit("{} failed: {}".format(_name(cmd), ex))
+            return
+        finally:
+            with self._cond:
+                self._running.pop(cmd, None)
+        if cmd.on_done:
+            cmd.on_done()
+
+    def _check_hung(self):
+        # python cannot abort a call, we can only tell it is stuck
+        now = time.monotonic()
+        hung = []
+        with self._cond:
+            for cmd, state in self._running.items():
+                if not state[1] and now - state[0] > self.hang_timeout:
+                    state[1] = True
+                    hung.append(cmd)
+            self.hung += len(hung)
+        for cmd in hung:
+            self.failed.emit("{} did not return after {:g} s, is the robot still connected?".format(_name(cmd), self.hang_timeout))
+
+
+def _name(cmd):
+    return getattr(cmd.func, "__name__", "Command")
@@ -0,0 +1,451 @@
+#! /usr/bin/env python3
+"""
+Simulated UR controller for development and load testing without a robot.
+It serves the secondary interface state stream (firmware 3.2 format) at a
+configurable rate, executes the few URScript commands urxui sends
+(speedl, speedj, stopj, stopl, movel, movej, digital and analog outputs
+and the streamed jog program) on a simple UR5 kinematic model, and can
+inject latency, jitter and packet loss on the stream.
+"""
+
+import argparse
+import heapq
+import logging
+import math
+import random
+import re
+import socket
+import struct
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+# UR5 DH parameters
+DH_D = [0.089159, 0, 0, 0.10915, 0.09465, 0.0823]
+DH_A = [0, -0.425, -0.39225, 0, 0, 0]
+DH_ALPHA = [math.pi / 2, 0, 0, math.pi / 2, -math.pi / 2, 0]
+
+HOME = [0, -1.57, 1.57, -1.57, -1.57, 0]
+
+
+def forward(joints):
+    """
+    return list of the 7 frames from base to tcp as 4x4 matrices
+    """
+    frames = [np.identity(4)]
+    for q, d, a, alpha in zip(joints, DH_D, DH_A, DH_ALPHA):
+        cq, sq, ca, sa = math.cos(q), math.sin(q), math.cos(alpha), math.sin(alpha)
+        frames.append(frames[-1].dot(np.array([[cq, -sq * ca, sq * sa, a * cq],
+                                               [sq, cq * ca, -cq * sa, a * sq],
+                                               [0, sa, ca, d],
+                                               [0, 0, 0, 1]])))
+    return frames
+
+
+def jacobian(frames):
+    tcp = frames[-1][:3, 3]
+    jac = np.zeros((6, 6))
+    for i in range(6):
+        z = frames[i][:3, 2]
+        jac[:3, i] = np.cross(z, tcp - frames[i][:3, 3])
+        jac[3:, i] = z
+    return jac
+
+
+def rotvec(rot):
+    angle = math.acos(max(-1.0, min(1.0, (np.trace(rot) - 1) / 2)))
+    if angle < 1e-9:
+        return np.zeros(3)
+    if angle > math.pi - 1e-3:
+        # axis is ill defined from the skew part, use the symmetric part
+        # (R + R^T) / 2 = cos(angle) I + (1 - cos(angle)) kk^T
+        cos = math.cos(angle)
+        sym = ((rot + rot.T) / 2 - cos * np.identity(3)) / (1 - cos)
+        col = int(np.argmax(np.diagonal(sym)))
+        axis = sym[:, col] / math.sqrt(sym[col, col])
+        if np.dot(axis, [rot[2, 1] - rot[1, 2], rot[0, 2] - rot[2, 0], rot[1, 0] - rot[0, 1]]) < 0:
+            axis = -axis
+        return axis * angle
+    axis = np.array([rot[2, 1] - rot[1, 2], rot[0, 2] - rot[2, 0], rot[1, 0] - rot[0, 1]])
+    return axis / (2 * math.sin(angle)) * angle
+
+
+def rotmat(vec):
+    vec = np.asarray(vec, dtype=float)
+    angle = np.linalg.norm(vec)
+    if angle < 1e-12:
+        return np.identity(3)
+    k = vec / angle
+    kx = np.array([[0, -k[2], k[1]], [k[2], 0, -k[0]], [-k[1], k[0], 0]])
+    return np.identity(3) + math.sin(angle) * kx + (1 - math.cos(angle)) * kx.dot(kx)
+
+
+class FakeController(object):
+
+    """
+    Kinematic model of a UR5 driven by URScript programs.
+    Call step() at a fixed period, a new program aborts the running one
+    """
+
+    joint_acc_max = 3.0
+
+    def __init__(self, joints=HOME):
+        self.lock = threading.Lock()
+        self.time = 0.0
+        self.joints = np.array(joints, dtype=float)
+        self.qd = np.zeros(6)
+        self.bits = 0
+        self.analog_out = [0.0, 0.0]
+        self._target = None  # (kind, velocity, acc) kind is "speedj" or "speedl"
+        self._program = None
+
+    def pose(self):
+        frame = forward(self.joints)[-1]
+        return list(frame[:3, 3]) + list(rotvec(frame[:3, :3]))
+
+    def run_program(self, prog):
+        with self.lock:
+            if prog.startswith("sec "):
+                # secondary programs run next to the current one, we only run
+                # their statements that return at once
+                for line in prog.splitlines()[1:-1]:
+                    for _ in self._statement(line.strip()):
+                        break
+                return
+            self._target = None
+            self._program = self._interpret(prog)
+
+    def step(self, dt):
+        with self.lock:
+            self.time += dt
+            if self._program is not None:
+                try:
+                    next(self._program)
+                except StopIteration:
+                    self._program = None
+                    self._target = None
+                except Exception as ex:
+                    logging.warning("Program aborted: %s", ex)
+                    self._program = None
+                    self._target = None
+            self._integrate(dt)
+
+    def _integrate(self, dt):
+        if self._target is None:
+            wanted, acc = np.zeros(6), self.joint_acc_max
+        else:
+            kind, vel, acc = self._target
+            if kind == "speedl":
+                wanted = np.linalg.pinv(jacobian(forward(self.joints))).dot(vel)
+            else:
+                wanted = vel
+        # joint space acceleration limit, good enough for a simulation
+        dv = np.clip(wanted - self.qd, -acc * dt, acc * dt)
+        self.qd += dv
+        self.joints += self.qd * dt
+
+    def _interpret(self, prog):
+        lines = [line.strip() for line in prog.splitlines()]
+        for line in lines:
+            match = re.match(r'socket_open\("([^"]+)",\s*(\d+)', line)
+            if match:
+                yield from self._jog_stream(match.group(1), int(match.group(2)), prog)
+                return
+            yield from self._statement(line)
+
+    def _statement(self, line):
+        match = re.match(r"(speedl|speedj)\(\[([^\]]*)\]\s*,\s*(?:a=)?([-\d.e]+)(?:\s*,\s*(?:t_min=|t=)?([-\d.e]+))?", line)
+        if match:
+            kind, vels, acc, duration = match.groups()
+            self._target = (kind, np.array(_floats(vels)), max(float(acc), 1e-3))
+            end = self.time + float(duration or 0)
+            while self.time < end:
+                yield
+            return
+        match = re.match(r"(movel|movej)\((p?)\[([^\]]*)\](.*)\)", line)
+        if match:
+            kind, prefix, target, args = match.groups()
+            vel = float(_arg(args, "v", 0.25))
+            acc = float(_arg(args, "a", 1.2))
+            radius = float(_arg(args, "r", 0))
+            yield from self._move(kind, prefix == "p", np.array(_floats(target)), vel, acc, radius)
+            return
+        match = re.match(r"(stopj|stopl)\(", line)
+        if match:
+            self._target = None
+            return
+        match = re.match(r"(?:digital_out\[(\d+)\]\s*=\s*|set_(?:standard_)?digital_out\((\d+),\s*)(True|False)", line)
+        if match:
+            self._set_bit(int(match.group(1) or match.group(2)), match.group(3) == "True")
+            return
+        match = re.match(r"set_tool_digital_out\((\d+),\s*(True|False)", line)
+        if match:
+            self._set_bit(16 + int(match.group(1)), match.group(2) == "True")
+            return
+        match = re.match(r"set_(?:standard_)?analog_out\((\d+),\s*([-\d.e]+)", line)
+        if match:
+            self.analog_out[int(match.group(1))] = float(match.group(2))
+            return
+
+    def _set_bit(self, num, val):
+        if val:
+            self.bits |= 1 << num
+        else:
+            self.bits &= ~(1 << num)
+
+    def _move(self, kind, is_pose, target, vel, acc, radius=0):
+        # with a blend radius we go on to the next move without slowing down,
+        # for movej the radius is compared to the joint error, close enough here
+        tolerance = max(radius, 1e-4)
+        while True:
+            frames = forward(self.joints)
+            if kind == "movej" and not is_pose:
+                error = target - self.joints
+                if np.max(np.abs(error)) < tolerance:
+                    break
+                dist = np.max(np.abs(error))
+                self._target = ("speedj", error / dist * min(vel, dist * 5), acc * 10)
+            else:
+                tcp = frames[-1]
+                error = np.concatenate((target[:3] - tcp[:3, 3], rotvec(rotmat(target[3:]).dot(tcp[:3, :3].T))))
+                dist = np.linalg.norm(error)
+                if dist < tolerance:
+                    break
+                self._target = ("speedl", error / dist * min(vel, dist * 5), acc * 10)
+            yield
+        if not radius:
+            self._target = None
+
+    def _jog_stream(self, host, port, prog):
+        # setpoints are applied in order, each for the t of its speed
+        # command, as the controller reads them, unless the program skips
+        # to the newest queued one after each read
+        match = re.search(r'socket_read_ascii_float\(8,\s*"\w+",\s*([\d.e]+)\)', prog)
+        timeout = float(match.group(1)) if match else 2
+        match = re.search(r"speed[lj]\(.*,\s*([\d.e]+)\)\s*$", prog, re.M)
+        hold = float(match.group(1)) if match else 0
+        skip = prog.count("socket_read_ascii_float") > 1
+        sock = socket.create_connection((host, port), timeout=2)
+        sock.setblocking(False)
+        buf = b""
+        queue = deque()
+        end = self.time
+        try:
+            while True:
+                try:
+                    data = sock.recv(4096)
+                    if not data:
+                        break
+                    buf += data
+                except BlockingIOError:
+                    pass
+                *msgs, buf = buf.split(b"\n")
+                queue.extend(msgs)
+                if self.time >= end:
+                    if not queue:
+                        if self.time - end >= timeout:
+                            break
+                        yield
+                        continue
+                    msg = queue.popleft()
+                    while skip and queue:
+                        msg = queue.popleft()
+                    cmd = _floats(msg.decode().strip("()"))
+                    if cmd[0] == 0:
+                        break
+                    self._target = ("speedl" if cmd[0] == 1 else "speedj", np.array(cmd[2:8]), max(cmd[1], 1e-3))
+                    end = self.time + hold
+                yield
+        finally:
+            sock.close()
+            self._target = None
+
+    def packet(self):
+        """
+        state as one secondary interface packet in firmware 3.2 format
+        """
+        with self.lock:
+            joints = list(self.joints)
+            qd = list(self.qd)
+            pose = self.pose()
+            bits = self.bits
+            aout = self.analog_out
+            running_prog = self._program is not None
+            tstamp = int(self.time * 1000)
+        mode = struct.pack("!iBQ???????BBddd", 46, 0, tstamp,
+                           True, True, True, False, False, running_prog, False, 7, 0, 1.0, 1.0, 1.0)
+        jdata = struct.pack("!iB", 251, 1) + b"".join(
+            struct.pack("!dddffffB", q, q, v, 0, 48, 30, 30, 253) for q, v in zip(joints, qd))
+        cart = struct.pack("!iB12d", 101, 4, *(pose + [0] * 6))
+        # analog outputs in voltage domain, reported in V
+        board = struct.pack("!iBiibbddbbddffffBBb", 68, 3, 0, bits, 0, 0, 0, 0, 1, 1, aout[0] * 10, aout[1] * 10, 35, 48, 1, 0.1, 0, 0, 0)
+        body = mode + jdata + cart + board
+        return struct.pack("!iB", len(body) + 5, 16) + body
+
+
+def _floats(text):
+    return [float(v) for v in text.split(",") if v.strip()]
+
+
+def _arg(args, name, default):
+    match = re.search(r"\b{}\s*=\s*([-\d.e]+)".format(name), args)
+    return match.group(1) if match else default
+
+
+class FakeRobotServer(object):
+
+    """
+    Serve a FakeController on the secondary interface port.
+    rate is the state packet rate in Hz, latency and jitter in seconds
+    delay packets and programs, loss is the probability to drop a packet
+    """
+
+    def __init__(self, host="127.0.0.1", port=30002, rate=10, latency=0, jitter=0, loss=0, step=0.002):
+        self.controller = FakeController()
+        self.rate = rate
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.step = step
+        self._stopev = threading.Event()
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((host, port))
+        self._server.listen(16)
+        self.address = self._server.getsockname()
+        self._threads = []
+
+    def start(self):
+        for target in (self._simulate, self._accept):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stopev.set()
+        self._server.close()
+
+    def _delay(self):
+        return self.latency + random.uniform(0, self.jitter)
+
+    def _simulate(self):
+        next_step = time.monotonic()
+        while not self._stopev.is_set():
+            self.controller.step(self.step)
+            next_step += self.step
+            self._stopev.wait(max(next_step - time.monotonic(), 0))
+
+    def _accept(self):
+        while not self._stopev.is_set():
+            try:
+                conn, addr = self._server.accept()
+            except OSError:
+                return
+            logging.info("Client connected from %s", addr)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            for target in (self._send_state, self._receive):
+                threading.Thread(target=target, args=(conn,), daemon=True).start()
+
+    def _send_state(self, conn):
+        queue = []
+        last_due = 0
+        next_packet = time.monotonic()
+        try:
+            while not self._stopev.is_set():
+                now = time.monotonic()
+                if now >= next_packet:
+                    next_packet += 1.0 / self.rate
+                    if random.random() >= self.loss:
+                        # tcp keeps order, a late packet delays the next ones
+                        last_due = max(last_due, now + self._delay())
+                        queue.append((last_due, self.controller.packet()))
+                while queue and queue[0][0] <= now:
+                    conn.sendall(queue.pop(0)[1])
+                wake = next_packet if not queue else min(next_packet, queue[0][0])
+                self._stopev.wait(max(wake - time.monotonic(), 0))
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    def _receive(self, conn):
+        buf = ""
+        pending = []
+        try:
+            while not self._stopev.is_set():
+                data = conn.recv(65536)
+                if not data:
+                    return
+                buf += data.decode(errors="replace")
+                progs, buf = _split_programs(buf)
+                for prog in progs:
+                    heapq.heappush(pending, (time.monotonic() + self._delay(), prog))
+                while pending:
+                    due, prog = heapq.heappop(pending)
+                    time.sleep(max(due - time.monotonic(), 0))
+                    logging.debug("Running program: %s", prog)
+                    self.controller.run_program(prog)
+        except OSError:
+            pass
+
+
+def _split_programs(buf):
+    """
+    split received text into complete programs, either single lines or
+    def/sec ... end blocks, return them and what is left
+    """
+    progs = []
+    lines = buf.split("\n")
+    rest = lines.pop()
+    block = None
+    for line in lines:
+        if block is not None:
+            block.append(line)
+            if line.rstrip() == "end":
+                progs.append("\n".join(block))
+                block = None
+        elif line.startswith(("def ", "sec ")):
+            block = [line]
+        elif line.strip():
+            progs.append(line)
+    if block is not None:
+        rest = "\n".join(block + [rest])
+    return progs, rest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated UR controller for urxui")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=30002)
+    parser.add_argument("--count", type=int, default=1,
+                        help="number of robots, on consecutive addresses starting at host")
+    parser.add_argument("--rate", type=float, default=10, help="state packets per second")
+    parser.add_argument("--latency", type=float, default=0, help="ms")
+    parser.add_argument("--jitter", type=float, default=0, help="ms")
+    parser.add_argument("--loss", type=float, default=0, help="packet loss probability")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+
+    base = [int(v) for v in args.host.split(".")]
+    servers = []
+    for idx in range(args.count):
+        host = ".".join(str(v) for v in base[:3] + [base[3] + idx])
+        server = FakeRobotServer(host, args.port, args.rate, args.latency / 1000, args.jitter / 1000, args.loss)
+        server.start()
+        servers.append(server)
+        logging.info("Fake robot listening on %s:%s", host, args.port)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    for server in servers:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
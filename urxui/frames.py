@@ -0,0 +1,109 @@
+import ast
+import math
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=64)
+def parse_csys(text):
+    """
+    parse a coordinate system as typed in the csys combo box, either a pose
+    vector [x, y, z, rx, ry, rz] or a 4x4 matrix, and return it as a
+    read only 4x4 matrix. Results are cached so entries of the csys list are
+    parsed once. Raise ValueError if text is not a valid coordinate system
+    """
+    try:
+        value = np.array(ast.literal_eval(text), dtype=float)
+    except (ValueError, SyntaxError, TypeError) as ex:
+        raise ValueError("Invalid csys {}: {}".format(text, ex))
+    if value.shape == (6,):
+        matrix = pose_to_matrix(value)
+    elif value.shape == (4, 4):
+        matrix = value
+    else:
+        raise ValueError("Invalid csys {}: expected 6 values or a 4x4 matrix".format(text))
+    matrix.flags.writeable = False
+    return matrix
+
+
+def pose_to_matrix(pose, out=None):
+    """
+    4x4 matrix of a pose vector [x, y, z, rx, ry, rz], rotation as rotation vector
+    """
+    if out is None:
+        out = np.identity(4)
+    vec = np.asarray(pose[3:6], dtype=float)
+    angle = math.sqrt(vec.dot(vec))
+    if angle < 1e-12:
+        out[:3, :3] = np.identity(3)
+    else:
+        kx, ky, kz = vec / angle
+        cos, sin = math.cos(angle), math.sin(angle)
+        t = 1 - cos
+        out[:3, :3] = ((t * kx * kx + cos, t * kx * ky - sin * kz, t * kx * kz + sin * ky),
+                       (t * kx * ky + sin * kz, t * ky * ky + cos, t * ky * kz - sin * kx),
+                       (t * kx * kz - sin * ky, t * ky * kz + sin * kx, t * kz * kz + cos))
+    out[:3, 3] = pose[:3]
+    return out
+
+
+def matrices_to_poses(matrices):
+    """
+    pose vectors, shape (n, 6), of a stack of 4x4 matrices of shape (n, 4, 4)
+    """
+    rot = matrices[:, :3, :3]
+    poses = np.empty((len(matrices), 6))
+    poses[:, :3] = matrices[:, :3, 3]
+    cos = np.clip((np.trace(rot, axis1=1, axis2=2) - 1) / 2, -1.0, 1.0)
+    angle = np.arccos(cos)
+    skew = np.stack((rot[:, 2, 1] - rot[:, 1, 2], rot[:, 0, 2] - rot[:, 2, 0], rot[:, 1, 0] - rot[:, 0, 1]), axis=1)
+    sin = np.sin(angle)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        poses[:, 3:] = skew * (angle / (2 * sin))[:, None]
+    poses[angle < 1e-9, 3:] = 0
+    for idx in np.nonzero(angle > math.pi - 1e-3)[0]:
+        # axis is ill defined from the skew part, use the symmetric part
+        # (R + R^T) / 2 = cos(angle) I + (1 - cos(angle)) kk^T
+        sym = ((rot[idx] + rot[idx].T) / 2 - cos[idx] * np.identity(3)) / (1 - cos[idx])
+        col = int(np.argmax(np.diagonal(sym)))
+        axis = sym[:, col] / math.sqrt(sym[col, col])
+        if axis.dot(skew[idx]) < 0:
+            axis = -axis
+        poses[idx, 3:] = axis * angle[idx]
+    return poses
+
+
+class FrameSet(object):
+
+    """
+    Express a TCP pose in several coordinate systems at once.
+    Frames are given once as 4x4 matrices in base, their inverses are stacked
+    so each update is one batched matrix multiply
+    """
+
+    def __init__(self):
+        self.names = []
+        self._inverses = np.zeros((0, 4, 4))
+        self._tcp = np.identity(4)
+
+    def set_frames(self, frames, csys=None):
+        """
+        frames is a list of (name, 4x4 matrix in base).
+        csys is the matrix of the coordinate system poses given to poses()
+        are expressed in, default is base
+        """
+        self.names = [name for name, _ in frames]
+        if not frames:
+            self._inverses = np.zeros((0, 4, 4))
+            return
+        self._inverses = np.linalg.inv(np.stack([matrix for _, matrix in frames]))
+        if csys is not None:
+            self._inverses = self._inverses @ csys
+
+    def poses(self, pose):
+        """
+        pose vector expressed in each frame, shape (number of frames, 6)
+        """
+        pose_to_matrix(pose, self._tcp)
+        return matrices_to_poses(self._inverses @ self._tcp)
@@ -0,0 +1,70 @@
+import numpy as np
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView
+
+from urxui.frames import FrameSet, parse_csys
+
+
+COLUMNS = ["x", "y", "z", "rx", "ry", "rz"]
+
+
+class FramesPanel(QWidget):
+
+    """
+    Show the current TCP pose in base, in tool (the TCP offset from the flange)
+    and in every coordinate system of the csys list of a Window.
+    Poses are converted locally from each rendered snapshot
+    """
+
+    def __init__(self, window, parent=None):
+        QWidget.__init__(self, parent)
+        self.window = window
+        self.frames = FrameSet()
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.table)
+        self._texts = []
+        window.renderer.listeners.append(self.render_state)
+
+    def set_frames(self, csys_list, csys):
+        """
+        csys_list are the texts of the user frames, csys the text of the
+        coordinate system the snapshot poses are expressed in
+        """
+        frames = [("base", np.identity(4))]
+        for text in csys_list:
+            try:
+                frames.append((text, parse_csys(text)))
+            except ValueError:
+                pass  # not shown, error is reported when it is selected
+        self.frames.set_frames(frames, parse_csys(csys))
+        names = ["base", "tool"] + self.frames.names[1:]
+        self.table.setRowCount(len(names))
+        self.table.setVerticalHeaderLabels(names)
+        self._texts = [[None] * len(COLUMNS) for _ in names]
+
+    def render_state(self, state):
+        if not self.isVisible() or not self._texts:
+            return
+        if state.connected:
+            poses = self.frames.poses(state.pose)
+            rows = [poses[0], self._tcp_offset()] + list(poses[1:])
+        else:
+            rows = [None] * len(self._texts)
+        for row, values in enumerate(rows):
+            for col in range(len(COLUMNS)):
+                text = "-" if values is None else "{:.4f}".format(values[col])
+                if text != self._texts[row][col]:
+                    self._texts[row][col] = text
+                    self.table.setItem(row, col, QTableWidgetItem(text))
+
+    def _tcp_offset(self):
+        robot = self.window.robot
+        if robot is None:
+            return None
+        cart = robot.secmon.get_cartesian_info()
+        if not cart or "tcpOffsetX" not in cart:
+            return None  # firmware older than 3.2
+        return [cart[key] for key in ("tcpOffsetX", "tcpOffsetY", "tcpOffsetZ", "tcpOffsetRx", "tcpOffsetRy", "tcpOffsetRz")]
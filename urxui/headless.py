@@ -0,0 +1,201 @@
+"""
+Stream the state of one robot without any GUI, for monitoring scripts.
+States are read by a SecondaryPoller and written at a fixed rate, only when
+a new packet arrived, either as one JSON object per line or as fixed size
+binary records, to stdout or to every client of a Unix socket.
+"""
+
+import json
+import os
+import selectors
+import signal
+import socket
+import stat
+import struct
+import sys
+import time
+
+from urxui.poller import SecondaryPoller
+
+
+# host time, controller time, connected, running, digital output bits,
+# pose, joints, analog outputs, all little endian, 134 bytes
+RECORD = struct.Struct("<ddBBI6d6d2d")
+
+
+def encode_json(state):
+    if not state.connected:
+        return (json.dumps({"t": time.time(), "connected": False}) + "\n").encode()
+    return (json.dumps({"t": state.host_time,
+                        "timestamp": state.timestamp,
+                        "connected": True,
+                        "running": state.running,
+                        "pose": list(state.pose),
+                        "joints": list(state.joints),
+                        "bits": state.bits,
+                        "analog": list(state.analog)}) + "\n").encode()
+
+
+def encode_binary(state):
+    if not state.connected:
+        return RECORD.pack(time.time(), 0.0, 0, 0, 0, *([0.0] * 14))
+    return RECORD.pack(state.host_time, state.timestamp, 1, state.running, state.bits,
+                       *state.pose, *state.joints, *state.analog)
+
+
+class StreamSink(object):
+
+    """
+    Write records to a binary file object, stdout by default
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout.buffer
+
+    def write(self, data):
+        self.stream.write(data)
+        self.stream.flush()
+
+    def wait(self, timeout):
+        if timeout > 0:
+            time.sleep(timeout)
+
+    def close(self):
+        pass
+
+
+class SocketSink(object):
+
+    """
+    Serve records to any number of clients of a Unix socket at path.
+    Clients only get records written after they connected, a client which
+    does not read fast enough to keep less than max_buffer bytes pending
+    is disconnected so it cannot slow down the others
+    """
+
+    max_buffer = 1 << 20
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)  # left over by a previous run
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(path)
+        self._server.listen(16)
+        self._server.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._server, selectors.EVENT_READ, None)
+        self._clients = {}  # socket -> pending bytes
+
+    def write(self, data):
+        for sock in list(self._clients):
+            self._clients[sock] += data
+            self._flush(sock)
+
+    def wait(self, timeout):
+        end = time.monotonic() + max(timeout, 0)
+        while True:
+            for key, mask in self._selector.select(max(end - time.monotonic(), 0)):
+                if key.data is None:
+                    self._accept()
+                elif mask & selectors.EVENT_READ:
+                    self._read(key.fileobj)
+                else:
+                    self._flush(key.fileobj)
+            if time.monotonic() >= end:
+                return
+
+    def close(self):
+        for sock in list(self._clients):
+            self._drop(sock)
+        self._selector.close()
+        self._server.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def _accept(self):
+        try:
+            sock, _ = self._server.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        self._clients[sock] = bytearray()
+        self._selector.register(sock, selectors.EVENT_READ, sock)
+
+    def _read(self, sock):
+        # clients have nothing to say, we only notice when they leave
+        try:
+            data = sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(sock)
+
+    def _flush(self, sock):
+        buf = self._clients[sock]
+        try:
+            sent = sock.send(buf)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._drop(sock)
+            return
+        del buf[:sent]
+        if len(buf) > self.max_buffer:
+            print("Dropping slow client", file=sys.stderr)
+            self._drop(sock)
+            return
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if buf else 0)
+        self._selector.modify(sock, events, sock)
+
+    def _drop(self, sock):
+        self._clients.pop(sock, None)
+        try:
+            self._selector.unregister(sock)
+        except (KeyError, ValueError):
+            pass
+        sock.close()
+
+
+def run(address, rate=10, path=None, binary=False, stream=None, connect_timeout=5, data_timeout=3):
+    """
+    stream state of robot at address until interrupted or stdout is closed.
+    A record with connected false is written when the robot did not send
+    anything for data_timeout seconds
+    """
+    # clean up the socket file when stopped by a service manager too
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    poller = SecondaryPoller(connect_timeout, data_timeout)
+    mailbox = poller.add(address)
+    poller.start()
+    sink = SocketSink(path) if path else StreamSink(stream)
+    encode = encode_binary if binary else encode_json
+    period = 1.0 / rate
+    connected = False
+    next_tick = time.monotonic()
+    try:
+        while True:
+            state = mailbox.take()
+            # a disconnection is written once, then nothing until we are back
+            if state is not None and (state.connected or connected):
+                connected = state.connected
+                sink.write(encode(state))
+            next_tick += period
+            now = time.monotonic()
+            if next_tick < now:
+                next_tick = now  # we were late, do not try to catch up
+            sink.wait(next_tick - now)
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        if stream is None and not path:
+            # reader of stdout went away, do not fail again when python flushes it at exit
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        poller.stop()
+        sink.close()
+    return 0
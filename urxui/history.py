@@ -0,0 +1,131 @@
+import threading
+
+import numpy as np
+
+
+BLOCK = 32  # samples summarized by one min/max block
+
+SERIES = 12  # 6 joints followed by 6 pose values
+
+
+class StateHistory(object):
+
+    """
+    In memory history of joints and pose for plotting, keeping the last
+    capacity samples. Besides raw samples we keep the min and max of every
+    BLOCK samples, so a window of any length can be decimated to a few
+    pixels in about the same time.
+    Samples are stored in a linear buffer a bit larger than capacity and
+    compacted when its end is reached, so any window is a contiguous slice
+    """
+
+    def __init__(self, capacity=450000):
+        self.capacity = capacity - capacity % BLOCK
+        size = self.capacity + max(self.capacity // 4, BLOCK)
+        size -= size % BLOCK
+        self._lock = threading.Lock()
+        self._time = np.zeros(size)
+        self._values = np.zeros((size, SERIES), np.float32)
+        self._btime = np.zeros(size // BLOCK)
+        self._bmin = np.zeros((size // BLOCK, SERIES), np.float32)
+        self._bmax = np.zeros((size // BLOCK, SERIES), np.float32)
+        self._head = 0
+        self._start = 0
+
+    def __len__(self):
+        return self._head - self._start
+
+    def clear(self):
+        with self._lock:
+            self._head = 0
+            self._start = 0
+
+    def append(self, state):
+        """
+        add the joints and pose of a StateSnapshot, with its host time
+        """
+        with self._lock:
+            if self._head == len(self._time):
+                self._compact()
+            idx = self._head
+            if idx > self._start and state.host_time < self._time[idx - 1]:
+                # clock went backward, times must stay sorted
+                self._head = self._start = idx = idx - idx % BLOCK
+            self._time[idx] = state.host_time
+            row = self._values[idx]
+            row[:6] = state.joints
+            row[6:] = state.pose
+            self._head = idx + 1
+            if self._head % BLOCK == 0:
+                block = self._values[self._head - BLOCK:self._head]
+                bidx = idx // BLOCK
+                self._btime[bidx] = self._time[self._head - BLOCK]
+                self._bmin[bidx] = block.min(axis=0)
+                self._bmax[bidx] = block.max(axis=0)
+            if self._head - self._start > self.capacity:
+                self._start += BLOCK
+
+    def _compact(self):
+        # keep the newest capacity samples, head is a multiple of BLOCK here
+        start = self._head - self.capacity
+        self._time[:self.capacity] = self._time[start:self._head]
+        self._values[:self.capacity] = self._values[start:self._head]
+        bstart, bend, bcount = start // BLOCK, self._head // BLOCK, self.capacity // BLOCK
+        self._btime[:bcount] = self._btime[bstart:bend]
+        self._bmin[:bcount] = self._bmin[bstart:bend]
+        self._bmax[:bcount] = self._bmax[bstart:bend]
+        self._start = max(self._start - start, 0)
+        self._head = self.capacity
+
+    def last_time(self):
+        with self._lock:
+            if self._head == self._start:
+                return None
+            return float(self._time[self._head - 1])
+
+    def decimate(self, t0, t1, width, series=slice(None)):
+        """
+        return samples between times t0 and t1 decimated to width pixels,
+        as (x, low, high) where x are pixel positions and low and high
+        arrays of shape (len(x), number of series).
+        When there are less samples than pixels low and high are equal,
+        otherwise they are min and max of the samples falling in each pixel
+        """
+        width = max(int(width), 1)
+        with self._lock:
+            times = self._time[self._start:self._head]
+            first, last = np.searchsorted(times, (t0, t1), side="right")
+            first = max(first - 1, 0)  # keep one sample before t0 so line starts at border
+            count = last - first
+            if count <= 2 * width:
+                t = times[first:last].copy()
+                low = high = self._values[self._start + first:self._start + last, series].copy()
+            elif count <= BLOCK * width:
+                values = self._values[self._start + first:self._start + last, series]
+                t, low, high = _minmax(times[first:last], values, values, t0, t1, width)
+            else:
+                # whole blocks only, the partial ones at both ends are hidden by a pixel anyway
+                bfirst = -(-(self._start + first) // BLOCK)
+                blast = (self._start + last) // BLOCK
+                t, low, high = _minmax(self._btime[bfirst:blast], self._bmin[bfirst:blast, series],
+                                       self._bmax[bfirst:blast, series], t0, t1, width)
+        if t1 > t0:
+            x = (t - t0) * (width / (t1 - t0))
+        else:
+            x = np.zeros(len(t))
+        return x, low, high
+
+
+def _minmax(t, lows, highs, t0, t1, width):
+    """
+    min of lows and max of highs for each of width pixels between t0 and t1,
+    returns time of first sample of non empty pixels with their min and max
+    """
+    edges = t0 + (t1 - t0) * np.arange(width) / width
+    starts = np.unique(np.searchsorted(t, edges))
+    starts = starts[starts < len(t)]
+    if not len(starts):
+        return t[:0], lows[:0], highs[:0]
+    low = np.minimum.reduceat(lows, starts, axis=0)
+    high = np.maximum.reduceat(highs, starts, axis=0)
+    return t[starts], low, high
@@ -0,0 +1,75 @@
+from functools import partial
+
+from PyQt5.QtWidgets import QWidget, QGridLayout, QLabel, QCheckBox, QDoubleSpinBox
+
+from urxui.iowriter import TOOL_BIT
+
+
+class IOPanel(QWidget):
+
+    """
+    Tool digital outputs and analog outputs of a Window.
+    Widgets show the values reported by the robot, edits are written
+    through the window IO writer
+    """
+
+    def __init__(self, window, parent=None):
+        QWidget.__init__(self, parent)
+        self.window = window
+        layout = QGridLayout(self)
+        self.tool_boxes = []
+        for num in range(2):
+            box = QCheckBox("Tool out {}".format(num))
+            box.clicked.connect(partial(self._set_tool, num))
+            layout.addWidget(box, 0, num)
+            self.tool_boxes.append(box)
+        self.analog_boxes = []
+        for num in range(2):
+            layout.addWidget(QLabel("Analog out {}".format(num)), 1 + num, 0)
+            box = QDoubleSpinBox()
+            box.setRange(0, 1)
+            box.setDecimals(3)
+            box.setSingleStep(0.01)
+            box.valueChanged.connect(partial(self._set_analog, num))
+            layout.addWidget(box, 1 + num, 1)
+            self.analog_boxes.append(box)
+        layout.setRowStretch(3, 1)
+        self.invalidate()
+        window.renderer.listeners.append(self.render_state)
+
+    def invalidate(self):
+        """
+        forget what is displayed, next snapshot rewrites every widget
+        """
+        self._bits = None
+        self._analog = None
+
+    def render_state(self, state):
+        if not self.isVisible() or not state.connected:
+            return
+        tool_bits = state.bits >> TOOL_BIT & 3
+        if tool_bits != self._bits:
+            self._bits = tool_bits
+            for num, box in enumerate(self.tool_boxes):
+                box.setChecked(bool(tool_bits & 1 << num))
+        analog = [round(val, 3) for val in state.analog]
+        if analog != self._analog:
+            self._analog = analog
+            for box, val in zip(self.analog_boxes, analog):
+                if box.hasFocus():
+                    # do not fight with the user, try again next time
+                    self._analog = None
+                    continue
+                box.blockSignals(True)
+                box.setValue(val)
+                box.blockSignals(False)
+
+    def _set_tool(self, num, val):
+        io = self.window.get_io()
+        if io:
+            io.set_tool(num, val)
+
+    def _set_analog(self, num, val):
+        io = self.window.get_io()
+        if io:
+            io.set_analog(num, val)
@@ -0,0 +1,144 @@
+import threading
+import time
+
+from urxui.snapshot import analog_value
+
+
+DIGITAL = "digital"
+TOOL = "tool"
+ANALOG = "analog"
+
+TOOL_BIT = 16  # tool outputs follow standard and configurable ones in digitalOutputBits
+ANALOG_TOLERANCE = 0.01
+
+
+class IOWriter(object):
+
+    """
+    Write standard digital, tool digital and analog outputs of a robot from
+    a background thread.
+    Changes are queued and merged: all changes pending when a dispatch is due
+    are sent in one secondary program, which runs next to any running program
+    instead of aborting it, and at most one dispatch is done every period.
+    observe() must be called with the MasterBoardData of every packet, a
+    change is acknowledged once the robot reports the output at its new value.
+    The time from dispatch to acknowledgement is added to latency, a
+    RollingHistogram, and changes not acknowledged within ack_timeout are
+    reported to on_timeout with kind, output number and value
+    """
+
+    def __init__(self, robot, period=0.05, ack_timeout=2.0, latency=None, on_timeout=None):
+        self.robot = robot
+        self.period = period
+        self.ack_timeout = ack_timeout
+        self.latency = latency
+        self.on_timeout = on_timeout
+        self.dispatches = 0
+        self.writes = 0
+        self._cond = threading.Condition()
+        self._pending = {}  # (kind, num) -> value
+        self._inflight = {}  # (kind, num) -> (value, dispatch time)
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="urxui-io", daemon=True)
+        self._thread.start()
+
+    def set_digital(self, num, val):
+        self._queue(DIGITAL, num, bool(val))
+
+    def set_tool(self, num, val):
+        self._queue(TOOL, num, bool(val))
+
+    def set_analog(self, num, val):
+        """
+        val is relative to the output range, from 0 to 1
+        """
+        self._queue(ANALOG, num, min(max(float(val), 0.0), 1.0))
+
+    def pending(self):
+        """
+        number of changes queued or waiting for acknowledgement
+        """
+        with self._cond:
+            return len(self._pending) + len(self._inflight)
+
+    def close(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+
+    def _queue(self, kind, num, val):
+        with self._cond:
+            self._pending[(kind, num)] = val
+            self.writes += 1
+            self._cond.notify()
+
+    def _run(self):
+        next_dispatch = 0
+        while True:
+            with self._cond:
+                while not self._pending and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                delay = next_dispatch - time.monotonic()
+                if delay > 0:
+                    # more changes may come meanwhile, they go in the same program
+                    self._cond.wait(delay)
+                    continue
+                changes = self._pending
+                self._pending = {}
+            next_dispatch = time.monotonic() + self.period
+            try:
+                self.robot.send_program(_program(changes))
+            except Exception as ex:
+                print("Could not write outputs: ", ex)
+                continue
+            now = time.monotonic()
+            with self._cond:
+                for key, val in changes.items():
+                    self._inflight[key] = (val, now)
+                self.dispatches += 1
+
+    def observe(self, board):
+        """
+        check inflight changes against MasterBoardData of a new packet
+        """
+        if not self._inflight:
+            return
+        now = time.monotonic()
+        acked = []
+        expired = []
+        with self._cond:
+            for key, (val, sent) in list(self._inflight.items()):
+                if _matches(board, key[0], key[1], val):
+                    del self._inflight[key]
+                    acked.append(now - sent)
+                elif now - sent > self.ack_timeout:
+                    del self._inflight[key]
+                    expired.append(key + (val,))
+        if self.latency is not None:
+            for val in acked:
+                self.latency.add(val)
+        if self.on_timeout:
+            for kind, num, val in expired:
+                self.on_timeout(kind, num, val)
+
+
+def _program(changes):
+    lines = ["sec urxui_io():"]
+    for (kind, num), val in sorted(changes.items()):
+        if kind == DIGITAL:
+            lines.append("  set_standard_digital_out({}, {})".format(num, val))
+        elif kind == TOOL:
+            lines.append("  set_tool_digital_out({}, {})".format(num, val))
+        else:
+            lines.append("  set_standard_analog_out({}, {:.4f})".format(num, val))
+    lines.append("end")
+    return "\n".join(lines)
+
+
+def _matches(board, kind, num, val):
+    if kind == ANALOG:
+        return abs(analog_value(board, num) - val) <= ANALOG_TOLERANCE
+    bit = num + TOOL_BIT if kind == TOOL else num
+    return bool(board["digitalOutputBits"] & 1 << bit) == val
@@ -0,0 +1,228 @@
+import os
+import select
+import struct
+import threading
+
+from PyQt5.QtCore import pyqtSignal, QEvent, QObject, QTimer, Qt
+from PyQt5.QtWidgets import QApplication, QAbstractSpinBox, QComboBox, QLineEdit, QTableWidget
+
+
+# (positive, negative) keys of axis 0 to 5, x y z rx ry rz or joints 0 to 5
+AXIS_KEYS = [(Qt.Key_Q, Qt.Key_A),
+             (Qt.Key_W, Qt.Key_S),
+             (Qt.Key_E, Qt.Key_D),
+             (Qt.Key_R, Qt.Key_F),
+             (Qt.Key_T, Qt.Key_G),
+             (Qt.Key_Y, Qt.Key_H)]
+KEYS = {key: (axis, direction) for axis, keys in enumerate(AXIS_KEYS) for key, direction in zip(keys, (1, -1))}
+
+# widgets which need the keys themselves
+_TEXT_WIDGETS = (QLineEdit, QAbstractSpinBox, QComboBox, QTableWidget)
+# presses with these are shortcuts, Ctrl+S must not jog
+_SHORTCUT_MODIFIERS = Qt.ControlModifier | Qt.AltModifier | Qt.MetaModifier
+
+# gamepad axis -> (jog axis, sign), left stick x y, right stick y x of most pads
+DEFAULT_PAD_MAP = "0:+0,1:-1,4:-2,3:+5"
+
+
+def parse_pad_map(text):
+    """
+    parse a gamepad mapping "pad_axis:+jog_axis,..." into {pad_axis: (jog_axis, sign)}
+    """
+    mapping = {}
+    for item in text.split(","):
+        try:
+            src, dst = item.strip().split(":")
+            sign = -1 if dst.startswith("-") else 1
+            axis = abs(int(dst))
+            if axis >= len(AXIS_KEYS):
+                raise ValueError()
+            mapping[int(src)] = (axis, sign)
+        except ValueError:
+            raise ValueError("Invalid gamepad mapping {}, expected pad_axis:+jog_axis with jog_axis 0 to 5".format(item))
+    return mapping
+
+
+class JogInput(QObject):
+
+    """
+    Jog from the keyboard and a gamepad, in the mode and with the velocity
+    given by jog_mode, a callable returning (mode, max velocity, acc, tool).
+    Input events only update the deflection of each axis, keyboard keys
+    are -1, 0 or 1 and OS key repeats are ignored, gamepad sticks are
+    proportional. A timer running only while something is deflected turns
+    the deflection into at most one velocity setpoint of servo() per period
+    """
+
+    changed = pyqtSignal()
+
+    def __init__(self, jog_mode, servo, period=0.02, parent=None):
+        QObject.__init__(self, parent)
+        self.jog_mode = jog_mode
+        self.servo = servo
+        self.keys = [0] * 6
+        self.gamepad = None
+        self.setpoints = 0
+        self._keyboard = False
+        self._sent = None
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._tick)
+        self._timer.setInterval(int(period * 1000))
+        self.changed.connect(self._start)
+
+    def set_keyboard(self, val):
+        app = QApplication.instance()
+        if val and not self._keyboard:
+            app.installEventFilter(self)
+        elif not val and self._keyboard:
+            app.removeEventFilter(self)
+            self._release_keys()
+        self._keyboard = val
+
+    def set_gamepad(self, path, mapping=DEFAULT_PAD_MAP, deadman=4):
+        """
+        read gamepad at path, None to stop. Sticks only jog while button
+        deadman is held
+        """
+        if self.gamepad:
+            self.gamepad.close()
+            self.gamepad = None
+            self.changed.emit()
+        if path:
+            self.gamepad = Gamepad(path, parse_pad_map(mapping), deadman, on_change=self.changed.emit)
+
+    def close(self):
+        self.set_keyboard(False)
+        self.set_gamepad(None)
+        self._timer.stop()
+
+    def deflection(self):
+        pad = self.gamepad.deflection if self.gamepad else [0.0] * 6
+        return [max(-1.0, min(1.0, key + stick)) for key, stick in zip(self.keys, pad)]
+
+    def eventFilter(self, obj, event):
+        etype = event.type()
+        owner = self.parent()
+        if etype in (QEvent.KeyPress, QEvent.KeyRelease) and event.key() in KEYS:
+            # the filter sees the keys of every window, with --multi only ours jog its robot
+            if owner is not None and QApplication.activeWindow() is not owner:
+                return False
+            focus = QApplication.focusWidget()
+            if focus is not None and isinstance(focus, _TEXT_WIDGETS):
+                return False
+            # releases are always handled, the modifier may have been pressed after the key
+            if etype == QEvent.KeyPress and event.modifiers() & _SHORTCUT_MODIFIERS:
+                return False
+            if not event.isAutoRepeat():
+                axis, direction = KEYS[event.key()]
+                if etype == QEvent.KeyPress:
+                    self.keys[axis] = direction
+                elif self.keys[axis] == direction:
+                    self.keys[axis] = 0
+                self.changed.emit()
+            return True
+        if etype == QEvent.ApplicationDeactivate or (etype == QEvent.WindowDeactivate and obj is owner):
+            # we would never see the key release
+            self._release_keys()
+        return False
+
+    def _release_keys(self):
+        self.keys = [0] * 6
+        self.changed.emit()
+
+    def _start(self):
+        if not self._timer.isActive():
+            self._tick()
+            self._timer.start()
+
+    def _tick(self):
+        deflection = self.deflection()
+        mode, vel, acc, tool = self.jog_mode()
+        setpoint = (mode, acc, tool, [d * vel for d in deflection])
+        if setpoint == self._sent:
+            if not any(deflection):
+                self._timer.stop()
+            return
+        servo = self.servo()
+        if servo is None:
+            self._timer.stop()
+            return
+        self._sent = setpoint
+        self.setpoints += 1
+        if not any(deflection):
+            servo.release()
+        elif mode == "linear":
+            servo.speedl(setpoint[3], acc, tool=tool)
+        else:
+            servo.speedj(setpoint[3], acc)
+
+
+class Gamepad(object):
+
+    """
+    Read a gamepad through the Linux joystick interface, /dev/input/jsN,
+    in a background thread. deflection holds the jog axes from -1 to 1,
+    all zero unless button deadman is held. on_change is called from the
+    reading thread when deflection changed
+    """
+
+    EVENT = struct.Struct("<IhBB")  # time in ms, value, type, number
+    BUTTON = 0x01
+    AXIS = 0x02
+    INIT = 0x80
+
+    def __init__(self, path, mapping, deadman=4, deadzone=0.1, on_change=None):
+        self.path = path
+        self.mapping = mapping
+        self.deadman = deadman
+        self.deadzone = deadzone
+        self.on_change = on_change
+        self.deflection = [0.0] * 6
+        self._axes = {}
+        self._buttons = {}
+        self._stopev = threading.Event()
+        self._fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        self._thread = threading.Thread(target=self._run, name="urxui-gamepad", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stopev.set()
+        self._thread.join(1)
+
+    def _run(self):
+        try:
+            while not self._stopev.is_set():
+                # timeout so close() does not wait for the next event
+                if not select.select([self._fd], [], [], 0.2)[0]:
+                    continue
+                data = os.read(self._fd, self.EVENT.size * 64)
+                if not data:
+                    raise OSError("device closed")
+                for offset in range(0, len(data) - self.EVENT.size + 1, self.EVENT.size):
+                    _, value, etype, number = self.EVENT.unpack_from(data, offset)
+                    if etype & ~self.INIT == self.AXIS:
+                        self._axes[number] = value / 32767.0
+                    elif etype & ~self.INIT == self.BUTTON:
+                        self._buttons[number] = bool(value)
+                self._update()
+        except OSError as ex:
+            print("Gamepad {} lost: {}".format(self.path, ex))
+        finally:
+            os.close(self._fd)
+            self.deflection = [0.0] * 6
+            if self.on_change:
+                self.on_change()
+
+    def _update(self):
+        deflection = [0.0] * 6
+        if self._buttons.get(self.deadman):
+            for src, (dst, sign) in self.mapping.items():
+                val = self._axes.get(src, 0.0)
+                if abs(val) > self.deadzone:
+                    # start from zero at the edge of the dead zone
+                    mag = (abs(val) - self.deadzone) / (1 - self.deadzone)
+                    deflection[dst] = round(sign * mag * (1 if val > 0 else -1), 3)
+        if deflection != self.deflection:
+            self.deflection = deflection
+            if self.on_change:
+                self.on_change()
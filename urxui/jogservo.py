@@ -0,0 +1,199 @@
+import socket
+import threading
+import time
+
+import numpy as np
+
+from urxui.frames import pose_to_matrix
+
+
+LINEAR = 1
+JOINT = 2
+
+# The program connects back to us and applies the velocity setpoints we
+# stream as "(mode, acc, v0, ..., v5)" until we send mode 0, or nothing
+# arrives for a while, then it stops the robot and exits.
+# Setpoints queued behind the one read, when the controller fell behind,
+# are skipped so the newest is applied and the lag never builds up.
+PROGRAM = """def urxuiJog():
+  socket_open("{host}", {port}, "urxui_jog")
+  while True:
+    cmd = socket_read_ascii_float(8, "urxui_jog", {timeout})
+    newer = socket_read_ascii_float(8, "urxui_jog", 0.001)
+    while newer[0] == 8:
+      cmd = newer
+      newer = socket_read_ascii_float(8, "urxui_jog", 0.001)
+    end
+    if cmd[0] != 8 or cmd[1] == 0:
+      break
+    end
+    if cmd[1] == 1:
+      speedl([cmd[3], cmd[4], cmd[5], cmd[6], cmd[7], cmd[8]], cmd[2], {t})
+    else:
+      speedj([cmd[3], cmd[4], cmd[5], cmd[6], cmd[7], cmd[8]], cmd[2], {t})
+    end
+  end
+  stopj({stop_acc})
+  socket_close("urxui_jog")
+end
+"""
+
+
+class JogServo(object):
+
+    """
+    Jog robot through one long lived program on the controller.
+    The program is uploaded on the first jog command, then we stream a velocity
+    setpoint to it every period seconds. After idle_timeout seconds without
+    non zero velocity the program is ended and the next jog starts a new one.
+    Velocities are given in the current csys of robot, or in tool
+    coordinates if tool is True, as for speedl and speedl_tool.
+    on_sent is called each time a non zero setpoint has been sent.
+    send_program, robot.send_program by default, uploads the program, it
+    may queue it as long as it is sent within a couple of seconds.
+    keepalive, if given, is called every second while the program runs.
+    error is the exception which ended the last streaming thread, if any
+    """
+
+    def __init__(self, robot, period=0.02, idle_timeout=2, stop_acc=1.5, on_sent=None, send_program=None):
+        self.robot = robot
+        self.on_sent = on_sent
+        self.send_program = send_program or robot.send_program
+        self.keepalive = None
+        self.error = None
+        self.period = period
+        self.idle_timeout = idle_timeout
+        self.stop_acc = stop_acc
+        self._lock = threading.Lock()
+        self._setpoint = (0, 0, [0] * 6, False)
+        self._last_move = 0
+        self._active = False
+        self._thread = None
+        self._stopev = None  # stop event of the current streaming thread, each has its own
+
+    def speedl(self, velocities, acc, tool=False):
+        self._set(LINEAR, acc, velocities, tool)
+
+    def speedj(self, velocities, acc):
+        self._set(JOINT, acc, velocities, False)
+
+    def release(self):
+        """
+        decelerate to zero velocity but keep program running for a while
+        """
+        with self._lock:
+            mode, acc, _, tool = self._setpoint
+            self._setpoint = (mode, acc, [0] * 6, tool)
+
+    def close(self, timeout=None):
+        """
+        end program on controller and wait at most timeout for streaming thread to exit
+        """
+        with self._lock:
+            stopev, thread = self._stopev, self._thread
+            # the next jog starts a new program even if this thread did not exit yet
+            self._stopev = None
+            self._thread = None
+            self._active = False
+        if stopev:
+            stopev.set()
+        if thread:
+            thread.join(timeout)
+
+    def _set(self, mode, acc, velocities, tool):
+        with self._lock:
+            self._setpoint = (mode, acc, list(velocities), tool)
+            self._last_move = time.monotonic()
+            if self._active:
+                return
+            self._active = True
+            self.error = None
+            self._stopev = threading.Event()
+            self._thread = thread = threading.Thread(target=self._run, args=(self._stopev,), name="urxui-jog", daemon=True)
+        thread.start()
+
+    def _finished(self, stopev):
+        # a thread left behind by close() must not end the jog of its successor
+        with self._lock:
+            if self._stopev is stopev:
+                self._active = False
+
+    def _local_address(self):
+        # address of the interface we use to reach the robot
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            s.connect((self.robot.host, 30002))
+            return s.getsockname()[0]
+        finally:
+            s.close()
+
+    def _run(self, stopev):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            server.bind((self._local_address(), 0))
+            server.listen(1)
+            server.settimeout(2)
+            host, port = server.getsockname()
+            prog = PROGRAM.format(host=host,
+                                  port=port,
+                                  timeout=max(self.period * 10, 0.5),
+                                  t=round(self.period * 0.9, 4),
+                                  stop_acc=self.stop_acc)
+            self.send_program(prog)
+            conn, _ = server.accept()
+        except Exception as ex:
+            print("Could not start jog program: ", ex)
+            self.error = ex
+            self._finished(stopev)
+            return
+        finally:
+            server.close()
+        try:
+            self._stream(conn, stopev)
+        except Exception as ex:
+            print("Jog stream interrupted: ", ex)
+            self.error = ex
+            self._finished(stopev)
+        finally:
+            conn.close()
+
+    def _stream(self, conn, stopev):
+        next_send = time.monotonic()
+        next_keepalive = next_send + 1
+        while True:
+            with self._lock:
+                mode, acc, vels, tool = self._setpoint
+                now = time.monotonic()
+                if any(vels):
+                    self._last_move = now
+                if stopev.is_set() or now - self._last_move > self.idle_timeout:
+                    # from now on _set() starts a new program
+                    if self._stopev is stopev:
+                        self._active = False
+                    break
+            if mode == LINEAR:
+                vels = self._to_base(vels, tool)
+            conn.sendall(_format(mode, acc, vels))
+            if self.on_sent and any(vels):
+                self.on_sent()
+            if self.keepalive and time.monotonic() >= next_keepalive:
+                next_keepalive += 1
+                self.keepalive()
+            next_send += self.period
+            stopev.wait(max(next_send - time.monotonic(), 0))
+        conn.sendall(_format(0, 0, [0] * 6))
+
+    def _to_base(self, vels, tool):
+        # numpy rather than math3d vectors, which fail on recent Pythons
+        if tool:
+            cart = self.robot.secmon.get_cartesian_info()
+            rot = pose_to_matrix([cart["X"], cart["Y"], cart["Z"], cart["Rx"], cart["Ry"], cart["Rz"]])[:3, :3]
+        elif getattr(self.robot, "csys", None) is not None:
+            rot = self.robot.csys.array[:3, :3]
+        else:
+            return vels
+        return list(rot.dot(vels[:3])) + list(rot.dot(vels[3:]))
+
+
+def _format(mode, acc, vels):
+    return "({},{},{})\n".format(mode, acc, ",".join("{:.5f}".format(v) for v in vels)).encode()
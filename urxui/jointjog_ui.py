@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'urxui/jointjog_ui.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_JointJog(object):
+    def setupUi(self, JointJog):
+        JointJog.setObjectName("JointJog")
+        self.verticalLayout_2 = QtWidgets.QVBoxLayout(JointJog)
+        self.verticalLayout_2.setContentsMargins(11, 11, 11, 11)
+        self.verticalLayout_2.setSpacing(6)
+        self.verticalLayout_2.setObjectName("verticalLayout_2")
+        self.frame_6 = QtWidgets.QFrame(JointJog)
+        self.frame_6.setFrameShape(QtWidgets.QFrame.StyledPanel)
+        self.frame_6.setFrameShadow(QtWidgets.QFrame.Raised)
+        self.frame_6.setObjectName("frame_6")
+        self.gridLayout_4 = QtWidgets.QGridLayout(self.frame_6)
+        self.gridLayout_4.setContentsMargins(11, 11, 11, 11)
+        self.gridLayout_4.setSpacing(6)
+        self.gridLayout_4.setObjectName("gridLayout_4")
+        self.frame_7 = QtWidgets.QFrame(self.frame_6)
+        self.frame_7.setFrameShape(QtWidgets.QFrame.StyledPanel)
+        self.frame_7.setFrameShadow(QtWidgets.QFrame.Raised)
+        self.frame_7.setObjectName("frame_7")
+        self.gridLayout_6 = QtWidgets.QGridLayout(self.frame_7)
+        self.gridLayout_6.setContentsMargins(11, 11, 11, 11)
+        self.gridLayout_6.setSpacing(6)
+        self.gridLayout_6.setObjectName("gridLayout_6")
+        self.decJ3Button = QtWidgets.QPushButton(self.frame_7)
+        self.decJ3Button.setObjectName("decJ3Button")
+        self.gridLayout_6.addWidget(self.decJ3Button, 5, 0, 1, 1)
+        self.label_17 = QtWidgets.QLabel(self.frame_7)
+        self.label_17.setAlignment(QtCore.Qt.AlignCenter)
+        self.label_17.setObjectName("label_17")
+        self.gridLayout_6.addWidget(self.label_17, 5, 1, 1, 1)
+        self.incJ3Button = QtWidgets.QPushButton(self.frame_7)
+        self.incJ3Button.setObjectName("incJ3Button")
+        self.gridLayout_6.addWidget(self.incJ3Button, 5, 2, 1, 2)
+        self.decJ4Button = QtWidgets.QPushButton(self.frame_7)
+        self.decJ4Button.setObjectName("decJ4Button")
+        self.gridLayout_6.addWidget(self.decJ4Button, 6, 0, 1, 1)
+        self.label_18 = QtWidgets.QLabel(self.frame_7)
+        self.label_18.setAlignment(QtCore.Qt.AlignCenter)
+        self.label_18.setObjectName("label_18")
+        self.gridLayout_6.addWidget(self.label_18, 6, 1, 1, 1)
+        self.decJ2Button = QtWidgets.QPushButton(self.frame_7)
+        self.decJ2Button.setObjectName("decJ2Button")
+        self.gridLayout_6.addWidget(self.decJ2Button, 3, 0, 1, 1)
+        self.decJ0Button = QtWidgets.QPushButton(self.frame_7)
+        self.decJ0Button.setObjectName("decJ0Button")
+        self.gridLayout_6.addWidget(self.decJ0Button, 0, 0, 1, 1)
+        self.label_13 = QtWidgets.QLabel(self.frame_7)
+        self.label_13.setAlignment(QtCore.Qt.AlignCenter)
+        self.label_13.setObjectName("label_13")
+        self.gridLayout_6.addWidget(self.label_13, 0, 1, 1, 1)
+        self.decJ1Button = QtWidgets.QPushButton(self.frame_7)
+        self.decJ1Button.setObjectName("decJ1Button")
+        self.gridLayout_6.addWidget(self.decJ1Button, 2, 0, 1, 1)
+        self.decJ5Button = QtWidgets.QPushButton(self.frame_7)
+        self.decJ5Button.setObjectName("decJ5Button")
+        self.gridLayout_6.addWidget(self.decJ5Button, 7, 0, 1, 1)
+        self.label_19 = QtWidgets.QLabel(self.frame_7)
+        self.label_19.setAlignment(QtCore.Qt.AlignCenter)
+        self.label_19.setObjectName("label_19")
+        self.gridLayout_6.addWidget(self.label_19, 7, 1, 1, 1)
+        self.label_16 = QtWidgets.QLabel(self.frame_7)
+        self.label_16.setAlignment(QtCore.Qt.AlignCenter)
+        self.label_16.setObjectName("label_16")
+        self.gridLayout_6.addWidget(self.label_16, 3, 1, 1, 1)
+        self.label_15 = QtWidgets.QLabel(self.frame_7)
+        self.label_15.setAlignment(QtCore.Qt.AlignCenter)
+        self.label_15.setObjectName("label_15")
+        self.gridLayout_6.addWidget(self.label_15, 2, 1, 1, 1)
+        self.incJ2Button = QtWidgets.QPushButton(self.frame_7)
+        self.incJ2Button.setObjectName("incJ2Button")
+        self.gridLayout_6.addWidget(self.incJ2Button, 3, 2, 1, 2)
+        self.incJ1Button = QtWidgets.QPushButton(self.frame_7)
+        self.incJ1Button.setObjectName("incJ1Button")
+        self.gridLayout_6.addWidget(self.incJ1Button, 2, 2, 1, 2)
+        self.incJ0Button = QtWidgets.QPushButton(self.frame_7)
+        self.incJ0Button.setObjectName("incJ0Button")
+        self.gridLayout_6.addWidget(self.incJ0Button, 0, 2, 1, 2)
+        self.incJ4Button = QtWidgets.QPushButton(self.frame_7)
+        self.incJ4Button.setObjectName("incJ4Button")
+        self.gridLayout_6.addWidget(self.incJ4Button, 6, 2, 1, 2)
+        self.incJ5Button = QtWidgets.QPushButton(self.frame_7)
+        self.incJ5Button.setObjectName("incJ5Button")
+        self.gridLayout_6.addWidget(self.incJ5Button, 7, 2, 1, 2)
+        self.gridLayout_4.addWidget(self.frame_7, 1, 2, 3, 1)
+        self.label_20 = QtWidgets.QLabel(self.frame_6)
+        self.label_20.setObjectName("label_20")
+        self.gridLayout_4.addWidget(self.label_20, 1, 0, 1, 1)
+        self.jointAccLineEdit = QtWidgets.QLineEdit(self.frame_6)
+        self.jointAccLineEdit.setObjectName("jointAccLineEdit")
+        self.gridLayout_4.addWidget(self.jointAccLineEdit, 1, 1, 1, 1)
+        spacerItem = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.gridLayout_4.addItem(spacerItem, 4, 0, 1, 1)
+        self.label_21 = QtWidgets.QLabel(self.frame_6)
+        self.label_21.setObjectName("label_21")
+        self.gridLayout_4.addWidget(self.label_21, 2, 0, 1, 1)
+        self.jointVelLineEdit = QtWidgets.QLineEdit(self.frame_6)
+        self.jointVelLineEdit.setObjectName("jointVelLineEdit")
+        self.gridLayout_4.addWidget(self.jointVelLineEdit, 2, 1, 1, 1)
+        self.verticalLayout_2.addWidget(self.frame_6)
+
+        self.retranslateUi(JointJog)
+        QtCore.QMetaObject.connectSlotsByName(JointJog)
+
+    def retranslateUi(self, JointJog):
+        _translate = QtCore.QCoreApplication.translate
+        self.decJ3Button.setText(_translate("JointJog", "-"))
+        self.label_17.setText(_translate("JointJog", "3"))
+        self.incJ3Button.setText(_translate("JointJog", "+"))
+        self.decJ4Button.setText(_translate("JointJog", "-"))
+        self.label_18.setText(_translate("JointJog", "4"))
+        self.decJ2Button.setText(_translate("JointJog", "-"))
+        self.decJ0Button.setText(_translate("JointJog", "-"))
+        self.label_13.setText(_translate("JointJog", "0"))
+        self.decJ1Button.setText(_translate("JointJog", "-"))
+        self.decJ5Button.setText(_translate("JointJog", "-"))
+        self.label_19.setText(_translate("JointJog", "5"))
+        self.label_16.setText(_translate("JointJog", "2"))
+        self.label_15.setText(_translate("JointJog", "1"))
+        self.incJ2Button.setText(_translate("JointJog", "+"))
+        self.incJ1Button.setText(_translate("JointJog", "+"))
+        self.incJ0Button.setText(_translate("JointJog", "+"))
+        self.incJ4Button.setText(_translate("JointJog", "+"))
+        self.incJ5Button.setText(_translate("JointJog", "+"))
+        self.label_20.setText(_translate("JointJog", "Default acceleration (rad/s2)"))
+        self.label_21.setText(_translate("JointJog", "Default velocity (rad/s)"))
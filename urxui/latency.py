@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import deque
+
+
+class RollingHistogram(object):
+
+    """
+    Keep the last size samples and compute percentiles on them
+    """
+
+    def __init__(self, size=1000):
+        self._samples = deque(maxlen=size)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def add(self, val):
+        self._samples.append(val)
+
+    def percentiles(self, *pcts):
+        """
+        return requested percentiles (0-100) of current samples, None if empty
+        """
+        values = sorted(self._samples)
+        if not values:
+            return [None for _ in pcts]
+        last = len(values) - 1
+        return [values[int(round(pct / 100.0 * last))] for pct in pcts]
+
+
+class JogLatency(object):
+
+    """
+    Measure latency of jog commands in three stages:
+    press of a jog button, command sent to controller and
+    first state sample where the joints moved.
+    Only presses done while the robot stands still are measured,
+    otherwise we cannot tell the motion was caused by that press.
+    All times are time.monotonic() on the host
+    """
+
+    motion_epsilon = 1e-4  # rad, joint change we consider as motion
+    timeout = 2  # s, we give up a measurement after that
+
+    def __init__(self, size=1000):
+        self.sent = RollingHistogram(size)
+        self.motion = RollingHistogram(size)
+        self.samples = deque(maxlen=size * 10)  # raw (press, sent, motion) times
+        self._lock = threading.Lock()
+        self._pending = None
+        self._joints = None
+        self._still = False
+
+    def pressed(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._pending and now - self._pending[0] < self.timeout:
+                return
+            self._pending = None
+            if self._still:
+                self._pending = [now, None, self._joints]
+
+    def command_sent(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._pending and self._pending[1] is None:
+                self._pending[1] = now
+                self.sent.add(now - self._pending[0])
+
+    def observe(self, joints):
+        """
+        to be called with the joints of each new state sample
+        """
+        now = time.monotonic()
+        joints = tuple(joints)
+        with self._lock:
+            if self._joints is not None:
+                self._still = _moved(self._joints, joints) < self.motion_epsilon
+            self._joints = joints
+            pending = self._pending
+            if not pending or pending[1] is None:
+                return
+            if _moved(pending[2], joints) >= self.motion_epsilon:
+                self.motion.add(now - pending[0])
+                self.samples.append((pending[0], pending[1], now))
+                self._pending = None
+
+    def export(self, path):
+        """
+        write raw samples to path as csv, times in seconds
+        """
+        with self._lock:
+            samples = list(self.samples)
+        with open(path, "w") as f:
+            f.write("press,sent,motion,press_to_sent,press_to_motion\n")
+            for press, sent, motion in samples:
+                f.write("{:.6f},{:.6f},{:.6f},{:.6f},{:.6f}\n".format(press, sent, motion, sent - press, motion - press))
+        return len(samples)
+
+
+def _moved(j1, j2):
+    return max(abs(a - b) for a, b in zip(j1, j2))
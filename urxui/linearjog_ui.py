@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'urxui/linearjog_ui.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_LinearJog(object):
+    def setupUi(self, LinearJog):
+        LinearJog.setObjectName("LinearJog")
+        self.verticalLayout = QtWidgets.QVBoxLayout(LinearJog)
+        self.verticalLayout.setContentsMargins(11, 11, 11, 11)
+        self.verticalLayout.setSpacing(6)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.frame = QtWidgets.QFrame(LinearJog)
+        self.frame.setFrameShape(QtWidgets.QFrame.StyledPanel)
+        self.frame.setFrameShadow(QtWidgets.QFrame.Raised)
+        self.frame.setObjectName("frame")
+        self.gridLayout_2 = QtWidgets.QGridLayout(self.frame)
+        self.gridLayout_2.setContentsMargins(11, 11, 11, 11)
+        self.gridLayout_2.setSpacing(6)
+        self.gridLayout_2.setObjectName("gridLayout_2")
+        self.frame_4 = QtWidgets.QFrame(self.frame)
+        self.frame_4.setFrameShape(QtWidgets.QFrame.StyledPanel)
+        self.frame_4.setFrameShadow(QtWidgets.QFrame.Raised)
+        self.frame_4.setObjectName("frame_4")
+        self.gridLayout_5 = QtWidgets.QGridLayout(self.frame_4)
+        self.gridLayout_5.setContentsMargins(11, 11, 11, 11)
+        self.gridLayout_5.setSpacing(6)
+        self.gridLayout_5.setObjectName("gridLayout_5")
+        self.minusXButton = QtWidgets.QPushButton(self.frame_4)
+        self.minusXButton.setObjectName("minusXButton")
+        self.gridLayout_5.addWidget(self.minusXButton, 0, 0, 1, 1)
+        self.label_3 = QtWidgets.QLabel(self.frame_4)
+        self.label_3.setAlignment(QtCore.Qt.AlignCenter)
+        self.label_3.setObjectName("label_3")
+        self.gridLayout_5.addWidget(self.label_3, 0, 1, 1, 1)
+        self.plusXButton = QtWidgets.QPushButton(self.frame_4)
+        self.plusXButton.setObjectName("plusXButton")
+        self.gridLayout_5.addWidget(self.plusXButton, 0, 3, 1, 1)
+        self.minusYButton = QtWidgets.QPushButton(self.frame_4)
+        self.minusYButton.setObjectName("minusYButton")
+        self.gridLayout_5.addWidget(self.minusYButton, 1, 0, 1, 1)
+        self.label_4 = QtWidgets.QLabel(self.frame_4)
+        self.label_4.setAlignment(QtCore.Qt.AlignCenter)
+        self.label_4.setObjectName("label_4")
+        self.gridLayout_5.addWidget(self.label_4, 1, 1, 1, 2)
+        self.plusYButton = QtWidgets.QPushButton(self.frame_4)
+        self.plusYButton.setObjectName("plusYButton")
+        self.gridLayout_5.addWidget(self.plusYButton, 1, 3, 1, 1)
+        self.minusZButton = QtWidgets.QPushButton(self.frame_4)
+        self.minusZButton.setObjectName("minusZButton")
+        self.gridLayout_5.addWidget(self.minusZButton, 2, 0, 1, 1)
+        self.label_5 = QtWidgets.QLabel(self.frame_4)
+        self.label_5.setAlignment(QtCore.Qt.AlignCenter)
+        self.label_5.setObjectName("label_5")
+        self.gridLayout_5.addWidget(self.label_5, 2, 1, 1, 2)
+        self.plusZButton = QtWidgets.QPushButton(self.frame_4)
+        self.plusZButton.setObjectName("plusZButton")
+        self.gridLayout_5.addWidget(self.plusZButton, 2, 3, 1, 1)
+        self.minusRXButton = QtWidgets.QPushButton(self.frame_4)
+        self.minusRXButton.setObjectName("minusRXButton")
+        self.gridLayout_5.addWidget(self.minusRXButton, 3, 0, 1, 1)
+        self.label_6 = QtWidgets.QLabel(self.frame_4)
+        self.label_6.setAlignment(QtCore.Qt.AlignCenter)
+        self.label_6.setObjectName("label_6")
+        self.gridLayout_5.addWidget(self.label_6, 3, 1, 1, 1)
+        self.plusRXButton = QtWidgets.QPushButton(self.frame_4)
+        self.plusRXButton.setObjectName("plusRXButton")
+        self.gridLayout_5.addWidget(self.plusRXButton, 3, 2, 1, 2)
+        self.minusRYButton = QtWidgets.QPushButton(self.frame_4)
+        self.minusRYButton.setObjectName("minusRYButton")
+        self.gridLayout_5.addWidget(self.minusRYButton, 4, 0, 1, 1)
+        self.label_7 = QtWidgets.QLabel(self.frame_4)
+        self.label_7.setAlignment(QtCore.Qt.AlignCenter)
+        self.label_7.setObjectName("label_7")
+        self.gridLayout_5.addWidget(self.label_7, 4, 1, 1, 1)
+        self.plusRYButton = QtWidgets.QPushButton(self.frame_4)
+        self.plusRYButton.setObjectName("plusRYButton")
+        self.gridLayout_5.addWidget(self.plusRYButton, 4, 3, 1, 1)
+        self.minusRZButton = QtWidgets.QPushButton(self.frame_4)
+        self.minusRZButton.setObjectName("minusRZButton")
+        self.gridLayout_5.addWidget(self.minusRZButton, 5, 0, 1, 1)
+        self.label_8 = QtWidgets.QLabel(self.frame_4)
+        self.label_8.setAlignment(QtCore.Qt.AlignCenter)
+        self.label_8.setObjectName("label_8")
+        self.gridLayout_5.addWidget(self.label_8, 5, 1, 1, 1)
+        self.plusRZButton = QtWidgets.QPushButton(self.frame_4)
+        self.plusRZButton.setObjectName("plusRZButton")
+        self.gridLayout_5.addWidget(self.plusRZButton, 5, 3, 1, 1)
+        self.gridLayout_2.addWidget(self.frame_4, 0, 2, 4, 1)
+        self.toolRefCheckBox = QtWidgets.QCheckBox(self.frame)
+        self.toolRefCheckBox.setObjectName("toolRefCheckBox")
+        self.gridLayout_2.addWidget(self.toolRefCheckBox, 0, 0, 1, 1)
+        self.label_14 = QtWidgets.QLabel(self.frame)
+        self.label_14.setObjectName("label_14")
+        self.gridLayout_2.addWidget(self.label_14, 1, 0, 1, 1)
+        self.accLineEdit = QtWidgets.QLineEdit(self.frame)
+        self.accLineEdit.setObjectName("accLineEdit")
+        self.gridLayout_2.addWidget(self.accLineEdit, 1, 1, 1, 1)
+        self.label_11 = QtWidgets.QLabel(self.frame)
+        self.label_11.setObjectName("label_11")
+        self.gridLayout_2.addWidget(self.label_11, 2, 0, 1, 1)
+        self.velLineEdit = QtWidgets.QLineEdit(self.frame)
+        self.velLineEdit.setObjectName("velLineEdit")
+        self.gridLayout_2.addWidget(self.velLineEdit, 2, 1, 1, 1)
+        self.verticalLayout.addWidget(self.frame)
+
+        self.retranslateUi(LinearJog)
+        QtCore.QMetaObject.connectSlotsByName(LinearJog)
+
+    def retranslateUi(self, LinearJog):
+        _translate = QtCore.QCoreApplication.translate
+        self.minusXButton.setText(_translate("LinearJog", "-"))
+        self.label_3.setText(_translate("LinearJog", "X"))
+        self.plusXButton.setText(_translate("LinearJog", "+"))
+        self.minusYButton.setText(_translate("LinearJog", "-"))
+        self.label_4.setText(_translate("LinearJog", "Y"))
+        self.plusYButton.setText(_translate("LinearJog", "+"))
+        self.minusZButton.setText(_translate("LinearJog", "-"))
+        self.label_5.setText(_translate("LinearJog", "Z"))
+        self.plusZButton.setText(_translate("LinearJog", "+"))
+        self.minusRXButton.setText(_translate("LinearJog", "-"))
+        self.label_6.setText(_translate("LinearJog", "Rx"))
+        self.plusRXButton.setText(_translate("LinearJog", "+"))
+        self.minusRYButton.setText(_translate("LinearJog", "-"))
+        self.label_7.setText(_translate("LinearJog", "Ry"))
+        self.plusRYButton.setText(_translate("LinearJog", "+"))
+        self.minusRZButton.setText(_translate("LinearJog", "-"))
+        self.label_8.setText(_translate("LinearJog", "Rz"))
+        self.plusRZButton.setText(_translate("LinearJog", "+"))
+        self.toolRefCheckBox.setText(_translate("LinearJog", "Tool reference"))
+        self.label_14.setText(_translate("LinearJog", "Default acceleration (m/s2)"))
+        self.label_11.setText(_translate("LinearJog", "Default velocity (m/s)"))
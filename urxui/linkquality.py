@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import deque
+
+from urxui.latency import RollingHistogram
+
+
+GOOD = "good"
+JITTER = "jitter"
+LOSS = "loss"
+NO_DATA = "no data"
+
+
+class LinkQuality(object):
+
+    """
+    Quality of the state link of the controller, from the controller
+    timestamp of every packet and the host time we got it.
+    interarrival holds host times between packets. The nominal period is
+    the median of controller timestamp steps, a step of several periods
+    means cycles we never saw: lost when the host waited as long for the
+    packet, so the link or the controller held it, coalesced when packets
+    came but we were too busy to read each of them.
+    offset is host minus controller clock, delay its excess over the
+    smallest offset seen in the last baseline_window seconds, so how late
+    a packet came compared to the fastest ones, clock drift excluded.
+    observe() is called from the stream thread, the rest from any thread
+    """
+
+    baseline_window = 10.0  # s
+    recent = 10.0  # s, lost cycles in that time make the link bad
+    jitter_limit = 0.05  # s, delay p95 above that is reported as jitter
+
+    def __init__(self, size=1000):
+        self.size = size
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.interarrival = RollingHistogram(self.size)
+            self.delay = RollingHistogram(self.size)
+            self._steps = RollingHistogram(self.size)
+            self.packets = 0
+            self.lost = 0
+            self.coalesced = 0
+            self.period = None
+            self.offset = None
+            self._last = None  # (controller time, host monotonic)
+            self._losses = deque()  # (host monotonic, cycles) of recent losses
+            self._baseline = None
+            self._prev_baseline = None
+            self._baseline_start = 0
+
+    def observe(self, timestamp, host_time):
+        """
+        timestamp is the controller time of a packet, host_time the
+        time.time() when we read it
+        """
+        now = time.monotonic()
+        offset = host_time - timestamp
+        with self._lock:
+            self.packets += 1
+            self.offset = offset
+            self._observe_offset(now, offset)
+            last, self._last = self._last, (timestamp, now)
+            if last is None:
+                return
+            step = timestamp - last[0]
+            if step <= 0:
+                return  # controller restarted or same packet read twice
+            host_step = now - last[1]
+            self.interarrival.add(host_step)
+            self._steps.add(step)
+            if self.period is None or self.packets % 100 == 0:
+                # sorting every packet is not needed, the period does not change
+                if len(self._steps) >= 10:
+                    self.period, = self._steps.percentiles(50)
+            if self.period is None or step < 1.5 * self.period:
+                return
+            missed = int(round(step / self.period)) - 1
+            if host_step >= step - self.period / 2:
+                self.lost += missed
+                self._losses.append((now, missed))
+            else:
+                self.coalesced += missed
+
+    def _observe_offset(self, now, offset):
+        if self._baseline is None or now - self._baseline_start > self.baseline_window:
+            # keep the previous window so the baseline never starts from one sample
+            self._prev_baseline = self._baseline
+            self._baseline = offset
+            self._baseline_start = now
+        else:
+            self._baseline = min(self._baseline, offset)
+        baseline = self._baseline
+        if self._prev_baseline is not None:
+            baseline = min(baseline, self._prev_baseline)
+        self.delay.add(offset - baseline)
+
+    def recent_lost(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._losses and now - self._losses[0][0] > self.recent:
+                self._losses.popleft()
+            return sum(cycles for _, cycles in self._losses)
+
+    def health(self, stale=False):
+        """
+        return (GOOD, JITTER, LOSS or NO_DATA, text to show)
+        """
+        if stale or self.period is None:
+            return NO_DATA, "link: no data"
+        lost = self.recent_lost()
+        interval_p95, = self.interarrival.percentiles(95)
+        delay_p95, = self.delay.percentiles(95)
+        text = "link: {:.0f} Hz, jitter {:.0f} ms".format(1 / self.period, (delay_p95 or 0) * 1000)
+        if lost:
+            return LOSS, "{}, {} cycles missed".format(text, lost)
+        if delay_p95 > self.jitter_limit or interval_p95 > 2 * self.period + self.jitter_limit:
+            return JITTER, text
+        return GOOD, text
@@ -1,26 +1,68 @@
 #! /usr/bin/env python3
 
-import sys
-import threading
 import time
-from functools import partial
+_started = time.perf_counter()
 
-from PyQt5.QtCore import pyqtSignal, QTimer, QSettings
-from PyQt5.QtWidgets import QMainWindow, QApplication
+import argparse
+import os
+import sys
+from functools import partial
 
-import math3d as m3d
-import urx
+from PyQt5.QtCore import pyqtSignal, QEvent, QTimer, QSettings, Qt
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtWidgets import QMainWindow, QApplication, QCheckBox, QLabel, QPushButton, QShortcut, QWidget, QVBoxLayout
 
+# urx, math3d, numpy and the panels using them are imported when first needed,
+# so the window shows up as fast as possible
+from urxui.executor import CommandExecutor, CONFIG, MOTION
+from urxui.connector import Connector, ProbeDelegate, backoff_delay
+from urxui.latency import JogLatency, RollingHistogram
+from urxui.linkquality import LinkQuality, GOOD, JITTER, LOSS
 from urxui.mainwindow_ui import Ui_MainWindow
+from urxui.metrics import WindowMetrics
+from urxui.plugins import TopicHub, load_panel
+from urxui.render import RenderScheduler
+from urxui.snapshot import read_state, fill_state, StateSnapshot, SnapshotMailbox
+from urxui.startup import StartupProfile
+from urxui.statestream import StateStream, AdaptiveRate
+
+
+BASE_CSYS = "[0, 0, 0, 0, 0, 0]"
+JOG_TIME = 0.2  # s, duration of one speed command of a non streamed jog
+
+
+def _connect_robot(uri, broker=False):
+    # with broker, share the connection of a broker serving this robot if there is one
+    if broker:
+        from urxui.broker import socket_path, is_trusted
+        path = socket_path(uri)
+        if os.path.exists(path) and not is_trusted(path):
+            # another user could serve a fake state and get our programs
+            print("Ignoring broker {}, it is not our socket in a private directory".format(path))
+        elif os.path.exists(path):
+            from urxui.brokerclient import BrokerRobot
+            try:
+                return BrokerRobot(uri, path)
+            except OSError as ex:
+                print("Broker {} not available, connecting directly: {}".format(path, ex))
+    import urx
+    return urx.Robot(uri)
 
 
 class Window(QMainWindow):
-    update_state = pyqtSignal(str, str, str, int)
+    state_ready = pyqtSignal()
+    link_lost = pyqtSignal(object)
+    io_failed = pyqtSignal(str)
+    rate_changed = pyqtSignal(float)
+    broker_message = pyqtSignal(str)
 
-    def __init__(self):
+    def __init__(self, profile=None):
         QMainWindow.__init__(self)
+        self.profile = profile
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
+        if profile:
+            profile.mark("main window ui")
 
         # we only show statusbar in case of errors
         self.ui.statusBar.hide()
@@ -33,16 +75,36 @@ class Window(QMainWindow):
         for addr in self._address_list:
             self.ui.addrComboBox.insertItem(-1, addr)
 
-        self._csys_list = self.settings.value("csys_list", ["[0, 0, 0, 0, 0, 0]"])
+        self._csys_list = self.settings.value("csys_list", [BASE_CSYS])
         for addr in self._csys_list:
             self.ui.csysComboBox.insertItem(-1, addr)
 
-        self.ui.velLineEdit.setText(self.settings.value("lin_vel", "0.1"))
-        self.ui.accLineEdit.setText(self.settings.value("lin_acc", "0.05"))
-        self.ui.jointVelLineEdit.setText(self.settings.value("joint_vel", "0.4"))
-        self.ui.jointAccLineEdit.setText(self.settings.value("joint_acc", "0.2"))
+        self.cancelButton = QPushButton("Cancel", self.ui.frame_5)
+        self.cancelButton.setEnabled(False)
+        self.ui.horizontalLayout.insertWidget(self.ui.horizontalLayout.indexOf(self.ui.disconnectButton), self.cancelButton)
+
+        # connecting through a broker is opt in, with --use-broker or the use_broker setting
+        self.use_broker = self.settings.value("use_broker", "false") == "true"
+        self.connector = Connector(lambda uri: _connect_robot(uri, self.use_broker), self)
+        self.connector.connected.connect(self._connected)
+        self.connector.failed.connect(self._connect_failed)
+        self.connector.probed.connect(self._probed)
+        self.ui.addrComboBox.setItemDelegate(ProbeDelegate(self.ui.addrComboBox))
+        self.connector.probe(self._address_list)
+
+        self.commands = CommandExecutor(self)
+        self.commands.failed.connect(self.show_error)
+        self.broker_message.connect(self._broker_message)
+
+        self._uri = None
+        self._reconnect_attempt = 0
+        self._reconnect_timer = QTimer(self)
+        self._reconnect_timer.setSingleShot(True)
+        self._reconnect_timer.timeout.connect(self._reconnect)
+        self.link_lost.connect(self._link_lost)
 
         self.ui.connectButton.clicked.connect(self.connect)
+        self.cancelButton.clicked.connect(self.cancel_connect)
         self.ui.disconnectButton.clicked.connect(self.disconnect)
         self.ui.copyPoseButton.clicked.connect(self.copy_pose)
         self.ui.copyJointsButton.clicked.connect(self.copy_joints)
@@ -58,64 +120,352 @@ class Window(QMainWindow):
 
         self.ui.stopButton.clicked.connect(self.stop)
 
-        self.connect_linear_buttons()
-        self.connect_joint_buttons()
+        self.streamedJogCheckBox = QCheckBox("Streamed jog", self.ui.frame_5)
+        self.ui.horizontalLayout.addWidget(self.streamedJogCheckBox)
+        self.keyboardJogCheckBox = QCheckBox("Keyboard jog", self.ui.frame_5)
+        self.keyboardJogCheckBox.setToolTip("Q/A W/S E/D R/F T/G Y/H jog axes or joints 0 to 5 of the current jog tab")
+        self.ui.horizontalLayout.addWidget(self.keyboardJogCheckBox)
+        self.gamepadJogCheckBox = QCheckBox("Gamepad jog", self.ui.frame_5)
+        self.gamepadJogCheckBox.setToolTip("Sticks jog while the deadman button is held")
+        self.ui.horizontalLayout.addWidget(self.gamepadJogCheckBox)
+        self.rateLabel = QLabel(self.ui.frame_5)
+        self.rateLabel.setToolTip("State update rate")
+        self.ui.horizontalLayout.addWidget(self.rateLabel)
+        self.linkLabel = QLabel(self.ui.frame_5)
+        self.linkLabel.setToolTip("Controller link: packet rate, delay jitter and cycles lost in the last seconds")
+        self.ui.horizontalLayout.addWidget(self.linkLabel)
+
+        self._jog_buttons = []
+        self._jog_servo = None
+        self.linearUi = None
+        self.jointUi = None
+        self._jog_input = None
+        self.keyboardJogCheckBox.toggled.connect(self._set_keyboard_jog)
+        self.gamepadJogCheckBox.toggled.connect(self._set_gamepad_jog)
+        self.streamedJogCheckBox.toggled.connect(self._set_streamed_jog)
+        self.streamedJogCheckBox.setChecked(self.settings.value("streamed_jog", "false") == "true")
         self.connect_dio()
         
-        self.update_state.connect(self._update_state)
+        self.mailbox = SnapshotMailbox()
+        self.renderer = RenderScheduler(self, self.mailbox, float(self.settings.value("max_fps", 30)))
+        self.state_ready.connect(self.renderer.request)
         self.ui.csysButton.clicked.connect(self.update_csys)
+        self._csys = BASE_CSYS
+
+        self.latency = JogLatency()
+        self.link = LinkQuality()
+        self._link_timer = QTimer(self)
+        self._link_timer.timeout.connect(self._show_link)
+        self._link_timer.start(1000)
+        self.io_latency = RollingHistogram()
+        self._io = None
+        self.ioPanel = None
+        self.io_failed.connect(self._io_failed)
+        self.history = None
+        self._packet_state = StateSnapshot()
+        self.recorder = None
+        self.framesPanel = None
+        self.plots = None
+        self.diagnostics = None
+        self.recordPanel = None
+        self.waypointPanel = None
+        self.plugins = TopicHub(self)
+        self.panels = []
+
+        # tabs are filled the first time they are shown
+        self._deferred = {}
+        self._first_frame = False
+        self._defer(self.ui.tab, self._setup_linear_jog)
+        self._defer(self.ui.tab_2, self._setup_joint_jog)
+        self._defer(self.ui.tab_4, self._setup_io)
+        self._defer(self._add_tab("Waypoints"), self._setup_waypoints)
+        self._defer(self._add_tab("Frames"), self._setup_frames)
+        self._defer(self._add_tab("Plots"), self._setup_plots)
+        self._defer(self._add_tab("Diagnostics"), self._setup_diagnostics)
+        self._defer(self._add_tab("Recorder"), self._setup_recorder)
+        plugins = self.settings.value("plugins", [])
+        for spec in [plugins] if isinstance(plugins, str) else plugins:
+            self.add_plugin(spec)
+        self.ui.tabWidget.currentChanged.connect(lambda idx: self._build_tab(self.ui.tabWidget.widget(idx)))
+        self.ui.tabWidget_2.currentChanged.connect(lambda idx: self._build_tab(self.ui.tabWidget_2.widget(idx)))
 
         self.robot = None
-        self._stopev = False
 
-        self.thread = threading.Thread(target=self._updater)
-        self.thread.start()
+        self.stream = StateStream(self._update_robot_state,
+                                  float(self.settings.value("display_rate", 10)),
+                                  on_packet=self._on_packet,
+                                  stale_timeout=float(self.settings.value("stale_timeout", 1.0)),
+                                  lost_timeout=float(self.settings.value("lost_timeout", 3.0)),
+                                  on_lost=self.link_lost.emit)
+        # full rate only when someone can see it and something happens
+        self.rate_changed.connect(self._show_rate)
+        self.rate = AdaptiveRate(self.stream,
+                                 float(self.settings.value("display_rate", 10)),
+                                 float(self.settings.value("idle_rate", 2)),
+                                 float(self.settings.value("hidden_rate", 0.5)),
+                                 float(self.settings.value("idle_delay", 2)),
+                                 on_change=self.rate_changed.emit)
+        self._update_visibility()
+        self.stream.start()
+
+        self.metrics = WindowMetrics(self)
+        QShortcut(QKeySequence("F12"), self, self.metrics.toggle_overlay)
+        port = int(self.settings.value("metrics_port", 0))
+        if port:
+            self.serve_metrics(port)
+        if self.settings.value("metrics_file", ""):
+            self.metrics.write_to(self.settings.value("metrics_file"))
+
+    def add_plugin(self, spec):
+        """
+        add a tab with the plugin panel of spec "module:Class", see urxui.plugins
+        """
+        try:
+            cls = load_panel(spec)
+        except Exception as ex:
+            print("Cannot load plugin {}: {}".format(spec, ex))
+            return
+        self._defer(self._add_tab(cls.title), partial(self._setup_plugin, cls))
+
+    def _setup_plugin(self, cls, page):
+        # an exception raised in this slot would abort the application
+        try:
+            panel = cls(self)
+            self.plugins.subscribe(panel, panel.topics)
+        except Exception as ex:
+            print("Plugin {} failed: {}".format(cls.title, ex))
+            return
+        page.layout().addWidget(panel)
+        self.panels.append(panel)
+
+    def _add_tab(self, title):
+        page = QWidget()
+        QVBoxLayout(page).setContentsMargins(0, 0, 0, 0)
+        self.ui.tabWidget_2.addTab(page, title)
+        return page
+
+    def _defer(self, page, setup):
+        self._deferred[page] = setup
+
+    def _build_tab(self, page):
+        setup = self._deferred.pop(page, None)
+        if setup:
+            setup(page)
+
+    def build_tabs(self):
+        """
+        fill all tabs now instead of when they are first shown
+        """
+        for page in list(self._deferred):
+            self._build_tab(page)
+
+    def showEvent(self, event):
+        QMainWindow.showEvent(self, event)
+        self._update_visibility()
+
+    def hideEvent(self, event):
+        QMainWindow.hideEvent(self, event)
+        self._update_visibility()
+
+    def changeEvent(self, event):
+        QMainWindow.changeEvent(self, event)
+        if event.type() == QEvent.WindowStateChange:
+            self._update_visibility()
+
+    def serve_metrics(self, port):
+        try:
+            self.metrics.serve(port)
+        except OSError as ex:
+            self.show_error("Cannot serve metrics on port {}: {}".format(port, ex))
+
+    def _update_visibility(self):
+        self.rate.set_visible(self.isVisible() and not self.isMinimized())
+
+    def _show_rate(self, rate):
+        self.rateLabel.setText("{:g} Hz".format(rate))
+
+    def _show_link(self):
+        if not self.robot:
+            self.linkLabel.setText("")
+            return
+        level, text = self.link.health(self.stream.stale)
+        self.linkLabel.setText(text)
+        color = {GOOD: "green", JITTER: "orange", LOSS: "red"}.get(level, "gray")
+        self.linkLabel.setStyleSheet("QLabel {{ color : {}; }}".format(color))
+
+    def paintEvent(self, event):
+        QMainWindow.paintEvent(self, event)
+        if not self._first_frame:
+            self._first_frame = True
+            QTimer.singleShot(0, self._after_first_frame)
+
+    def _after_first_frame(self):
+        if self.profile:
+            self.profile.mark("first frame")
+        self._build_tab(self.ui.tabWidget.currentWidget())
+        self._build_tab(self.ui.tabWidget_2.currentWidget())
+        if self.profile:
+            self.profile.mark("visible tabs")
+            print(self.profile.report())
+            self.profile = None
+
+    def _setup_linear_jog(self, page):
+        from urxui.linearjog_ui import Ui_LinearJog
+        self.linearUi = Ui_LinearJog()
+        self.linearUi.setupUi(page)
+        self.linearUi.velLineEdit.setText(self.settings.value("lin_vel", "0.1"))
+        self.linearUi.accLineEdit.setText(self.settings.value("lin_acc", "0.05"))
+        self.connect_linear_buttons()
+
+    def _setup_joint_jog(self, page):
+        from urxui.jointjog_ui import Ui_JointJog
+        self.jointUi = Ui_JointJog()
+        self.jointUi.setupUi(page)
+        self.jointUi.jointVelLineEdit.setText(self.settings.value("joint_vel", "0.4"))
+        self.jointUi.jointAccLineEdit.setText(self.settings.value("joint_acc", "0.2"))
+        self.connect_joint_buttons()
+
+    def _setup_io(self, page):
+        from urxui.iopanel import IOPanel
+        self.ioPanel = IOPanel(self)
+        QVBoxLayout(page).addWidget(self.ioPanel)
+
+    def _setup_waypoints(self, page):
+        from urxui.waypointpanel import WaypointPanel
+        self.waypointPanel = WaypointPanel(self)
+        page.layout().addWidget(self.waypointPanel)
+
+    def _setup_frames(self, page):
+        from urxui.framespanel import FramesPanel
+        self.framesPanel = FramesPanel(self)
+        page.layout().addWidget(self.framesPanel)
+        self.framesPanel.set_frames(self._csys_list, self._csys)
+
+    def _setup_plots(self, page):
+        from urxui.plots import PlotPanel
+        self.plots = PlotPanel(self)
+        page.layout().addWidget(self.plots)
+
+    def _setup_diagnostics(self, page):
+        from urxui.diagnostics import DiagnosticsPanel
+        self.diagnostics = DiagnosticsPanel(self)
+        page.layout().addWidget(self.diagnostics)
+
+    def _setup_recorder(self, page):
+        from urxui.recordpanel import RecorderPanel
+        self.recordPanel = RecorderPanel(self)
+        page.layout().addWidget(self.recordPanel)
+
+    def get_history(self):
+        if self.history is None:
+            from urxui.history import StateHistory
+            self.history = StateHistory(int(self.settings.value("plot_capacity", 450000)))
+        return self.history
 
     def connect_linear_buttons(self):
+        ui = self.linearUi
         direction = -1
         axes = 0
-        for button in [self.ui.minusXButton,
-                       self.ui.plusXButton,
-                       self.ui.minusYButton,
-                       self.ui.plusYButton,
-                       self.ui.minusZButton,
-                       self.ui.plusZButton,
-                       self.ui.minusRXButton,
-                       self.ui.plusRXButton,
-                       self.ui.minusRYButton,
-                       self.ui.plusRYButton,
-                       self.ui.minusRZButton,
-                       self.ui.plusRZButton]:
+        for button in [ui.minusXButton,
+                       ui.plusXButton,
+                       ui.minusYButton,
+                       ui.plusYButton,
+                       ui.minusZButton,
+                       ui.plusZButton,
+                       ui.minusRXButton,
+                       ui.plusRXButton,
+                       ui.minusRYButton,
+                       ui.plusRYButton,
+                       ui.minusRZButton,
+                       ui.plusRZButton]:
             button.setAutoRepeat(True)
             button.setAutoRepeatDelay(125)
             button.setAutoRepeatInterval(125)
             button.clicked.connect(partial(self._inc, axes, direction))
+            button.pressed.connect(partial(self._inc, axes, direction, None))
+            button.pressed.connect(partial(self.rate.set_jogging, True))
+            button.released.connect(self._jog_released)
+            self._jog_buttons.append(button)
             if direction > 0:
                 axes += 1
             direction = -direction
+        self._set_streamed_jog(self.streamedJogCheckBox.isChecked())
 
     def connect_joint_buttons(self):
+        ui = self.jointUi
         direction = -1
         joint = 0
-        for button in [self.ui.decJ0Button,
-                       self.ui.incJ0Button,
-                       self.ui.decJ1Button,
-                       self.ui.incJ1Button,
-                       self.ui.decJ2Button,
-                       self.ui.incJ2Button,
-                       self.ui.decJ3Button,
-                       self.ui.incJ3Button,
-                       self.ui.decJ4Button,
-                       self.ui.incJ4Button,
-                       self.ui.decJ5Button,
-                       self.ui.incJ5Button]:
+        for button in [ui.decJ0Button,
+                       ui.incJ0Button,
+                       ui.decJ1Button,
+                       ui.incJ1Button,
+                       ui.decJ2Button,
+                       ui.incJ2Button,
+                       ui.decJ3Button,
+                       ui.incJ3Button,
+                       ui.decJ4Button,
+                       ui.incJ4Button,
+                       ui.decJ5Button,
+                       ui.incJ5Button]:
             button.setAutoRepeat(True)
             button.setAutoRepeatDelay(125)
             button.setAutoRepeatInterval(125)
             button.clicked.connect(partial(self._jinc, joint, direction))
+            button.pressed.connect(partial(self._jinc, joint, direction, None))
+            button.pressed.connect(partial(self.rate.set_jogging, True))
+            button.released.connect(self._jog_released)
+            self._jog_buttons.append(button)
             if direction > 0:
                 joint += 1
             direction = -direction
+        self._set_streamed_jog(self.streamedJogCheckBox.isChecked())
+
+    def _set_streamed_jog(self, val):
+        # in streamed mode we jog while button is down, no need for autorepeat
+        for button in self._jog_buttons:
+            button.setAutoRepeat(not val)
+
+    def _get_jog_input(self):
+        if self._jog_input is None:
+            from urxui.joginput import JogInput
+            self._jog_input = JogInput(self.jog_mode, self._input_jog_servo,
+                                       float(self.settings.value("jog_period", 0.02)), self)
+        return self._jog_input
+
+    def _set_keyboard_jog(self, val):
+        self._get_jog_input().set_keyboard(val)
+
+    def _set_gamepad_jog(self, val):
+        from urxui.joginput import DEFAULT_PAD_MAP
+        path = self.settings.value("gamepad_device", "/dev/input/js0") if val else None
+        try:
+            self._get_jog_input().set_gamepad(path,
+                                              self.settings.value("gamepad_map", DEFAULT_PAD_MAP),
+                                              int(self.settings.value("gamepad_deadman", 4)))
+        except (OSError, ValueError) as ex:
+            self.show_error("Cannot use gamepad: {}".format(ex))
+            self.gamepadJogCheckBox.setChecked(False)
+
+    def jog_mode(self):
+        """
+        ("linear" or "joint", max velocity, acceleration, tool) of the jog tab
+        shown, joint if it is the joint tab, linear otherwise
+        """
+        if self.ui.tabWidget.currentWidget() is self.ui.tab_2 and self.jointUi:
+            return ("joint", float(self.jointUi.jointVelLineEdit.text()),
+                    float(self.jointUi.jointAccLineEdit.text()), False)
+        if self.linearUi:
+            return ("linear", float(self.linearUi.velLineEdit.text()),
+                    float(self.linearUi.accLineEdit.text()), self.linearUi.toolRefCheckBox.isChecked())
+        return ("linear", float(self.settings.value("lin_vel", "0.1")),
+                float(self.settings.value("lin_acc", "0.05")), False)
+
+    def _input_jog_servo(self):
+        # keyboard and gamepad always stream, their setpoints change continuously
+        if not self.robot:
+            self.show_error("No connection")
+            return None
+        return self._get_jog_servo()
 
     def connect_dio(self):
         for idx, box in enumerate(self.dio_boxes):
@@ -129,42 +479,161 @@ class Window(QMainWindow):
         QTimer.singleShot(1500, self.ui.statusBar.hide)
 
     def closeEvent(self, event):
-        self._stopev = True
-        self.settings.setValue("lin_acc", self.ui.accLineEdit.text())
-        self.settings.setValue("lin_vel", self.ui.velLineEdit.text())
-        self.settings.setValue("joint_acc", self.ui.jointAccLineEdit.text())
-        self.settings.setValue("joint_vel", self.ui.jointVelLineEdit.text())
+        self.stream.stop()
+        if self.linearUi:
+            self.settings.setValue("lin_acc", self.linearUi.accLineEdit.text())
+            self.settings.setValue("lin_vel", self.linearUi.velLineEdit.text())
+        if self.jointUi:
+            self.settings.setValue("joint_acc", self.jointUi.jointAccLineEdit.text())
+            self.settings.setValue("joint_vel", self.jointUi.jointVelLineEdit.text())
+        self.settings.setValue("streamed_jog", "true" if self.streamedJogCheckBox.isChecked() else "false")
+        if self.recordPanel:
+            self.recordPanel.shutdown()
+        if self._jog_input:
+            self._jog_input.close()
         self.disconnect()
+        self.metrics.close()
+        self.commands.close(1)
+        self.connector.shutdown()
+        self.stream.join(1)
+        print("Rendered {} frames, {} widget writes, {} skipped".format(
+            self.renderer.frames, self.renderer.writes, self.renderer.skipped))
         event.accept()
 
     def connect(self):
+        self._stop_reconnect()
         if self.robot:
             try:
                 self.disconnect()
             except:
                 print("Error while disconnecting")
-        uri = self.ui.addrComboBox.currentText()
+        if self.recordPanel:
+            self.recordPanel.stop_replay()
+        self._start_connect(self.ui.addrComboBox.currentText())
+
+    def _start_connect(self, uri):
+        self._uri = uri
+        self.ui.connectButton.setEnabled(False)
+        self.cancelButton.setEnabled(True)
+        self.connector.start(uri, float(self.settings.value("connect_timeout", 5)))
+
+    def cancel_connect(self):
+        self._stop_reconnect()
+        self.connector.cancel()
+        self._connect_done()
+        print("Connection cancelled")
+
+    def _connect_done(self):
+        self.ui.connectButton.setEnabled(True)
+        self.cancelButton.setEnabled(False)
+
+    def _connected(self, uri, robot):
+        self._connect_done()
+        self._reconnect_attempt = 0
+        self.robot = robot
+        self._csys = BASE_CSYS  # a new robot starts in base
         try:
-            self.robot = urx.Robot(uri)
             self.update_csys()
-        except Exception as ex:
-            self.show_error(ex)
-            raise
-        self._save_address_list()
+        except Exception:
+            pass  # error already shown, csys can be set again later
+        self.get_history().clear()
+        self.link.reset()
+        if hasattr(robot.secmon, "on_message"):
+            print("Connected through broker ", robot.secmon.path)
+            robot.secmon.on_message = self.broker_message.emit
+        self.stream.set_robot(self.robot)
+        self._save_address_list(uri)
         print("Connected to ", self.robot)
 
+    def _connect_failed(self, uri, msg):
+        self._connect_done()
+        if self._reconnect_attempt:
+            print("Reconnection to {} failed: {}".format(uri, msg))
+            self._schedule_reconnect()
+        else:
+            self.show_error(msg)
+
+    def _link_lost(self, robot):
+        if robot is not self.robot:
+            return
+        print("Lost connection to ", self._uri)
+        self.disconnect()
+        if self.settings.value("auto_reconnect", "true") == "true":
+            self._schedule_reconnect()
+
+    def _schedule_reconnect(self):
+        delay = backoff_delay(self._reconnect_attempt,
+                              float(self.settings.value("reconnect_delay", 0.5)),
+                              float(self.settings.value("reconnect_max_delay", 30)))
+        self._reconnect_attempt += 1
+        self.show_error("Connection to {} lost, reconnecting in {:.1f} s".format(self._uri, delay))
+        self._reconnect_timer.start(int(delay * 1000))
+
+    def _reconnect(self):
+        self.metrics.reconnects += 1
+        self._start_connect(self._uri)
+
+    def _stop_reconnect(self):
+        self._reconnect_timer.stop()
+        self._reconnect_attempt = 0
+
+    def _broker_message(self, text):
+        from urxui.broker import REJECTED, CONTROL_TAKEN
+        if text.startswith(REJECTED):
+            self.show_error("Command not sent, {}".format(text[len(REJECTED):].strip()))
+        elif text == CONTROL_TAKEN:
+            self.show_error("Another client controls the robot")
+
+    def _probed(self, addr, rtt):
+        idx = self.ui.addrComboBox.findText(addr)
+        if idx < 0:
+            return
+        if rtt is None:
+            status = "unreachable"
+        else:
+            status = "{:.1f} ms".format(rtt * 1000)
+        self.ui.addrComboBox.setItemData(idx, status, Qt.UserRole)
+        self.ui.addrComboBox.setItemData(idx, status, Qt.ToolTipRole)
+
     def disconnect(self):
+        self._stop_reconnect()
+        self.stream.set_robot(None)
+        self.commands.restart()
+        self._close_jog_servo()
+        if self._io:
+            self._io.close()
+            self._io = None
         if self.robot:
-            self.robot.close()
+            self.connector.close_robot(self.robot)
         self.robot = None
+        self.plugins.reset()
         print("Disconnected")
 
     def stop(self):
+        # do not wait for the jog thread, the stop command aborts its program anyway
+        self._close_jog_servo(0)
         if self.robot:
-            self.robot.stopj()
-
-    def _save_address_list(self):
-        uri = self.ui.addrComboBox.currentText()
+            self.commands.stop(self.robot.stopj)
+
+    def _get_jog_servo(self):
+        if self._jog_servo is None:
+            from urxui.jogservo import JogServo
+            # the program goes through the MOTION lane, after a stop still running
+            self._jog_servo = JogServo(self.robot,
+                                       float(self.settings.value("jog_period", 0.02)),
+                                       on_sent=self.latency.command_sent,
+                                       send_program=partial(self.commands.submit, MOTION, self.robot.send_program))
+            if hasattr(self.robot, "acquire_control"):
+                # the jog streams over its own connection, the broker would not see we still control the robot
+                self._jog_servo.keepalive = self.robot.acquire_control
+        return self._jog_servo
+
+    def _close_jog_servo(self, timeout=1):
+        if self._jog_servo:
+            self._jog_servo.close(timeout)
+        self._jog_servo = None
+
+    def _save_address_list(self, uri):
         if uri == self._address_list[0]:
             return
         if uri in self._address_list:
@@ -191,99 +660,154 @@ class Window(QMainWindow):
         QApplication.clipboard().setText(self.ui.poseLineEdit.text())
 
     def update_csys(self):
-        csys = self.ui.csysComboBox.currentText()
+        from urxui.frames import parse_csys
+        text = self.ui.csysComboBox.currentText()
         try:
-            csys = eval(csys)
-            csys = m3d.Transform(csys)
-            self.robot.set_csys(csys)
-        except Exception as ex:
+            matrix = parse_csys(text)
+        except ValueError as ex:
             self.show_error(ex)
             raise
+        # urx only keeps csys locally, nothing is sent to the robot
+        if self.robot and text != self._csys:
+            import math3d as m3d
+            self.commands.submit(CONFIG, self.robot.set_csys, m3d.Transform(matrix))
+        self._csys = text
         self._save_csys()
-
-    def _update_state(self, running, pose, joints, bits):
-        if self.ui.poseLineEdit.text() != pose:
-            self.ui.poseLineEdit.setText(pose)
-        if self.ui.jointsLineEdit.text() != joints:
-            self.ui.jointsLineEdit.setText(joints)
-        if self.ui.stateLineEdit.text() != running:
-            self.ui.stateLineEdit.setText(running)
-        self._update_dio_ut(bits)
-
-        self.setWindowTitle("Urx ( address:{}, running:{} )".format(self.ui.addrComboBox.currentText(), running))
-
-    def _update_dio_ut(self, bits):
-        io = 0
-        for box in self.dio_boxes:
-            self._update_diobox(box, bits, io)
-            io += 1
-
-    def _update_diobox(self, checkbox, bits, num):
-        if bits & 1 << num:
-            checkbox.setChecked(True)
-        else:
-            checkbox.setChecked(False)
-
-    def _updater(self):
-        while not self._stopev:
-            time.sleep(0.5)
-            self._update_robot_state()
-            
-    def _update_robot_state(self):
-        pose_str = ""
-        joints_str = ""
-        bits = 0
-        running = "Not connected"
-        if self.robot:
+        if self.framesPanel:
+            self.framesPanel.set_frames(self._csys_list, self._csys)
+        self.renderer.invalidate()
+
+    def _on_packet(self, robot):
+        # called for every packet, the plots get the full controller rate
+        start = time.perf_counter()
+        data = robot.secmon.get_all_data()
+        try:
+            state = fill_state(data, self._packet_state, getattr(robot, "csys", None))
+        except KeyError:
+            return  # first packets may not be complete
+        self.latency.observe(state.joints)
+        self.rate.observe(state.joints)
+        self.link.observe(state.timestamp, state.host_time)
+        self.plugins.publish(data, state)
+        self.history.append(state)
+        # every packet, whatever the display rate
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(state)
+        io = self._io
+        if io is not None:
+            io.observe(data["MasterBoardData"])
+        self.metrics.packet.observe(time.perf_counter() - start)
+
+    def _update_robot_state(self, robot):
+        start = time.perf_counter()
+        state = self.mailbox.back()
+        if robot:
             # it should never crash... we will see
-            running = str(self.robot.is_running())
             try:
-                pose = self.robot.getl()
-                pose = [round(i, 4) for i in pose]
-                pose_str = str(pose)
-                joints = self.robot.getj()
-                joints = [round(i, 4) for i in joints]
-                joints_str = str(joints)
-                bits = self.robot.get_digital_out_bits()
+                read_state(robot, state)
+                state.stale = self.stream.stale
             except Exception as ex:
                 print(ex)
-        self.update_state.emit(running, pose_str, joints_str, bits)
+                return
+        else:
+            state.connected = False
+            state.stale = False
+        if self.mailbox.publish():
+            self.state_ready.emit()
+        self.metrics.update.observe(time.perf_counter() - start)
+
+    def _is_jog_event(self, checked):
+        # streamed jog starts on pressed, where checked is None,
+        # otherwise we send one speed command for each (autorepeated) click
+        return self.streamedJogCheckBox.isChecked() == (checked is None)
+
+    def _jog_released(self):
+        self.rate.set_jogging(False)
+        if self._jog_servo and self.streamedJogCheckBox.isChecked():
+            self._jog_servo.release()
 
     def _inc(self, axes, direction, checked):
+        if not self._is_jog_event(checked):
+            return
         if not self.robot:
             self.show_error("No connection")
             return
+        start = time.perf_counter()
+        self.latency.pressed()
         vels = [0, 0, 0, 0, 0, 0]
-        vel = float(self.ui.velLineEdit.text())
-        acc = float(self.ui.accLineEdit.text())
+        vel = float(self.linearUi.velLineEdit.text())
+        acc = float(self.linearUi.accLineEdit.text())
         if direction > 0:
             vels[axes] = vel
         else:
             vels[axes] = -vel
-        if self.ui.toolRefCheckBox.isChecked():
-            self.robot.speedl_tool(vels, acc=acc, min_time=0.2)
+        if self.streamedJogCheckBox.isChecked():
+            self._get_jog_servo().speedl(vels, acc, tool=self.linearUi.toolRefCheckBox.isChecked())
+        elif self.linearUi.toolRefCheckBox.isChecked():
+            self._submit_jog(self.robot.speedl_tool, vels, acc=acc, min_time=JOG_TIME)
         else:
-            self.robot.speedl(vels, acc=acc, min_time=0.2)
+            self._submit_jog(self.robot.speedl, vels, acc=acc, min_time=JOG_TIME)
+        self.metrics.jog_slot.observe(time.perf_counter() - start)
 
     def _jinc(self, joint, direction, checked):
+        if not self._is_jog_event(checked):
+            return
         if not self.robot:
             self.show_error("No connection")
             return
+        start = time.perf_counter()
+        self.latency.pressed()
         p = [0, 0, 0, 0, 0, 0]
-        vel = float(self.ui.jointVelLineEdit.text())
-        acc = float(self.ui.jointAccLineEdit.text())
+        vel = float(self.jointUi.jointVelLineEdit.text())
+        acc = float(self.jointUi.jointAccLineEdit.text())
         if direction > 0:
             p[joint] += vel
         else:
             p[joint] -= vel 
-        self.robot.speedj(p, acc=acc, min_time=0.2)
+        if self.streamedJogCheckBox.isChecked():
+            self._get_jog_servo().speedj(p, acc)
+        else:
+            self._submit_jog(self.robot.speedj, p, acc=acc, min_time=JOG_TIME)
+        self.metrics.jog_slot.observe(time.perf_counter() - start)
+
+    def _submit_jog(self, func, *args, **kwargs):
+        # a newer jog replaces a queued one, and a jog which waited longer than
+        # it would move is dropped, the button autorepeat sends a fresh one
+        self.commands.submit(MOTION, func, *args, key="jog", max_age=JOG_TIME,
+                             on_done=self.latency.command_sent, **kwargs)
+
+    def get_io(self):
+        """
+        IO writer of connected robot, None and error shown if not connected
+        """
+        if not self.robot:
+            self.show_error("No connection")
+            self._io_failed(None)
+            return None
+        if self._io is None:
+            from urxui.iowriter import IOWriter
+            self._io = IOWriter(self.robot,
+                                float(self.settings.value("io_period", 0.05)),
+                                float(self.settings.value("io_ack_timeout", 2.0)),
+                                self.io_latency,
+                                lambda kind, num, val: self.io_failed.emit(
+                                    "{} output {} not set to {}".format(kind.capitalize(), num, val)))
+        return self._io
 
-    def _dio(self, io, val):
-        try:
-            print("Setting IO{} to {}".format(io, val))
-            self.robot.set_digital_out(io, val)
-        except Exception as ex:
-            self.show_error(ex)
+    def _dio(self, num, val):
+        # box keeps the requested state until the robot reports it,
+        # if it never does _io_failed shows the real state again
+        io = self.get_io()
+        if io:
+            io.set_digital(num, val)
+
+    def _io_failed(self, msg):
+        if msg:
+            self.show_error(msg)
+        self.renderer.invalidate()
+        if self.ioPanel:
+            self.ioPanel.invalidate()
 
 
 
@@ -294,8 +818,65 @@ class Window(QMainWindow):
 
 
 def main():
-    app = QApplication(sys.argv)
-    client = Window()
+    parser = argparse.ArgumentParser(description="Minimal UI to urx Python library")
+    parser.add_argument("--multi", nargs="*", metavar="ADDRESS",
+                        help="monitor several robots, default is all saved addresses")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print time spent in each startup phase until first frame")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve runtime metrics in Prometheus format on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="write runtime metrics in Prometheus format to PATH every second")
+    parser.add_argument("--headless", metavar="ADDRESS",
+                        help="no GUI, stream state of robot at ADDRESS as JSON lines to stdout")
+    parser.add_argument("--rate", type=float, default=10,
+                        help="state rate in Hz in headless mode, default 10")
+    parser.add_argument("--broker", metavar="ADDRESS",
+                        help="no GUI, share one connection to robot at ADDRESS with all urxui of this user")
+    parser.add_argument("--use-broker", action="store_true",
+                        help="connect through the broker of the robot if one is running")
+    parser.add_argument("--socket", metavar="PATH",
+                        help="in headless mode serve state on Unix socket PATH instead of stdout, "
+                             "socket of broker, default is in the user runtime directory")
+    parser.add_argument("--plugin", action="append", default=[], metavar="MODULE:CLASS",
+                        help="add a tab with a plugin panel, see urxui.plugins, may be repeated")
+    parser.add_argument("--binary", action="store_true",
+                        help="in headless mode write fixed size binary records instead of JSON, see urxui.headless")
+    args, qt_args = parser.parse_known_args()
+    settings = QSettings("UrxUi", "urxui")
+    timeouts = (float(settings.value("connect_timeout", 5)), float(settings.value("lost_timeout", 3.0)))
+    if args.headless:
+        # no QApplication, no event loop
+        from urxui.headless import run
+        sys.exit(run(args.headless, args.rate, args.socket, args.binary, None, *timeouts))
+    if args.broker:
+        from urxui.broker import run
+        sys.exit(run(args.broker, args.socket))
+    profile = StartupProfile(_started) if args.startup_profile else None
+    if profile:
+        profile.mark("imports")
+    app = QApplication(sys.argv[:1] + qt_args)
+    if profile:
+        profile.mark("QApplication")
+    if args.multi is not None:
+        from urxui.multirobot import MultiRobotWindow
+        from urxui.poller import SecondaryPoller
+        addresses = args.multi or settings.value("address_list", ["localhost"])
+        poller = SecondaryPoller(*timeouts)
+        poller.start()
+        client = MultiRobotWindow(addresses, poller)
+    else:
+        client = Window(profile)
+        if profile:
+            profile.mark("main window setup")
+        if args.use_broker:
+            client.use_broker = True
+        if args.metrics_port:
+            client.serve_metrics(args.metrics_port)
+        if args.metrics_file:
+            client.metrics.write_to(args.metrics_file)
+        for spec in args.plugin:
+            client.add_plugin(spec)
     client.show()
     sys.exit(app.exec_())
 
@@ -2,12 +2,15 @@
 
 # Form implementation generated from reading ui file 'urxui/mainwindow_ui.ui'
 #
-# Created by: PyQt5 UI code generator 5.5.1
+# Created by: PyQt5 UI code generator 5.15.11
 #
-# WARNING! All changes made in this file will be lost!
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 
+
 class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
         MainWindow.setObjectName("MainWindow")
@@ -115,202 +118,9 @@ class Ui_MainWindow(object):
         self.tabWidget.setObjectName("tabWidget")
         self.tab = QtWidgets.QWidget()
         self.tab.setObjectName("tab")
-        self.verticalLayout = QtWidgets.QVBoxLayout(self.tab)
-        self.verticalLayout.setContentsMargins(11, 11, 11, 11)
-        self.verticalLayout.setSpacing(6)
-        self.verticalLayout.setObjectName("verticalLayout")
-        self.frame = QtWidgets.QFrame(self.tab)
-        self.frame.setFrameShape(QtWidgets.QFrame.StyledPanel)
-        self.frame.setFrameShadow(QtWidgets.QFrame.Raised)
-        self.frame.setObjectName("frame")
-        self.gridLayout_2 = QtWidgets.QGridLayout(self.frame)
-        self.gridLayout_2.setContentsMargins(11, 11, 11, 11)
-        self.gridLayout_2.setSpacing(6)
-        self.gridLayout_2.setObjectName("gridLayout_2")
-        self.frame_4 = QtWidgets.QFrame(self.frame)
-        self.frame_4.setFrameShape(QtWidgets.QFrame.StyledPanel)
-        self.frame_4.setFrameShadow(QtWidgets.QFrame.Raised)
-        self.frame_4.setObjectName("frame_4")
-        self.gridLayout_5 = QtWidgets.QGridLayout(self.frame_4)
-        self.gridLayout_5.setContentsMargins(11, 11, 11, 11)
-        self.gridLayout_5.setSpacing(6)
-        self.gridLayout_5.setObjectName("gridLayout_5")
-        self.minusXButton = QtWidgets.QPushButton(self.frame_4)
-        self.minusXButton.setObjectName("minusXButton")
-        self.gridLayout_5.addWidget(self.minusXButton, 0, 0, 1, 1)
-        self.label_3 = QtWidgets.QLabel(self.frame_4)
-        self.label_3.setAlignment(QtCore.Qt.AlignCenter)
-        self.label_3.setObjectName("label_3")
-        self.gridLayout_5.addWidget(self.label_3, 0, 1, 1, 1)
-        self.plusXButton = QtWidgets.QPushButton(self.frame_4)
-        self.plusXButton.setObjectName("plusXButton")
-        self.gridLayout_5.addWidget(self.plusXButton, 0, 3, 1, 1)
-        self.minusYButton = QtWidgets.QPushButton(self.frame_4)
-        self.minusYButton.setObjectName("minusYButton")
-        self.gridLayout_5.addWidget(self.minusYButton, 1, 0, 1, 1)
-        self.label_4 = QtWidgets.QLabel(self.frame_4)
-        self.label_4.setAlignment(QtCore.Qt.AlignCenter)
-        self.label_4.setObjectName("label_4")
-        self.gridLayout_5.addWidget(self.label_4, 1, 1, 1, 2)
-        self.plusYButton = QtWidgets.QPushButton(self.frame_4)
-        self.plusYButton.setObjectName("plusYButton")
-        self.gridLayout_5.addWidget(self.plusYButton, 1, 3, 1, 1)
-        self.minusZButton = QtWidgets.QPushButton(self.frame_4)
-        self.minusZButton.setObjectName("minusZButton")
-        self.gridLayout_5.addWidget(self.minusZButton, 2, 0, 1, 1)
-        self.label_5 = QtWidgets.QLabel(self.frame_4)
-        self.label_5.setAlignment(QtCore.Qt.AlignCenter)
-        self.label_5.setObjectName("label_5")
-        self.gridLayout_5.addWidget(self.label_5, 2, 1, 1, 2)
-        self.plusZButton = QtWidgets.QPushButton(self.frame_4)
-        self.plusZButton.setObjectName("plusZButton")
-        self.gridLayout_5.addWidget(self.plusZButton, 2, 3, 1, 1)
-        self.minusRXButton = QtWidgets.QPushButton(self.frame_4)
-        self.minusRXButton.setObjectName("minusRXButton")
-        self.gridLayout_5.addWidget(self.minusRXButton, 3, 0, 1, 1)
-        self.label_6 = QtWidgets.QLabel(self.frame_4)
-        self.label_6.setAlignment(QtCore.Qt.AlignCenter)
-        self.label_6.setObjectName("label_6")
-        self.gridLayout_5.addWidget(self.label_6, 3, 1, 1, 1)
-        self.plusRXButton = QtWidgets.QPushButton(self.frame_4)
-        self.plusRXButton.setObjectName("plusRXButton")
-        self.gridLayout_5.addWidget(self.plusRXButton, 3, 2, 1, 2)
-        self.minusRYButton = QtWidgets.QPushButton(self.frame_4)
-        self.minusRYButton.setObjectName("minusRYButton")
-        self.gridLayout_5.addWidget(self.minusRYButton, 4, 0, 1, 1)
-        self.label_7 = QtWidgets.QLabel(self.frame_4)
-        self.label_7.setAlignment(QtCore.Qt.AlignCenter)
-        self.label_7.setObjectName("label_7")
-        self.gridLayout_5.addWidget(self.label_7, 4, 1, 1, 1)
-        self.plusRYButton = QtWidgets.QPushButton(self.frame_4)
-        self.plusRYButton.setObjectName("plusRYButton")
-        self.gridLayout_5.addWidget(self.plusRYButton, 4, 3, 1, 1)
-        self.minusRZButton = QtWidgets.QPushButton(self.frame_4)
-        self.minusRZButton.setObjectName("minusRZButton")
-        self.gridLayout_5.addWidget(self.minusRZButton, 5, 0, 1, 1)
-        self.label_8 = QtWidgets.QLabel(self.frame_4)
-        self.label_8.setAlignment(QtCore.Qt.AlignCenter)
-        self.label_8.setObjectName("label_8")
-        self.gridLayout_5.addWidget(self.label_8, 5, 1, 1, 1)
-        self.plusRZButton = QtWidgets.QPushButton(self.frame_4)
-        self.plusRZButton.setObjectName("plusRZButton")
-        self.gridLayout_5.addWidget(self.plusRZButton, 5, 3, 1, 1)
-        self.gridLayout_2.addWidget(self.frame_4, 0, 2, 4, 1)
-        self.toolRefCheckBox = QtWidgets.QCheckBox(self.frame)
-        self.toolRefCheckBox.setObjectName("toolRefCheckBox")
-        self.gridLayout_2.addWidget(self.toolRefCheckBox, 0, 0, 1, 1)
-        self.label_14 = QtWidgets.QLabel(self.frame)
-        self.label_14.setObjectName("label_14")
-        self.gridLayout_2.addWidget(self.label_14, 1, 0, 1, 1)
-        self.accLineEdit = QtWidgets.QLineEdit(self.frame)
-        self.accLineEdit.setObjectName("accLineEdit")
-        self.gridLayout_2.addWidget(self.accLineEdit, 1, 1, 1, 1)
-        self.label_11 = QtWidgets.QLabel(self.frame)
-        self.label_11.setObjectName("label_11")
-        self.gridLayout_2.addWidget(self.label_11, 2, 0, 1, 1)
-        self.velLineEdit = QtWidgets.QLineEdit(self.frame)
-        self.velLineEdit.setObjectName("velLineEdit")
-        self.gridLayout_2.addWidget(self.velLineEdit, 2, 1, 1, 1)
-        self.verticalLayout.addWidget(self.frame)
         self.tabWidget.addTab(self.tab, "")
         self.tab_2 = QtWidgets.QWidget()
         self.tab_2.setObjectName("tab_2")
-        self.verticalLayout_2 = QtWidgets.QVBoxLayout(self.tab_2)
-        self.verticalLayout_2.setContentsMargins(11, 11, 11, 11)
-        self.verticalLayout_2.setSpacing(6)
-        self.verticalLayout_2.setObjectName("verticalLayout_2")
-        self.frame_6 = QtWidgets.QFrame(self.tab_2)
-        self.frame_6.setFrameShape(QtWidgets.QFrame.StyledPanel)
-        self.frame_6.setFrameShadow(QtWidgets.QFrame.Raised)
-        self.frame_6.setObjectName("frame_6")
-        self.gridLayout_4 = QtWidgets.QGridLayout(self.frame_6)
-        self.gridLayout_4.setContentsMargins(11, 11, 11, 11)
-        self.gridLayout_4.setSpacing(6)
-        self.gridLayout_4.setObjectName("gridLayout_4")
-        self.frame_7 = QtWidgets.QFrame(self.frame_6)
-        self.frame_7.setFrameShape(QtWidgets.QFrame.StyledPanel)
-        self.frame_7.setFrameShadow(QtWidgets.QFrame.Raised)
-        self.frame_7.setObjectName("frame_7")
-        self.gridLayout_6 = QtWidgets.QGridLayout(self.frame_7)
-        self.gridLayout_6.setContentsMargins(11, 11, 11, 11)
-        self.gridLayout_6.setSpacing(6)
-        self.gridLayout_6.setObjectName("gridLayout_6")
-        self.decJ3Button = QtWidgets.QPushButton(self.frame_7)
-        self.decJ3Button.setObjectName("decJ3Button")
-        self.gridLayout_6.addWidget(self.decJ3Button, 5, 0, 1, 1)
-        self.label_17 = QtWidgets.QLabel(self.frame_7)
-        self.label_17.setAlignment(QtCore.Qt.AlignCenter)
-        self.label_17.setObjectName("label_17")
-        self.gridLayout_6.addWidget(self.label_17, 5, 1, 1, 1)
-        self.incJ3Button = QtWidgets.QPushButton(self.frame_7)
-        self.incJ3Button.setObjectName("incJ3Button")
-        self.gridLayout_6.addWidget(self.incJ3Button, 5, 2, 1, 2)
-        self.decJ4Button = QtWidgets.QPushButton(self.frame_7)
-        self.decJ4Button.setObjectName("decJ4Button")
-        self.gridLayout_6.addWidget(self.decJ4Button, 6, 0, 1, 1)
-        self.label_18 = QtWidgets.QLabel(self.frame_7)
-        self.label_18.setAlignment(QtCore.Qt.AlignCenter)
-        self.label_18.setObjectName("label_18")
-        self.gridLayout_6.addWidget(self.label_18, 6, 1, 1, 1)
-        self.decJ2Button = QtWidgets.QPushButton(self.frame_7)
-        self.decJ2Button.setObjectName("decJ2Button")
-        self.gridLayout_6.addWidget(self.decJ2Button, 3, 0, 1, 1)
-        self.decJ0Button = QtWidgets.QPushButton(self.frame_7)
-        self.decJ0Button.setObjectName("decJ0Button")
-        self.gridLayout_6.addWidget(self.decJ0Button, 0, 0, 1, 1)
-        self.label_13 = QtWidgets.QLabel(self.frame_7)
-        self.label_13.setAlignment(QtCore.Qt.AlignCenter)
-        self.label_13.setObjectName("label_13")
-        self.gridLayout_6.addWidget(self.label_13, 0, 1, 1, 1)
-        self.decJ1Button = QtWidgets.QPushButton(self.frame_7)
-        self.decJ1Button.setObjectName("decJ1Button")
-        self.gridLayout_6.addWidget(self.decJ1Button, 2, 0, 1, 1)
-        self.decJ5Button = QtWidgets.QPushButton(self.frame_7)
-        self.decJ5Button.setObjectName("decJ5Button")
-        self.gridLayout_6.addWidget(self.decJ5Button, 7, 0, 1, 1)
-        self.label_19 = QtWidgets.QLabel(self.frame_7)
-        self.label_19.setAlignment(QtCore.Qt.AlignCenter)
-        self.label_19.setObjectName("label_19")
-        self.gridLayout_6.addWidget(self.label_19, 7, 1, 1, 1)
-        self.label_16 = QtWidgets.QLabel(self.frame_7)
-        self.label_16.setAlignment(QtCore.Qt.AlignCenter)
-        self.label_16.setObjectName("label_16")
-        self.gridLayout_6.addWidget(self.label_16, 3, 1, 1, 1)
-        self.label_15 = QtWidgets.QLabel(self.frame_7)
-        self.label_15.setAlignment(QtCore.Qt.AlignCenter)
-        self.label_15.setObjectName("label_15")
-        self.gridLayout_6.addWidget(self.label_15, 2, 1, 1, 1)
-        self.incJ2Button = QtWidgets.QPushButton(self.frame_7)
-        self.incJ2Button.setObjectName("incJ2Button")
-        self.gridLayout_6.addWidget(self.incJ2Button, 3, 2, 1, 2)
-        self.incJ1Button = QtWidgets.QPushButton(self.frame_7)
-        self.incJ1Button.setObjectName("incJ1Button")
-        self.gridLayout_6.addWidget(self.incJ1Button, 2, 2, 1, 2)
-        self.incJ0Button = QtWidgets.QPushButton(self.frame_7)
-        self.incJ0Button.setObjectName("incJ0Button")
-        self.gridLayout_6.addWidget(self.incJ0Button, 0, 2, 1, 2)
-        self.incJ4Button = QtWidgets.QPushButton(self.frame_7)
-        self.incJ4Button.setObjectName("incJ4Button")
-        self.gridLayout_6.addWidget(self.incJ4Button, 6, 2, 1, 2)
-        self.incJ5Button = QtWidgets.QPushButton(self.frame_7)
-        self.incJ5Button.setObjectName("incJ5Button")
-        self.gridLayout_6.addWidget(self.incJ5Button, 7, 2, 1, 2)
-        self.gridLayout_4.addWidget(self.frame_7, 1, 2, 3, 1)
-        self.label_20 = QtWidgets.QLabel(self.frame_6)
-        self.label_20.setObjectName("label_20")
-        self.gridLayout_4.addWidget(self.label_20, 1, 0, 1, 1)
-        self.jointAccLineEdit = QtWidgets.QLineEdit(self.frame_6)
-        self.jointAccLineEdit.setObjectName("jointAccLineEdit")
-        self.gridLayout_4.addWidget(self.jointAccLineEdit, 1, 1, 1, 1)
-        spacerItem = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
-        self.gridLayout_4.addItem(spacerItem, 4, 0, 1, 1)
-        self.label_21 = QtWidgets.QLabel(self.frame_6)
-        self.label_21.setObjectName("label_21")
-        self.gridLayout_4.addWidget(self.label_21, 2, 0, 1, 1)
-        self.jointVelLineEdit = QtWidgets.QLineEdit(self.frame_6)
-        self.jointVelLineEdit.setObjectName("jointVelLineEdit")
-        self.gridLayout_4.addWidget(self.jointVelLineEdit, 2, 1, 1, 1)
-        self.verticalLayout_2.addWidget(self.frame_6)
         self.tabWidget.addTab(self.tab_2, "")
         self.gridLayout_7.addWidget(self.tabWidget, 1, 0, 2, 1)
         self.tabWidget_2 = QtWidgets.QTabWidget(self.centralWidget)
@@ -389,48 +199,7 @@ class Ui_MainWindow(object):
         self.label_10.setText(_translate("MainWindow", "Current CSys:"))
         self.csysButton.setText(_translate("MainWindow", "Update Csys"))
         self.stopButton.setText(_translate("MainWindow", "STOP!"))
-        self.minusXButton.setText(_translate("MainWindow", "-"))
-        self.label_3.setText(_translate("MainWindow", "X"))
-        self.plusXButton.setText(_translate("MainWindow", "+"))
-        self.minusYButton.setText(_translate("MainWindow", "-"))
-        self.label_4.setText(_translate("MainWindow", "Y"))
-        self.plusYButton.setText(_translate("MainWindow", "+"))
-        self.minusZButton.setText(_translate("MainWindow", "-"))
-        self.label_5.setText(_translate("MainWindow", "Z"))
-        self.plusZButton.setText(_translate("MainWindow", "+"))
-        self.minusRXButton.setText(_translate("MainWindow", "-"))
-        self.label_6.setText(_translate("MainWindow", "Rx"))
-        self.plusRXButton.setText(_translate("MainWindow", "+"))
-        self.minusRYButton.setText(_translate("MainWindow", "-"))
-        self.label_7.setText(_translate("MainWindow", "Ry"))
-        self.plusRYButton.setText(_translate("MainWindow", "+"))
-        self.minusRZButton.setText(_translate("MainWindow", "-"))
-        self.label_8.setText(_translate("MainWindow", "Rz"))
-        self.plusRZButton.setText(_translate("MainWindow", "+"))
-        self.toolRefCheckBox.setText(_translate("MainWindow", "Tool reference"))
-        self.label_14.setText(_translate("MainWindow", "Default acceleration (m/s2)"))
-        self.label_11.setText(_translate("MainWindow", "Default velocity (m/s)"))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab), _translate("MainWindow", "Linear move"))
-        self.decJ3Button.setText(_translate("MainWindow", "-"))
-        self.label_17.setText(_translate("MainWindow", "3"))
-        self.incJ3Button.setText(_translate("MainWindow", "+"))
-        self.decJ4Button.setText(_translate("MainWindow", "-"))
-        self.label_18.setText(_translate("MainWindow", "4"))
-        self.decJ2Button.setText(_translate("MainWindow", "-"))
-        self.decJ0Button.setText(_translate("MainWindow", "-"))
-        self.label_13.setText(_translate("MainWindow", "0"))
-        self.decJ1Button.setText(_translate("MainWindow", "-"))
-        self.decJ5Button.setText(_translate("MainWindow", "-"))
-        self.label_19.setText(_translate("MainWindow", "5"))
-        self.label_16.setText(_translate("MainWindow", "2"))
-        self.label_15.setText(_translate("MainWindow", "1"))
-        self.incJ2Button.setText(_translate("MainWindow", "+"))
-        self.incJ1Button.setText(_translate("MainWindow", "+"))
-        self.incJ0Button.setText(_translate("MainWindow", "+"))
-        self.incJ4Button.setText(_translate("MainWindow", "+"))
-        self.incJ5Button.setText(_translate("MainWindow", "+"))
-        self.label_20.setText(_translate("MainWindow", "Default acceleration (rad/s2)"))
-        self.label_21.setText(_translate("MainWindow", "Default velocity (rad/s)"))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_2), _translate("MainWindow", "Joint move"))
         self.dio0CheckBox.setText(_translate("MainWindow", "0"))
         self.dio1CheckBox.setText(_translate("MainWindow", "1"))
@@ -441,5 +210,4 @@ class Ui_MainWindow(object):
         self.dio6CheckBox.setText(_translate("MainWindow", "6"))
         self.dio7CheckBox.setText(_translate("MainWindow", "7"))
         self.tabWidget_2.setTabText(self.tabWidget_2.indexOf(self.tab_3), _translate("MainWindow", "Digital IO"))
-        self.tabWidget_2.setTabText(self.tabWidget_2.indexOf(self.tab_4), _translate("MainWindow", "Analog IO"))
-
+        self.tabWidget_2.setTabText(self.tabWidget_2.indexOf(self.tab_4), _translate("MainWindow", "Tool and analog IO"))
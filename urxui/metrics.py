@@ -0,0 +1,274 @@
+import os
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QTimer, Qt
+from PyQt5.QtWidgets import QLabel
+
+from urxui.latency import RollingHistogram
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+QUANTILES = (50, 95, 99)
+
+
+class Summary(object):
+
+    """
+    Count and sum of observed values, quantiles over the last size of them
+    """
+
+    def __init__(self, size=1000):
+        self.count = 0
+        self.sum = 0.0
+        self.window = RollingHistogram(size)
+
+    def observe(self, val):
+        self.count += 1
+        self.sum += val
+        self.window.add(val)
+
+
+class Exposition(object):
+
+    """
+    Build a metrics page in the Prometheus text format
+    """
+
+    def __init__(self):
+        self.lines = []
+
+    def add(self, name, kind, doc, value, labels=None):
+        if not labels or not any(line.startswith("# TYPE {} ".format(name)) for line in self.lines):
+            self.lines.append("# HELP {} {}".format(name, doc))
+            self.lines.append("# TYPE {} {}".format(name, kind))
+        self.lines.append("{}{} {}".format(name, _labels(labels), _value(value)))
+
+    def summary(self, name, doc, summary, labels=None):
+        self.lines.append("# HELP {} {}".format(name, doc))
+        self.lines.append("# TYPE {} summary".format(name))
+        self._quantiles(name, summary.window, labels)
+        self.lines.append("{}_sum{} {}".format(name, _labels(labels), _value(summary.sum)))
+        self.lines.append("{}_count{} {}".format(name, _labels(labels), summary.count))
+
+    def histogram(self, name, doc, hists):
+        """
+        quantiles only of RollingHistograms, hists maps a label dict to each of them
+        """
+        self.lines.append("# HELP {} {}".format(name, doc))
+        self.lines.append("# TYPE {} summary".format(name))
+        for labels, hist in hists:
+            self._quantiles(name, hist, labels)
+            self.lines.append("{}_count{} {}".format(name, _labels(labels), len(hist)))
+
+    def _quantiles(self, name, hist, labels):
+        for pct, val in zip(QUANTILES, hist.percentiles(*QUANTILES)):
+            quantile = dict(labels or {}, quantile=str(pct / 100.0))
+            self.lines.append("{}{} {}".format(name, _labels(quantile), "NaN" if val is None else _value(val)))
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join('{}="{}"'.format(key, val) for key, val in sorted(labels.items())) + "}"
+
+
+def _value(val):
+    if isinstance(val, bool):
+        return "1" if val else "0"
+    if isinstance(val, int):
+        return str(val)
+    return repr(float(val))
+
+
+class WindowMetrics(QObject):
+
+    """
+    Runtime metrics of a Window: counters kept by the state stream, the
+    renderer and the command executor, plus the durations measured here of
+    the state update loop, the jog slots and the stalls of the GUI thread.
+    The page is rebuilt every second in the GUI thread and can be served
+    over HTTP, written to a file for the node exporter textfile collector
+    and shown in an overlay. Its timestamp tells when the GUI thread last
+    managed to rebuild it
+    """
+
+    heartbeat = 0.1  # s, interval of the timer measuring GUI thread stalls
+    stall_tolerance = 0.02  # s, timer lateness not counted as stall
+
+    def __init__(self, window):
+        QObject.__init__(self, window)
+        self.window = window
+        self.update = Summary()
+        self.packet = Summary()
+        self.jog_slot = Summary()
+        self.stall = Summary()
+        self.stall_total = 0.0
+        self.stall_max = 0.0
+        self.reconnects = 0
+        self.page = ""
+        self.path = None
+        self.server = None
+        self.overlay = None
+
+        self._beat = time.perf_counter()
+        self._heartbeat = QTimer(self)
+        self._heartbeat.timeout.connect(self._beat_timeout)
+        self._heartbeat.start(int(self.heartbeat * 1000))
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(1000)
+
+    def _beat_timeout(self):
+        now = time.perf_counter()
+        late = max(now - self._beat - self.heartbeat, 0.0)
+        self._beat = now
+        self.stall.observe(late)
+        if late > self.stall_tolerance:
+            self.stall_total += late
+            self.stall_max = max(self.stall_max, late)
+
+    def serve(self, port, host="127.0.0.1"):
+        """
+        serve the page at http://host:port/metrics from a background thread
+        """
+        # not needed by most sessions, keep it out of startup
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.page.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass  # a scrape every few seconds would flood the console
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="urxui-metrics", daemon=True).start()
+        print("Serving metrics on http://{}:{}/metrics".format(host, self.server.server_address[1]))
+
+    def write_to(self, path):
+        """
+        write the page to path at every refresh
+        """
+        self.path = path
+
+    def toggle_overlay(self):
+        if self.overlay is None:
+            self.overlay = MetricsOverlay(self.window)
+        self.overlay.setVisible(not self.overlay.isVisible())
+        self.refresh()
+
+    def close(self):
+        self._timer.stop()
+        self._heartbeat.stop()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def refresh(self):
+        self.page = self.text()
+        if self.path:
+            # rename so a reader never sees a half written file
+            tmp = self.path + ".tmp"
+            try:
+                with open(tmp, "w") as f:
+                    f.write(self.page)
+                os.replace(tmp, self.path)
+            except OSError as ex:
+                print("Could not write metrics to {}: {}".format(self.path, ex))
+                self.path = None
+        if self.overlay and self.overlay.isVisible():
+            self.overlay.show_metrics(self)
+
+    def text(self):
+        window = self.window
+        stream, mailbox, renderer, commands = window.stream, window.mailbox, window.renderer, window.commands
+        page = Exposition()
+        page.add("urxui_metrics_timestamp_seconds", "gauge", "Time this page was built", time.time())
+        page.add("urxui_connected", "gauge", "1 if connected to a robot", window.robot is not None)
+        page.add("urxui_state_stale", "gauge", "1 if no state packet came for stale_timeout", stream.stale)
+        page.add("urxui_state_rate_hz", "gauge", "Current state display rate", window.rate.rate)
+        page.add("urxui_state_packets_total", "counter", "State packets received from the controller", stream.packets)
+        page.add("urxui_state_samples_total", "counter", "State samples passed to the display", stream.emitted)
+        page.add("urxui_snapshots_dropped_total", "counter", "Snapshots replaced before the GUI took them", mailbox.dropped)
+        page.add("urxui_frames_total", "counter", "Frames rendered", renderer.frames)
+        page.add("urxui_frames_skipped_writes_total", "counter", "Widget writes avoided", renderer.skipped)
+        page.add("urxui_render_seconds_total", "counter", "Time spent rendering", renderer.render_time)
+        page.summary("urxui_update_seconds", "Duration of one state update in the stream thread", self.update)
+        page.summary("urxui_packet_seconds", "Duration of the handling of one state packet", self.packet)
+        page.summary("urxui_jog_slot_seconds", "Duration of the jog button slots", self.jog_slot)
+        page.summary("urxui_gui_timer_lateness_seconds", "Lateness of a {} s GUI timer".format(self.heartbeat), self.stall)
+        page.add("urxui_gui_stall_seconds_total", "counter",
+                 "GUI thread stall time, timer lateness above {} s".format(self.stall_tolerance), self.stall_total)
+        page.add("urxui_gui_stall_max_seconds", "gauge", "Longest GUI thread stall", self.stall_max)
+        page.add("urxui_command_queue_depth", "gauge", "Robot commands waiting for dispatch", commands.depth())
+        for result, count in (("sent", commands.dispatched), ("replaced", commands.replaced),
+                              ("dropped", commands.dropped), ("flushed", commands.flushed),
+                              ("hung", commands.hung)):
+            page.add("urxui_commands_total", "counter", "Robot commands by outcome", count, {"result": result})
+        page.histogram("urxui_command_dispatch_seconds", "Time from command submission to dispatch",
+                       [(None, commands.latency)])
+        page.histogram("urxui_jog_latency_seconds", "Jog latency from button press",
+                       [({"stage": "sent"}, window.latency.sent), ({"stage": "motion"}, window.latency.motion)])
+        page.histogram("urxui_io_ack_seconds", "Time from IO write to acknowledgement", [(None, window.io_latency)])
+        page.add("urxui_reconnects_total", "counter", "Reconnection attempts after a lost link", self.reconnects)
+        link = window.link
+        page.histogram("urxui_link_interarrival_seconds", "Host time between state packets", [(None, link.interarrival)])
+        page.histogram("urxui_link_delay_seconds", "Packet delay above the fastest packets of the last seconds",
+                       [(None, link.delay)])
+        for kind, count in (("lost", link.lost), ("coalesced", link.coalesced)):
+            page.add("urxui_link_missed_cycles_total", "counter", "Controller cycles without a packet for us",
+                     count, {"kind": kind})
+        if link.offset is not None:
+            page.add("urxui_link_clock_offset_seconds", "gauge", "Host clock minus controller clock", link.offset)
+        page.add("urxui_plugin_values_extracted_total", "counter", "Topic values extracted for plugin panels",
+                 window.plugins.extracted)
+        page.add("urxui_plugin_values_delivered_total", "counter", "Topic values handed to plugin panels",
+                 window.plugins.delivered)
+        return page.text()
+
+
+class MetricsOverlay(QLabel):
+
+    """
+    Few key metrics drawn over the top right corner of a window
+    """
+
+    def __init__(self, window):
+        QLabel.__init__(self, window)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setStyleSheet("QLabel { background-color : rgba(0, 0, 0, 160); color : white; padding : 4px; }")
+        self.hide()
+
+    def show_metrics(self, metrics):
+        window = metrics.window
+        update_p95, = metrics.update.window.percentiles(95)
+        stall_p99, = metrics.stall.window.percentiles(99)
+        lines = ["packets {}  samples {}  rate {:g} Hz".format(window.stream.packets, window.stream.emitted, window.rate.rate),
+                 "frames {}  dropped snapshots {}".format(window.renderer.frames, window.mailbox.dropped),
+                 "update p95 {}".format(_ms(update_p95)),
+                 "commands queued {}  reconnects {}".format(window.commands.depth(), metrics.reconnects),
+                 "GUI stall total {:.2f} s  max {}  timer p99 {}".format(metrics.stall_total, _ms(metrics.stall_max), _ms(stall_p99))]
+        self.setText("\n".join(lines))
+        self.adjustSize()
+        self.move(window.width() - self.width() - 8, 8)
+        self.raise_()
+
+
+def _ms(val):
+    return "-" if val is None else "{:.1f} ms".format(val * 1000)
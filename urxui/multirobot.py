@@ -0,0 +1,98 @@
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QMainWindow, QWidget, QFrame, QGridLayout, QVBoxLayout, QLabel, QPushButton, QScrollArea
+
+
+class RobotTile(QFrame):
+
+    """
+    Compact status of one robot
+    """
+
+    def __init__(self, addr, open_cb, parent=None):
+        QFrame.__init__(self, parent)
+        self.setFrameShape(QFrame.StyledPanel)
+        self.addr = addr
+        layout = QVBoxLayout(self)
+        self.addrLabel = QLabel("<b>{}</b>".format(addr))
+        self.stateLabel = QLabel()
+        self.jointsLabel = QLabel()
+        self.dioLabel = QLabel()
+        self.openButton = QPushButton("Jog...")
+        self.openButton.clicked.connect(lambda: open_cb(addr))
+        for widget in (self.addrLabel, self.stateLabel, self.jointsLabel, self.dioLabel, self.openButton):
+            layout.addWidget(widget)
+        self._shown = None
+        self.update_state(None)
+
+    def update_state(self, state):
+        if state is None or not state.connected:
+            shown = ("Not connected", "", "", "orange")
+        else:
+            shown = ("Running" if state.running else "Not running",
+                     " ".join("{:.3f}".format(j) for j in state.joints),
+                     "DO: " + "{:08b}".format(state.bits & 0xff)[::-1],
+                     "lightgreen" if state.running else "yellow")
+        if shown == self._shown:
+            return
+        self._shown = shown
+        text, joints, dio, color = shown
+        self.stateLabel.setText(text)
+        self.stateLabel.setStyleSheet("QLabel {{ background-color : {}; }}".format(color))
+        self.jointsLabel.setText(joints)
+        self.dioLabel.setText(dio)
+
+
+class MultiRobotWindow(QMainWindow):
+
+    """
+    Monitor several robots with one tile each. All robots are followed by one
+    shared SecondaryPoller thread, tiles are refreshed at rate Hz.
+    Pressing the jog button of a tile opens a normal Window connected to that robot
+    """
+
+    columns = 4
+
+    def __init__(self, addresses, poller, rate=4):
+        QMainWindow.__init__(self)
+        self.setWindowTitle("Urx cell ( {} robots )".format(len(addresses)))
+        self.poller = poller
+        self._windows = {}
+        self._tiles = []
+        container = QWidget()
+        layout = QGridLayout(container)
+        for idx, addr in enumerate(addresses):
+            tile = RobotTile(addr, self.open_robot)
+            layout.addWidget(tile, idx // self.columns, idx % self.columns)
+            self._tiles.append((tile, poller.add(addr)))
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(container)
+        self.setCentralWidget(scroll)
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(int(1000 / rate))
+
+    def refresh(self):
+        for tile, mailbox in self._tiles:
+            state = mailbox.take()
+            if state is not None:
+                tile.update_state(state)
+
+    def open_robot(self, addr):
+        window = self._windows.get(addr)
+        if window is None or not window.isVisible():
+            from urxui.mainwindow import Window
+            window = Window()
+            window.ui.addrComboBox.setEditText(addr)
+            window.connect()
+            self._windows[addr] = window
+        window.show()
+        window.raise_()
+
+    def closeEvent(self, event):
+        self._timer.stop()
+        for window in self._windows.values():
+            window.close()
+        self.poller.stop()
+        event.accept()
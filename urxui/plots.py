@@ -0,0 +1,131 @@
+import numpy as np
+
+from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtGui import QPainter, QPen, QColor, QPolygonF
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QCheckBox, QSizePolicy
+
+
+COLORS = [QColor(Qt.red), QColor(Qt.darkGreen), QColor(Qt.blue),
+          QColor(Qt.darkYellow), QColor(Qt.magenta), QColor(Qt.darkCyan)]
+
+SPANS = [("10 s", 10), ("1 min", 60), ("10 min", 600), ("1 h", 3600)]
+
+
+class StripChart(QWidget):
+
+    """
+    Plot some series of a StateHistory over the last span seconds.
+    Each series is decimated to one min/max pair per pixel and drawn as
+    a single polyline going through them
+    """
+
+    margin = 4
+
+    def __init__(self, history, series, names, unit, parent=None):
+        QWidget.__init__(self, parent)
+        self.history = history
+        self.series = series
+        self.names = names
+        self.unit = unit
+        self.span = 10
+        self.end = None  # None follows newest sample
+        self.setMinimumHeight(80)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.white)
+        end = self.end if self.end is not None else self.history.last_time()
+        width = self.width() - 2 * self.margin
+        height = self.height() - 2 * self.margin
+        if end is None or width <= 0 or height <= 0:
+            return
+        x, low, high = self.history.decimate(end - self.span, end, width, self.series)
+        if not len(x):
+            return
+        ymin = float(low.min())
+        ymax = float(high.max())
+        if ymax - ymin < 1e-6:
+            ymin -= 0.5e-6
+            ymax += 0.5e-6
+        scale = (height - 1) / (ymax - ymin)
+        # interleave min and max of each pixel, vertical strokes show the spread
+        xs = np.repeat(x + self.margin, 2)
+        ys = np.empty((len(x), 2))
+        for idx in range(low.shape[1]):
+            ys[:, 0] = low[:, idx]
+            ys[:, 1] = high[:, idx]
+            ys_pixel = self.margin + height - 1 - (ys.ravel() - ymin) * scale
+            painter.setPen(QPen(COLORS[idx % len(COLORS)], 0))
+            painter.drawPolyline(_polygon(xs, ys_pixel))
+
+        painter.setPen(Qt.black)
+        painter.drawText(self.margin + 2, self.margin + 12, "{:.4g} {}".format(ymax, self.unit))
+        painter.drawText(self.margin + 2, self.margin + height - 2, "{:.4g} {}".format(ymin, self.unit))
+        left = self.margin + 100
+        for idx, name in enumerate(self.names):
+            painter.setPen(COLORS[idx % len(COLORS)])
+            painter.drawText(left + idx * 30, self.margin + 12, name)
+
+
+def _polygon(xs, ys):
+    # fill the QPolygonF memory directly instead of creating one QPointF per point
+    poly = QPolygonF(len(xs))
+    ptr = poly.data()
+    ptr.setsize(len(xs) * 2 * 8)
+    buf = np.frombuffer(ptr, np.float64).reshape(len(xs), 2)
+    buf[:, 0] = xs
+    buf[:, 1] = ys
+    return poly
+
+
+class PlotPanel(QWidget):
+
+    """
+    Strip charts of joints, TCP position and TCP rotation of a Window
+    """
+
+    def __init__(self, window, parent=None):
+        QWidget.__init__(self, parent)
+        self.window = window
+        history = window.get_history()
+        layout = QVBoxLayout(self)
+        bar = QHBoxLayout()
+        bar.addWidget(QLabel("Window"))
+        self.spanComboBox = QComboBox()
+        for text, _ in SPANS:
+            self.spanComboBox.addItem(text)
+        self.spanComboBox.currentIndexChanged.connect(self.set_span)
+        bar.addWidget(self.spanComboBox)
+        self.pauseCheckBox = QCheckBox("Pause")
+        self.pauseCheckBox.toggled.connect(self.set_paused)
+        bar.addWidget(self.pauseCheckBox)
+        bar.addStretch()
+        layout.addLayout(bar)
+
+        self.charts = [StripChart(history, slice(0, 6), ["j0", "j1", "j2", "j3", "j4", "j5"], "rad"),
+                       StripChart(history, slice(6, 9), ["x", "y", "z"], "m"),
+                       StripChart(history, slice(9, 12), ["rx", "ry", "rz"], "rad")]
+        for chart in self.charts:
+            layout.addWidget(chart)
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(int(1000 / float(window.settings.value("plot_fps", 10))))
+
+    def set_span(self, idx):
+        for chart in self.charts:
+            chart.span = SPANS[idx][1]
+        self.refresh()
+
+    def set_paused(self, val):
+        end = self.window.get_history().last_time() if val else None
+        for chart in self.charts:
+            chart.end = end
+        self.refresh()
+
+    def refresh(self):
+        if not self.isVisible():
+            return
+        for chart in self.charts:
+            chart.update()
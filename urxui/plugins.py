@@ -0,0 +1,234 @@
+"""
+Extra panels of the main window.
+A panel subclasses Panel, gives its tab title and the state topics it wants
+with the max rate of each, and gets them in on_topics() in the GUI thread.
+Topics are extracted from the packets the window already reads, at the
+highest rate any panel asked for, and handed to the GUI thread in one
+batch, so panels never query the robot and adding one adds no controller
+traffic. Hidden panels get nothing until they are shown.
+
+    class ToolPanel(Panel):
+        title = "Tool"
+        topics = {"tool": 2, "io": 10}
+
+        def on_topics(self, values):
+            ...
+
+Panels are loaded with --plugin MODULE:CLASS or the plugins setting, a
+list of the same. More topics can be added with TopicHub.add_topic().
+"""
+
+import importlib
+import threading
+import time
+
+from PyQt5.QtCore import pyqtSignal, QObject
+from PyQt5.QtWidgets import QWidget
+
+
+def _copy(key):
+    return lambda data, state: dict(data[key])
+
+
+# name -> extract(data, state) with data the packet parsed by urx and
+# state the StateSnapshot filled from it
+TOPICS = {
+    "joints": lambda data, state: tuple(state.joints),
+    "pose": lambda data, state: tuple(state.pose),
+    "running": lambda data, state: state.running,
+    "io": lambda data, state: (state.bits, tuple(state.analog)),
+    "tool": _copy("ToolData"),
+    "force": _copy("ForceModeData"),
+    "masterboard": _copy("MasterBoardData"),
+}
+
+
+def _throttle(now, deadline, period):
+    """
+    return the next deadline if a value may go at now, None otherwise.
+    Values up to half a period early are accepted and deadlines follow each
+    other rather than the values, so jitter of values coming at the topic
+    rate does not lower it. After a gap we restart from now, so never more
+    than one value per period goes
+    """
+    if now < deadline - period / 2:
+        return None
+    return max(deadline, now) + period
+
+
+class Panel(QWidget):
+
+    """
+    Base class of plugin panels. topics maps topic names to the max rate
+    in Hz the panel wants them at
+    """
+
+    title = "Plugin"
+    topics = {}
+
+    def __init__(self, window, parent=None):
+        QWidget.__init__(self, parent)
+        self.window = window
+
+    def on_topics(self, values):
+        """
+        called in the GUI thread with a dict of the topics which changed
+        since the last call, a value is None when the robot was disconnected
+        """
+        pass
+
+
+class _Subscription(object):
+
+    __slots__ = ("panel", "periods", "due", "seen")
+
+    def __init__(self, panel, topics):
+        self.panel = panel
+        self.periods = {topic: 1.0 / rate for topic, rate in topics.items()}
+        self.due = dict.fromkeys(topics, 0)
+        self.seen = dict.fromkeys(topics, 0)
+
+
+class TopicHub(QObject):
+
+    """
+    Extract subscribed topics from state packets and deliver them to panels.
+    publish() is called from the stream thread with every packet, the rest
+    from the GUI thread. Extractors run in the stream thread and must be quick.
+    extracted and delivered count topic values extracted and handed to panels
+    """
+
+    ready = pyqtSignal()
+
+    def __init__(self, parent=None):
+        QObject.__init__(self, parent)
+        self.extractors = dict(TOPICS)
+        self.extracted = 0
+        self.delivered = 0
+        self._subs = []
+        self._periods = {}  # topic -> smallest period asked, replaced, never changed in place
+        self._next = {}  # topic -> next extraction, stream thread only
+        self._pending = {}
+        self._latest = {}  # topic -> (sequence, value)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.ready.connect(self._deliver)
+
+    def add_topic(self, name, extract):
+        """
+        add topic name, extract(data, state) returns its value from a packet
+        """
+        self.extractors[name] = extract
+
+    def subscribe(self, panel, topics):
+        unknown = [topic for topic in topics if topic not in self.extractors]
+        if unknown:
+            raise ValueError("Unknown topics {}, known are {}".format(", ".join(unknown), ", ".join(sorted(self.extractors))))
+        bad = [topic for topic, rate in topics.items() if not rate > 0]
+        if bad:
+            raise ValueError("Rates of topics {} must be positive".format(", ".join(bad)))
+        self._subs.append(_Subscription(panel, topics))
+        self._update_periods()
+
+    def unsubscribe(self, panel):
+        self._subs = [sub for sub in self._subs if sub.panel is not panel]
+        self._update_periods()
+
+    def _drop_topic(self, topic):
+        # called from the stream thread, the dicts are replaced rather than
+        # changed so the GUI thread may still iterate the old ones
+        for sub in self._subs:
+            sub.periods = {name: period for name, period in sub.periods.items() if name != topic}
+        self._update_periods()
+
+    def _update_periods(self):
+        periods = {}
+        for sub in self._subs:
+            for topic, period in sub.periods.items():
+                periods[topic] = min(period, periods.get(topic, period))
+        self._periods = periods
+
+    def publish(self, data, state):
+        periods = self._periods
+        if not periods:
+            return
+        now = time.monotonic()
+        values = {}
+        for topic, period in periods.items():
+            deadline = _throttle(now, self._next.get(topic, 0), period)
+            if deadline is None:
+                continue
+            self._next[topic] = deadline
+            try:
+                values[topic] = self.extractors[topic](data, state)
+            except KeyError:
+                pass  # not in packets of this controller version
+            except Exception as ex:
+                # a broken extractor must not stop the stream thread, nor fail every packet
+                print("Topic {} failed, dropped: {}".format(topic, ex))
+                self._drop_topic(topic)
+        if not values:
+            return
+        self.extracted += len(values)
+        with self._lock:
+            first = not self._pending
+            self._pending.update(values)
+        # one queued call per batch, however many packets came meanwhile
+        if first:
+            self.ready.emit()
+
+    def reset(self):
+        """
+        robot disconnected, panels get None for all their topics
+        """
+        with self._lock:
+            self._pending = {}
+        self._latest = {}
+        for sub in self._subs:
+            sub.due = dict.fromkeys(sub.periods, 0)
+            sub.seen = dict.fromkeys(sub.periods, 0)
+            self._call(sub, dict.fromkeys(sub.periods))
+
+    def _deliver(self):
+        with self._lock:
+            values, self._pending = self._pending, {}
+        for topic, value in values.items():
+            self._seq += 1
+            self._latest[topic] = (self._seq, value)
+        now = time.monotonic()
+        for sub in self._subs:
+            if not sub.panel.isVisible():
+                continue
+            due = {}
+            for topic, period in sub.periods.items():
+                seq, value = self._latest.get(topic, (0, None))
+                if seq <= sub.seen[topic]:
+                    continue
+                deadline = _throttle(now, sub.due[topic], period)
+                if deadline is not None:
+                    sub.seen[topic] = seq
+                    sub.due[topic] = deadline
+                    due[topic] = value
+            if due:
+                self._call(sub, due)
+
+    def _call(self, sub, values):
+        self.delivered += len(values)
+        try:
+            sub.panel.on_topics(values)
+        except Exception as ex:
+            # one broken plugin must not stop the others
+            print("Plugin {} failed: {}".format(sub.panel.title, ex))
+
+
+def load_panel(spec):
+    """
+    return the panel class of spec "module:Class"
+    """
+    module, _, name = spec.partition(":")
+    if not name:
+        raise ValueError("Invalid plugin {}, expected MODULE:CLASS".format(spec))
+    cls = getattr(importlib.import_module(module), name)
+    if not (isinstance(cls, type) and issubclass(cls, Panel)):
+        raise TypeError("{} is not a urxui.plugins.Panel".format(spec))
+    return cls
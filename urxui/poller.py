@@ -0,0 +1,213 @@
+import errno
+import selectors
+import socket
+import threading
+import time
+
+from urx.ursecmon import ParserUtils, ParsingException
+
+from urxui.connector import backoff_delay
+from urxui.snapshot import fill_state, SnapshotMailbox
+
+
+class _Connection(object):
+
+    def __init__(self, addr):
+        self.addr = addr
+        self.mailbox = SnapshotMailbox()
+        self.sock = None
+        self.connecting = False
+        self.parser = None
+        self.buf = b""
+        self.retry_at = 0
+        self.deadline = 0  # lost if connection or next data did not come by then
+        self.failures = 0
+        self.packets = 0
+
+
+class SecondaryPoller(object):
+
+    """
+    Follow the secondary interface of many robots from one thread.
+    Sockets are multiplexed with a selector, for each robot only the newest
+    complete packet of what we received is parsed and published to the
+    mailbox returned by add(). A connection is lost when it is not
+    established after connect_timeout seconds or no data came for
+    data_timeout seconds. Lost connections are retried after retry_delay,
+    doubling up to max_retry_delay while they keep failing
+    """
+
+    port = 30002
+    retry_delay = 2
+    max_retry_delay = 30
+
+    def __init__(self, connect_timeout=5, data_timeout=3):
+        self.connect_timeout = connect_timeout
+        self.data_timeout = data_timeout
+        self._selector = selectors.DefaultSelector()
+        self._conns = {}
+        self._lock = threading.Lock()
+        self._changed = False
+        self._stopev = threading.Event()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._thread = threading.Thread(target=self._run, name="urxui-poller", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopev.set()
+        self._wake()
+        self._thread.join()
+        for conn in list(self._conns.values()):
+            self._close(conn)
+        self._selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    def add(self, addr):
+        """
+        start following robot at addr, return the mailbox its state is published to
+        """
+        with self._lock:
+            if addr not in self._conns:
+                self._conns[addr] = _Connection(addr)
+                self._changed = True
+            mailbox = self._conns[addr].mailbox
+        self._wake()
+        return mailbox
+
+    def remove(self, addr):
+        with self._lock:
+            if self._conns.pop(addr, None):
+                self._changed = True
+        self._wake()
+
+    def packet_count(self, addr):
+        with self._lock:
+            conn = self._conns.get(addr)
+            return conn.packets if conn else 0
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b"x")
+        except OSError:
+            pass
+
+    def _run(self):
+        active = set()
+        while not self._stopev.is_set():
+            with self._lock:
+                if self._changed:
+                    self._changed = False
+                    conns = set(self._conns.values())
+                    for conn in active - conns:
+                        self._close(conn)
+                    active = conns
+            now = time.monotonic()
+            timeout = self.retry_delay
+            for conn in active:
+                if conn.sock is not None and conn.deadline <= now:
+                    # half open link, silent controller or connect the kernel would retry for minutes
+                    print("No {} from {} for {} s".format("connection" if conn.connecting else "data", conn.addr,
+                                                          self.connect_timeout if conn.connecting else self.data_timeout))
+                    self._lost(conn)
+                if conn.sock is None:
+                    if conn.retry_at <= now:
+                        self._open(conn, now)
+                    else:
+                        timeout = min(timeout, conn.retry_at - now)
+                if conn.sock is not None:
+                    timeout = min(timeout, max(conn.deadline - now, 0))
+            for key, mask in self._selector.select(timeout):
+                conn = key.data
+                if conn is None:
+                    self._drain_wake()
+                elif conn.connecting:
+                    self._finish_connect(conn)
+                else:
+                    self._read(conn)
+
+    def _drain_wake(self):
+        try:
+            while self._wake_r.recv(1024):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _open(self, conn, now):
+        conn.retry_at = now + backoff_delay(conn.failures, self.retry_delay, self.max_retry_delay)
+        conn.failures += 1
+        try:
+            addr = socket.getaddrinfo(conn.addr, self.port, socket.AF_INET, socket.SOCK_STREAM)[0][4]
+        except OSError as ex:
+            print("Could not resolve {}: {}".format(conn.addr, ex))
+            return
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        err = sock.connect_ex(addr)
+        if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+            sock.close()
+            return
+        conn.sock = sock
+        conn.connecting = True
+        conn.deadline = now + self.connect_timeout
+        conn.parser = ParserUtils()
+        conn.buf = b""
+        self._selector.register(sock, selectors.EVENT_WRITE, conn)
+
+    def _finish_connect(self, conn):
+        err = conn.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err:
+            self._lost(conn)
+            return
+        conn.connecting = False
+        conn.deadline = time.monotonic() + self.data_timeout
+        self._selector.modify(conn.sock, selectors.EVENT_READ, conn)
+
+    def _read(self, conn):
+        try:
+            data = conn.sock.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._lost(conn)
+            return
+        conn.deadline = time.monotonic() + self.data_timeout
+        conn.buf += data
+        last = None
+        while True:
+            ans = conn.parser.find_first_packet(conn.buf)
+            if not ans:
+                break
+            last, conn.buf = ans
+            conn.packets += 1
+        if last is None:
+            return
+        try:
+            fill_state(conn.parser.parse(last), conn.mailbox.back())
+        except (ParsingException, KeyError):
+            # first packets may miss some data, not a problem
+            return
+        conn.failures = 0
+        conn.mailbox.publish()
+
+    def _lost(self, conn):
+        self._close(conn)
+        conn.mailbox.back().connected = False
+        conn.mailbox.publish()
+
+    def _close(self, conn):
+        if conn.sock is None:
+            return
+        try:
+            self._selector.unregister(conn.sock)
+        except (KeyError, ValueError):
+            pass
+        conn.sock.close()
+        conn.sock = None
+        conn.connecting = False
@@ -0,0 +1,230 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+
+import numpy as np
+
+
+MAGIC = b"URXREC1\0"
+HEADER = struct.Struct("<8sQQQ")  # magic, capacity, head, count
+HEADER_SIZE = 64
+
+# 8 bytes columns first so all of them stay aligned
+COLUMNS = [("timestamp", "<f8", 1),
+           ("host_time", "<f8", 1),
+           ("pose", "<f8", 6),
+           ("joints", "<f8", 6),
+           ("bits", "<u4", 1),
+           ("running", "<u1", 1)]
+ROW_SIZE = sum(np.dtype(dtype).itemsize * width for _, dtype, width in COLUMNS)
+
+CSV_HEADER = "timestamp,host_time,running,bits,x,y,z,rx,ry,rz,j0,j1,j2,j3,j4,j5"
+
+
+class StateRecorder(object):
+
+    """
+    Record robot states in a memory mapped ring file of fixed size.
+    Data is stored by column, oldest samples are overwritten once capacity
+    samples have been recorded. An existing file with the same capacity is
+    reopened and appended to
+    """
+
+    def __init__(self, path, capacity=500000):
+        self.path = path
+        self._lock = threading.Lock()
+        size = HEADER_SIZE + capacity * ROW_SIZE
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a+b") as f:
+            if os.fstat(f.fileno()).st_size != size:
+                f.truncate(size)
+            self._mm = mmap.mmap(f.fileno(), size)
+        magic, cap, head, count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or cap != capacity:
+            head, count = 0, 0
+        self.capacity = capacity
+        self._head = head
+        self._count = count
+        self._write_header()
+        self._columns = {}
+        offset = HEADER_SIZE
+        for name, dtype, width in COLUMNS:
+            col = np.frombuffer(self._mm, dtype, capacity * width, offset)
+            self._columns[name] = col.reshape(width, capacity) if width > 1 else col
+            offset += col.nbytes
+
+    def __len__(self):
+        return self._count
+
+    def _write_header(self):
+        HEADER.pack_into(self._mm, 0, MAGIC, self.capacity, self._head, self._count)
+
+    def record(self, state):
+        with self._lock:
+            cols = self._columns
+            if not cols:
+                return  # closed
+            idx = self._head
+            cols["timestamp"][idx] = state.timestamp
+            cols["host_time"][idx] = state.host_time
+            cols["pose"][:, idx] = state.pose
+            cols["joints"][:, idx] = state.joints
+            cols["bits"][idx] = state.bits
+            cols["running"][idx] = state.running
+            self._head = (idx + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            self._write_header()
+
+    def time_span(self):
+        """
+        return host time of oldest and newest sample, or None
+        """
+        with self._lock:
+            if not self._count or not self._columns:
+                return None
+            first = (self._head - self._count) % self.capacity
+            last = (self._head - 1) % self.capacity
+            return float(self._columns["host_time"][first]), float(self._columns["host_time"][last])
+
+    def clear(self):
+        with self._lock:
+            self._head = 0
+            self._count = 0
+            self._write_header()
+
+    def chunks(self, size=10000):
+        """
+        iterate over recorded samples from oldest to newest, as dicts of
+        column name to numpy arrays of at most size samples.
+        Each chunk is copied under lock so it is consistent even if we are recording
+        """
+        with self._lock:
+            start = (self._head - self._count) % self.capacity
+            count = self._count
+        for offset in range(0, count, size):
+            idx = (start + np.arange(offset, min(count, offset + size))) % self.capacity
+            with self._lock:
+                if not self._columns:
+                    return  # closed
+                yield {name: col[..., idx].copy() for name, col in self._columns.items()}
+
+    def flush(self):
+        with self._lock:
+            if self._columns:
+                self._mm.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._columns:
+                return
+            self._mm.flush()
+            # the column views must be gone before the map can be closed
+            self._columns = {}
+            self._mm.close()
+
+    def export(self, path, fmt="csv", on_done=None):
+        """
+        export recording to path in a background thread, fmt is csv or parquet.
+        on_done is called with path, number of samples and exception or None
+        """
+        thread = threading.Thread(target=self._export, args=(path, fmt, on_done), name="urxui-export", daemon=True)
+        thread.start()
+        return thread
+
+    def _export(self, path, fmt, on_done):
+        count = 0
+        error = None
+        try:
+            if fmt == "parquet":
+                count = self._export_parquet(path)
+            else:
+                count = self._export_csv(path)
+        except Exception as ex:
+            error = ex
+        if on_done:
+            on_done(path, count, error)
+
+    def _export_csv(self, path):
+        count = 0
+        with open(path, "w") as f:
+            f.write(CSV_HEADER + "\n")
+            for chunk in self.chunks():
+                block = np.column_stack([chunk["timestamp"], chunk["host_time"], chunk["running"], chunk["bits"],
+                                         chunk["pose"].T, chunk["joints"].T])
+                np.savetxt(f, block, fmt=["%.3f", "%.6f", "%d", "%d"] + ["%.6f"] * 12, delimiter=",")
+                count += len(block)
+        return count
+
+    def _export_parquet(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        names = CSV_HEADER.split(",")
+        count = 0
+        writer = None
+        try:
+            for chunk in self.chunks():
+                arrays = [chunk["timestamp"], chunk["host_time"], chunk["running"].astype(bool), chunk["bits"]]
+                arrays += list(chunk["pose"]) + list(chunk["joints"])
+                table = pa.Table.from_arrays([pa.array(a) for a in arrays], names=names)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                count += table.num_rows
+        finally:
+            if writer:
+                writer.close()
+        return count
+
+
+class Replayer(object):
+
+    """
+    Feed a recording back into a SnapshotMailbox at speed times real time.
+    notify is called when the reader of the mailbox should be woken up,
+    on_done when the end of the recording is reached or we are stopped
+    """
+
+    def __init__(self, recorder, mailbox, notify, speed=1.0, on_done=None):
+        self.recorder = recorder
+        self.mailbox = mailbox
+        self.notify = notify
+        self.speed = speed
+        self.on_done = on_done
+        self._stopev = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="urxui-replay", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopev.set()
+
+    def _run(self):
+        start = None
+        try:
+            for chunk in self.recorder.chunks():
+                for i in range(len(chunk["host_time"])):
+                    if start is None:
+                        start = (time.monotonic(), chunk["host_time"][i])
+                    due = start[0] + (chunk["host_time"][i] - start[1]) / self.speed
+                    if self._stopev.wait(max(due - time.monotonic(), 0)):
+                        return
+                    state = self.mailbox.back()
+                    state.connected = True
+                    state.timestamp = float(chunk["timestamp"][i])
+                    state.host_time = float(chunk["host_time"][i])
+                    state.running = bool(chunk["running"][i])
+                    state.bits = int(chunk["bits"][i])
+                    state.pose[:] = array("d", chunk["pose"][:, i])
+                    state.joints[:] = array("d", chunk["joints"][:, i])
+                    if self.mailbox.publish():
+                        self.notify()
+        finally:
+            if self.on_done:
+                self.on_done()
@@ -0,0 +1,118 @@
+import os
+
+from PyQt5.QtCore import pyqtSignal, QTimer, QStandardPaths
+from PyQt5.QtWidgets import QWidget, QGridLayout, QLabel, QPushButton, QCheckBox, QComboBox, QFileDialog
+
+from urxui.recorder import StateRecorder, Replayer
+
+
+class RecorderPanel(QWidget):
+
+    """
+    Record state samples of a Window, export them and replay them in the window
+    """
+
+    exported = pyqtSignal(str, int, object)
+    replay_done = pyqtSignal()
+
+    def __init__(self, window, parent=None):
+        QWidget.__init__(self, parent)
+        self.window = window
+        self.recorder = None
+        self.replayer = None
+        settings = window.settings
+        default_path = os.path.join(QStandardPaths.writableLocation(QStandardPaths.AppDataLocation), "record.bin")
+        self.path = settings.value("record_path", default_path)
+        self.capacity = int(settings.value("record_capacity", 500000))
+
+        layout = QGridLayout(self)
+        self.recordCheckBox = QCheckBox("Record")
+        self.recordCheckBox.toggled.connect(self.set_recording)
+        layout.addWidget(self.recordCheckBox, 0, 0)
+        self.statusLabel = QLabel()
+        layout.addWidget(self.statusLabel, 0, 1, 1, 3)
+        self.csvButton = QPushButton("Export CSV...")
+        self.csvButton.clicked.connect(lambda: self.export("csv"))
+        layout.addWidget(self.csvButton, 1, 0)
+        self.parquetButton = QPushButton("Export Parquet...")
+        self.parquetButton.clicked.connect(lambda: self.export("parquet"))
+        layout.addWidget(self.parquetButton, 1, 1)
+        self.replayButton = QPushButton("Replay")
+        self.replayButton.clicked.connect(self.replay)
+        layout.addWidget(self.replayButton, 2, 0)
+        self.speedComboBox = QComboBox()
+        for speed in ("1x", "2x", "5x", "10x", "50x"):
+            self.speedComboBox.addItem(speed)
+        layout.addWidget(self.speedComboBox, 2, 1)
+        self.stopReplayButton = QPushButton("Stop replay")
+        self.stopReplayButton.clicked.connect(self.stop_replay)
+        self.stopReplayButton.setEnabled(False)
+        layout.addWidget(self.stopReplayButton, 2, 2)
+        layout.setRowStretch(3, 1)
+
+        self.exported.connect(self._exported)
+        self.replay_done.connect(self._replay_done)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(1000)
+
+    def get_recorder(self):
+        if self.recorder is None:
+            self.recorder = StateRecorder(self.path, self.capacity)
+        return self.recorder
+
+    def set_recording(self, val):
+        try:
+            self.window.recorder = self.get_recorder() if val else None
+        except Exception as ex:
+            self.window.show_error(ex)
+            self.recordCheckBox.setChecked(False)
+        self.refresh()
+
+    def refresh(self):
+        if not self.isVisible() or self.recorder is None:
+            return
+        span = self.recorder.time_span()
+        text = "{} / {} samples".format(len(self.recorder), self.recorder.capacity)
+        if span:
+            text += ", {:.0f} s".format(span[1] - span[0])
+        self.statusLabel.setText(text)
+
+    def export(self, fmt):
+        path, _ = QFileDialog.getSaveFileName(self, "Export recording", "urxui_record." + fmt)
+        if not path:
+            return
+        self.get_recorder().export(path, fmt, self.exported.emit)
+
+    def _exported(self, path, count, error):
+        if error:
+            self.window.show_error("Export failed: {}".format(error))
+        else:
+            print("Exported {} samples to {}".format(count, path))
+
+    def replay(self):
+        if self.window.robot:
+            self.window.show_error("Disconnect before replaying")
+            return
+        self.stop_replay()
+        self.recordCheckBox.setChecked(False)
+        speed = float(self.speedComboBox.currentText()[:-1])
+        self.replayer = Replayer(self.get_recorder(), self.window.mailbox, self.window.state_ready.emit,
+                                 speed, self.replay_done.emit)
+        self.replayer.start()
+        self.stopReplayButton.setEnabled(True)
+
+    def stop_replay(self):
+        if self.replayer:
+            self.replayer.stop()
+            self.replayer = None
+
+    def _replay_done(self):
+        self.stopReplayButton.setEnabled(False)
+
+    def shutdown(self):
+        self.stop_replay()
+        self.window.recorder = None
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
@@ -0,0 +1,142 @@
+import time
+
+from PyQt5.QtCore import QObject, QTimer
+
+
+class RenderScheduler(QObject):
+
+    """
+    Render the snapshots of a mailbox to the main window widgets.
+    All changes are batched into at most one update per frame, capped to fps,
+    and only widgets whose content changed are written.
+    listeners are called with each rendered snapshot.
+    writes and skipped count widget writes done and avoided,
+    render_time is the total time spent rendering in seconds
+    """
+
+    def __init__(self, window, mailbox, fps=30):
+        QObject.__init__(self, window)
+        self.window = window
+        self.mailbox = mailbox
+        self.period = 1.0 / fps
+        self.frames = 0
+        self.writes = 0
+        self.skipped = 0
+        self.render_time = 0.0
+        self.listeners = []
+        self._next_frame = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._render)
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        forget what is displayed, next frame rewrites every widget
+        """
+        self._pose = None
+        self._joints = None
+        self._running = None
+        self._stale = None
+        self._bits = None
+        self._title = None
+
+    def request(self):
+        """
+        schedule a frame, requests coming before it is rendered are merged
+        """
+        if self._timer.isActive():
+            return
+        delay = max(self._next_frame - time.monotonic(), 0)
+        self._timer.start(int(delay * 1000))
+
+    def _render(self):
+        state = self.mailbox.take()
+        if state is None:
+            return
+        start = time.monotonic()
+        self._next_frame = start + self.period
+        self.frames += 1
+        self._render_state(state)
+        for listener in self.listeners:
+            listener(state)
+        self.render_time += time.monotonic() - start
+
+    def _render_state(self, state):
+        ui = self.window.ui
+        if state.connected and state.stale:
+            running = "Stale, no data from robot"
+            pose = tuple(state.pose)
+            joints = tuple(state.joints)
+            bits = state.bits
+        elif state.connected:
+            running = str(state.running)
+            pose = tuple(state.pose)
+            joints = tuple(state.joints)
+            bits = state.bits
+        else:
+            running = "Not connected"
+            pose = None
+            joints = None
+            bits = 0
+
+        if pose != self._pose:
+            self._pose = pose
+            self._write(ui.poseLineEdit, _format(pose))
+        else:
+            self.skipped += 1
+        if joints != self._joints:
+            self._joints = joints
+            self._write(ui.jointsLineEdit, _format(joints))
+        else:
+            self.skipped += 1
+        if running != self._running:
+            self._running = running
+            self._write(ui.stateLineEdit, running)
+        else:
+            self.skipped += 1
+        self._render_dio(bits)
+
+        if state.stale != self._stale:
+            # grey out values we cannot trust anymore
+            self._stale = state.stale
+            ui.poseLineEdit.setEnabled(not state.stale)
+            ui.jointsLineEdit.setEnabled(not state.stale)
+            self.writes += 2
+        else:
+            self.skipped += 2
+
+        title = "Urx ( address:{}, running:{} )".format(ui.addrComboBox.currentText(), running)
+        if title != self._title:
+            self._title = title
+            self.window.setWindowTitle(title)
+            self.writes += 1
+        else:
+            self.skipped += 1
+
+    def _write(self, lineedit, text):
+        if lineedit.text() != text:
+            lineedit.setText(text)
+            self.writes += 1
+        else:
+            self.skipped += 1
+
+    def _render_dio(self, bits):
+        boxes = self.window.dio_boxes
+        if self._bits is None:
+            changed = (1 << len(boxes)) - 1
+        else:
+            changed = bits ^ self._bits
+        self._bits = bits
+        for num, box in enumerate(boxes):
+            if changed & 1 << num:
+                box.setChecked(bool(bits & 1 << num))
+                self.writes += 1
+            else:
+                self.skipped += 1
+
+
+def _format(values):
+    if values is None:
+        return ""
+    return str([round(i, 4) for i in values])
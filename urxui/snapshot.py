@@ -0,0 +1,166 @@
+import threading
+import time
+from array import array
+
+
+class StateSnapshot(object):
+
+    """
+    State of the robot as taken from one controller packet.
+    Snapshots are preallocated and refilled in place by read_state,
+    pose and joints are arrays of 6 doubles.
+    timestamp is the controller time of the packet in seconds,
+    host_time the local time.time() when we read it.
+    stale is set when no packet came for a while and values may be outdated.
+    bits are all digital outputs, tool outputs from bit 16, analog the two
+    analog outputs relative to their range.
+    """
+
+    __slots__ = ("connected", "stale", "timestamp", "host_time", "running", "pose", "joints", "bits", "analog")
+
+    def __init__(self):
+        self.connected = False
+        self.stale = False
+        self.timestamp = 0.0
+        self.host_time = 0.0
+        self.running = False
+        self.pose = array("d", [0.0] * 6)
+        self.joints = array("d", [0.0] * 6)
+        self.bits = 0
+        self.analog = array("d", [0.0, 0.0])
+
+    def __repr__(self):
+        return "StateSnapshot(connected={}, stale={}, timestamp={}, running={}, pose={}, joints={}, bits={})".format(
+            self.connected, self.stale, self.timestamp, self.running, list(self.pose), list(self.joints), self.bits)
+
+
+def read_state(robot, state):
+    """
+    Fill state with running flag, pose, joints and digital output bits of robot,
+    all taken from the same controller packet, and return it.
+    The pose is expressed in the current csys of robot, as getl() does
+    """
+    return fill_state(robot.secmon.get_all_data(), state, getattr(robot, "csys", None))
+
+
+def fill_state(data, state, csys=None):
+    """
+    Fill state from a secondary interface packet parsed by urx and return it.
+    If csys is given the pose is expressed in it
+    """
+    mode = data["RobotModeData"]
+    cart = data["CartesianInfo"]
+    jdata = data["JointData"]
+    pose = state.pose
+    pose[0] = cart["X"]
+    pose[1] = cart["Y"]
+    pose[2] = cart["Z"]
+    pose[3] = cart["Rx"]
+    pose[4] = cart["Ry"]
+    pose[5] = cart["Rz"]
+    if csys is not None:
+        pose[:] = array("d", _to_csys(csys, pose))
+    joints = state.joints
+    for i in range(6):
+        joints[i] = jdata["q_actual%s" % i]
+    state.timestamp = mode["timestamp"] / 1000.0  # controller sends milliseconds
+    state.host_time = time.time()
+    state.running = _is_running(mode)
+    board = data["MasterBoardData"]
+    state.bits = board["digitalOutputBits"]
+    state.analog[0] = analog_value(board, 0)
+    state.analog[1] = analog_value(board, 1)
+    state.connected = True
+    state.stale = False
+    return state
+
+
+def analog_value(board, num):
+    """
+    analog output num of MasterBoardData relative to its range, from 0 to 1
+    """
+    val = board["analogOutput%s" % num]
+    # urx calls the analog output domains analogInputDomain
+    if board["analogInputDomain%s" % num]:
+        return val / 10.0  # 0-10 V
+    return (val - 4.0) / 16.0  # 4-20 mA
+
+
+_inverse = (None, None)
+
+
+def _to_csys(csys, pose):
+    # numpy is only needed once connected, do not load it at startup
+    import numpy as np
+    from urxui.frames import pose_to_matrix, matrices_to_poses
+
+    # csys rarely changes, keep the inverse of the last one
+    global _inverse
+    last, matrix = _inverse
+    if last is not csys:
+        matrix = np.linalg.inv(csys.array)
+        _inverse = (csys, matrix)
+    return matrices_to_poses((matrix @ pose_to_matrix(pose))[None])[0]
+
+
+def _is_running(mode):
+    # same test as urx SecondaryMonitor, but on our copy of the packet
+    # controlMode is only sent by firmware >= 3.0 where running mode is 7
+    rmode = 7 if "controlMode" in mode else 0
+    return mode["robotMode"] == rmode \
+        and mode["isRealRobotEnabled"] is True \
+        and mode["isEmergencyStopped"] is False \
+        and mode["isSecurityStopped"] is False \
+        and mode["isRobotConnected"] is True \
+        and mode["isPowerOnRobot"] is True
+
+
+class SnapshotMailbox(object):
+
+    """
+    Latest value mailbox between the thread reading the robot and the GUI.
+    It is triple buffered: the writer fills back(), publish() hands it over,
+    take() returns the newest published snapshot or None if nothing new.
+    A snapshot published but not taken before the next publish is dropped,
+    so a slow reader never makes anything pile up.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._back = StateSnapshot()
+        self._pending = StateSnapshot()
+        self._front = StateSnapshot()
+        self._fresh = False
+        self.published = 0
+        self.dropped = 0
+
+    def back(self):
+        """
+        snapshot the writer may fill, only valid until next publish()
+        """
+        return self._back
+
+    def publish(self):
+        """
+        hand over back buffer to reader.
+        return True if reader had taken previous snapshot and should be notified
+        """
+        with self._lock:
+            self._back, self._pending = self._pending, self._back
+            notify = not self._fresh
+            if self._fresh:
+                self.dropped += 1
+            self._fresh = True
+            self.published += 1
+        return notify
+
+    def take(self):
+        """
+        return newest snapshot, valid until next take(), or None
+        """
+        with self._lock:
+            if not self._fresh:
+                return None
+            self._front, self._pending = self._pending, self._front
+            self._fresh = False
+        return self._front
@@ -0,0 +1,29 @@
+import time
+
+
+class StartupProfile(object):
+
+    """
+    Time the phases of application startup, from start (a time.perf_counter()
+    value) to the first painted frame and the panels built after it
+    """
+
+    def __init__(self, start):
+        self.start = start
+        self.phases = []
+        self._last = start
+
+    def mark(self, name):
+        """
+        end current phase, giving it name
+        """
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def report(self):
+        lines = ["Startup profile:"]
+        for name, duration in self.phases:
+            lines.append("  {:<20} {:8.1f} ms".format(name, duration * 1000))
+        lines.append("  {:<20} {:8.1f} ms".format("total", (self._last - self.start) * 1000))
+        return "\n".join(lines)
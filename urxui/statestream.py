@@ -0,0 +1,207 @@
+import threading
+import time
+
+
+class StateStream(object):
+
+    """
+    Follow the state packets pushed by the controller on the secondary
+    interface and coalesce them to the display rate.
+    callback is called from the stream thread with the robot whenever
+    a new sample should be shown, never more than rate times per second,
+    and with None once when the robot is disconnected.
+    on_packet, if given, is called from the stream thread with the robot
+    for every packet we get, before any coalescing.
+    When no packet arrived for stale_timeout seconds stale is set and
+    callback is called so the display can show it. After lost_timeout
+    seconds on_lost is called once with the robot and we stop following it.
+    set_rate() may be called from any thread and applies at once.
+    An exception in callback, on_packet or on_lost is printed and the
+    stream goes on, if the thread dies anyway stale is set.
+    packets and emitted count packets received and samples passed to callback
+    """
+
+    packet_timeout = 0.5  # max time we block waiting for a packet
+
+    def __init__(self, callback, rate=10, on_packet=None, stale_timeout=1.0, lost_timeout=3.0, on_lost=None):
+        self.robot = None
+        self.period = 1.0 / rate
+        self.on_packet = on_packet
+        self.stale_timeout = stale_timeout
+        self.lost_timeout = lost_timeout
+        self.on_lost = on_lost
+        self.stale = False
+        self.packets = 0
+        self.emitted = 0
+        self._callback = callback
+        self._stopev = threading.Event()
+        self._wakeev = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="urxui-state")
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopev.set()
+        self._wakeev.set()
+        self._interrupt(self.robot)
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def set_rate(self, rate):
+        self.period = 1.0 / rate
+
+    def set_robot(self, robot):
+        old = self.robot
+        self.robot = robot
+        self._wakeev.set()
+        if old is not robot:
+            self._interrupt(old)
+
+    def _interrupt(self, robot):
+        # wake up the stream thread if it is waiting for a packet of robot,
+        # so shutdown or robot change do not wait for packet_timeout
+        event = getattr(getattr(robot, "secmon", None), "_dataEvent", None)
+        if event is not None:
+            with event:
+                event.notify_all()
+
+    def _call(self, func, robot):
+        try:
+            func(robot)
+        except Exception as ex:
+            # a failing consumer must not stop the state updates of the others
+            print("State stream callback {} failed: {!r}".format(getattr(func, "__name__", func), ex))
+
+    def _run(self):
+        try:
+            self._loop()
+        except Exception as ex:
+            print("State stream stopped: ", ex)
+            self.stale = True
+            raise
+
+    def _loop(self):
+        shown = False
+        while not self._stopev.is_set():
+            robot = self.robot
+            if robot is None:
+                if shown:
+                    self._call(self._callback, None)
+                    shown = False
+                self._wakeev.wait()
+                self._wakeev.clear()
+                continue
+            shown = True
+            if self._follow(robot):
+                # link lost, wait until we are given another robot
+                while robot is self.robot and not self._stopev.is_set():
+                    self._wakeev.wait()
+                    self._wakeev.clear()
+
+    def _follow(self, robot):
+        # urx is loaded once we have a robot, not at startup
+        from urx.ursecmon import TimeoutException
+        # always show the first sample right away
+        pending = True
+        last_emit = -self.period
+        last_packet = time.monotonic()
+        self.stale = False
+        while not self._stopev.is_set() and robot is self.robot:
+            # period is read every time so a rate change needs no wake up
+            next_emit = last_emit + self.period
+            if pending:
+                timeout = max(next_emit - time.monotonic(), 0)
+            else:
+                timeout = min(self.packet_timeout, self.stale_timeout)
+            try:
+                robot.secmon.wait(timeout)
+                pending = True
+                last_packet = time.monotonic()
+                self.stale = False
+                self.packets += 1
+                if self.on_packet:
+                    self._call(self.on_packet, robot)
+            except TimeoutException:
+                age = time.monotonic() - last_packet
+                if age >= self.lost_timeout and self.on_lost:
+                    self._call(self.on_lost, robot)
+                    return True
+                if age >= self.stale_timeout and not self.stale:
+                    self.stale = True
+                    pending = True
+            if pending and time.monotonic() >= last_emit + self.period:
+                pending = False
+                last_emit = time.monotonic()
+                self.emitted += 1
+                self._call(self._callback, robot)
+        return False
+
+
+class AdaptiveRate(object):
+
+    """
+    Choose the display rate of a StateStream from what the user can see.
+    Full rate while the window is visible and the robot moves or a jog
+    button is held, idle rate when nothing moved for idle_delay seconds,
+    hidden rate when the window is minimized or hidden.
+    observe() must be called with the joints of every packet, so motion
+    restores the full rate on the next packet. on_change is called with the
+    new rate, from the thread which caused the change
+    """
+
+    # rad, joint travel since the last motion we consider as motion. Measured
+    # from there, not between packets, so slow motion is seen at any packet rate
+    motion_epsilon = 1e-4
+
+    def __init__(self, stream, full=10, idle=2, hidden=0.5, idle_delay=2.0, on_change=None):
+        self.stream = stream
+        self.full = full
+        self.idle = idle
+        self.hidden = hidden
+        self.idle_delay = idle_delay
+        self.on_change = on_change
+        self.rate = None
+        self._visible = True
+        self._jogging = False
+        self._joints = None
+        self._last_motion = time.monotonic()
+        self._lock = threading.Lock()
+        self._update()
+
+    def set_visible(self, val):
+        self._visible = val
+        self._update()
+
+    def set_jogging(self, val):
+        self._jogging = val
+        self._last_motion = time.monotonic()
+        self._update()
+
+    def observe(self, joints):
+        now = time.monotonic()
+        ref = self._joints
+        if ref is None or max(abs(a - b) for a, b in zip(ref, joints)) >= self.motion_epsilon:
+            if ref is not None:
+                self._last_motion = now
+            self._joints = tuple(joints)
+        # cheap enough for every packet, rate only changes when one of the inputs did
+        self._update(now)
+
+    def _update(self, now=None):
+        if now is None:
+            now = time.monotonic()
+        if not self._visible:
+            rate = self.hidden
+        elif self._jogging or now - self._last_motion < self.idle_delay:
+            rate = self.full
+        else:
+            rate = self.idle
+        with self._lock:
+            if rate == self.rate:
+                return
+            self.rate = rate
+        self.stream.set_rate(rate)
+        if self.on_change:
+            self.on_change(rate)
@@ -0,0 +1,129 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QWidget, QGridLayout, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog
+
+from urxui import waypoints
+from urxui.executor import MOTION
+from urxui.snapshot import fill_state, StateSnapshot
+
+
+COLUMNS = ["kind", "values", "vel", "acc", "radius"]
+EDITABLE = {2: "vel", 3: "acc", 4: "radius"}
+
+
+class WaypointPanel(QWidget):
+
+    """
+    Teach a list of waypoints from the current robot position and run them
+    as one blended program. Poses are taken in base, so the list does not
+    depend on the csys selected when teaching
+    """
+
+    def __init__(self, window, parent=None):
+        QWidget.__init__(self, parent)
+        self.window = window
+        self.waypoints = []
+        layout = QGridLayout(self)
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table.itemChanged.connect(self._item_changed)
+        layout.addWidget(self.table, 0, 0, 1, 4)
+        buttons = [("Add pose", lambda: self.capture(waypoints.POSE)),
+                   ("Add joints", lambda: self.capture(waypoints.JOINTS)),
+                   ("Remove", self.remove),
+                   ("Clear", self.clear),
+                   ("Save...", self.save),
+                   ("Load...", self.load),
+                   ("Run", self.run)]
+        for idx, (text, slot) in enumerate(buttons):
+            button = QPushButton(text)
+            button.clicked.connect(slot)
+            layout.addWidget(button, 1 + idx // 4, idx % 4)
+
+    def capture(self, kind):
+        robot = self.window.robot
+        if not robot:
+            self.window.show_error("No connection")
+            return
+        try:
+            # pose and joints from the same packet, pose in base
+            state = fill_state(robot.secmon.get_all_data(), StateSnapshot())
+        except KeyError:
+            self.window.show_error("No state received from robot yet")
+            return
+        values = state.pose if kind == waypoints.POSE else state.joints
+        self.waypoints.append(waypoints.Waypoint(kind, values))
+        self._show()
+
+    def remove(self):
+        rows = sorted({index.row() for index in self.table.selectedIndexes()}, reverse=True)
+        for row in rows:
+            del self.waypoints[row]
+        self._show()
+
+    def clear(self):
+        self.waypoints = []
+        self._show()
+
+    def save(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save waypoints", "waypoints.csv", "CSV (*.csv)")
+        if not path:
+            return
+        try:
+            count = waypoints.save(path, self.waypoints)
+        except OSError as ex:
+            self.window.show_error(ex)
+            return
+        print("Saved {} waypoints to {}".format(count, path))
+
+    def load(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Load waypoints", "", "CSV (*.csv)")
+        if not path:
+            return
+        try:
+            self.waypoints = waypoints.load(path)
+        except (OSError, ValueError) as ex:
+            self.window.show_error(ex)
+            return
+        self._show()
+
+    def run(self):
+        robot = self.window.robot
+        if not robot:
+            self.window.show_error("No connection")
+            return
+        try:
+            prog = waypoints.program(self.waypoints)
+        except ValueError as ex:
+            self.window.show_error(ex)
+            return
+        # one upload for the whole list, the stop button aborts it
+        self.window.commands.submit(MOTION, robot.send_program, prog)
+
+    def _show(self):
+        self.table.blockSignals(True)
+        self.table.setRowCount(len(self.waypoints))
+        for row, wp in enumerate(self.waypoints):
+            texts = [wp.kind, " ".join("{:.4f}".format(v) for v in wp.values),
+                     str(wp.vel), str(wp.acc), str(wp.radius)]
+            for col, text in enumerate(texts):
+                item = QTableWidgetItem(text)
+                if col not in EDITABLE:
+                    item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+                self.table.setItem(row, col, item)
+        self.table.blockSignals(False)
+
+    def _item_changed(self, item):
+        wp = self.waypoints[item.row()]
+        name = EDITABLE[item.column()]
+        try:
+            val = float(item.text())
+            if val < 0:
+                raise ValueError("must not be negative")
+        except ValueError as ex:
+            self.window.show_error("Invalid {}: {}".format(name, ex))
+            val = getattr(wp, name)
+        setattr(wp, name, val)
+        self.table.blockSignals(True)
+        item.setText(str(val))
+        self.table.blockSignals(False)
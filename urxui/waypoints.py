@@ -0,0 +1,92 @@
+from array import array
+
+
+POSE = "pose"
+JOINTS = "joints"
+
+# velocity and acceleration of new waypoints, m/s and m/s^2 for poses, rad/s and rad/s^2 for joints
+DEFAULTS = {POSE: (0.1, 0.5), JOINTS: (0.5, 1.0)}
+
+
+class Waypoint(object):
+
+    """
+    One taught position, a pose in base reached with movel or joint
+    positions reached with movej, and the velocity, acceleration and blend
+    radius of the segment ending at it
+    """
+
+    __slots__ = ("kind", "values", "vel", "acc", "radius")
+
+    def __init__(self, kind, values, vel=None, acc=None, radius=0.0):
+        if kind not in DEFAULTS:
+            raise ValueError("Unknown waypoint kind {}".format(kind))
+        if len(values) != 6:
+            raise ValueError("A waypoint needs 6 values, got {}".format(len(values)))
+        default_vel, default_acc = DEFAULTS[kind]
+        self.kind = kind
+        self.values = array("d", values)
+        self.vel = default_vel if vel is None else float(vel)
+        self.acc = default_acc if acc is None else float(acc)
+        self.radius = float(radius)
+
+    def __repr__(self):
+        return "Waypoint({}, {}, vel={}, acc={}, radius={})".format(
+            self.kind, list(self.values), self.vel, self.acc, self.radius)
+
+
+def program(waypoints, name="urxuiWaypoints"):
+    """
+    URScript program moving through all waypoints in one go, consecutive
+    segments are blended with the radius of their waypoint, the robot
+    only stops at the last one
+    """
+    if not waypoints:
+        raise ValueError("No waypoint to run")
+    lines = ["def {}():".format(name)]
+    last = len(waypoints) - 1
+    for idx, wp in enumerate(waypoints):
+        values = ", ".join("{:.6f}".format(v) for v in wp.values)
+        # blending into the end of the program is an error on the controller
+        radius = 0 if idx == last else wp.radius
+        if wp.kind == POSE:
+            target = "p[{}]".format(values)
+            cmd = "movel"
+        else:
+            target = "[{}]".format(values)
+            cmd = "movej"
+        lines.append("  {}({}, a={:.4f}, v={:.4f}, r={:.4f})".format(cmd, target, wp.acc, wp.vel, radius))
+    lines.append("end")
+    return "\n".join(lines) + "\n"
+
+
+def save(path, waypoints):
+    """
+    write waypoints to path as csv, poses in base
+    """
+    with open(path, "w") as f:
+        f.write("kind,v0,v1,v2,v3,v4,v5,vel,acc,radius\n")
+        for wp in waypoints:
+            f.write("{},{},{},{},{}\n".format(wp.kind, ",".join(repr(v) for v in wp.values), wp.vel, wp.acc, wp.radius))
+    return len(waypoints)
+
+
+def load(path):
+    """
+    read waypoints saved with save(), raise ValueError if file is not valid
+    """
+    waypoints = []
+    with open(path) as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("kind,"):
+                continue
+            fields = line.split(",")
+            try:
+                if len(fields) != 10:
+                    raise ValueError("expected 10 fields, got {}".format(len(fields)))
+                values = [float(v) for v in fields[1:7]]
+                waypoints.append(Waypoint(fields[0], values, fields[7], fields[8], fields[9]))
+            except ValueError as ex:
+                raise ValueError("{} line {}: {}".format(path, lineno, ex))
+    return waypoints